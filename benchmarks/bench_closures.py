@@ -0,0 +1,39 @@
+"""Measures the time which is needed for parsing lambda expressions with and without the caches of closures
+e.g. PYTHONPATH=. python benchmarks/bench_closures.py 2000
+"""
+import sys
+import time
+from pycentroid.query import QueryExpression, ClosureParser, closure_parser
+
+
+def get_products(category: str, price: float):
+    return QueryExpression('ProductData').select(
+        lambda x: (x.id, x.name, x.category, x.price,)
+    ).where(
+        lambda x, category, price: x.category == category and x.price > price, category=category, price=price
+    )
+
+
+def run(size: int):
+    # parse closures without cache
+    start = time.perf_counter()
+    for i in range(size):
+        closure_parser.__closures__.clear()
+        ClosureParser.__expressions__.clear()
+        get_products('Laptops', i)
+    cold = (time.perf_counter() - start) / size
+    # parse closures which have been already cached
+    start = time.perf_counter()
+    for i in range(size):
+        get_products('Laptops', i)
+    hot = (time.perf_counter() - start) / size
+    print(f'cold={cold * 1000000:.1f}us hot={hot * 1000000:.1f}us')
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    run(size)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""Compares the time and the memory which are needed for fetching a large numeric scan as objects or as columns
+e.g. PYTHONPATH=. python benchmarks/bench_columns.py 500000
+"""
+import asyncio
+import gc
+import sys
+import tempfile
+import time
+import tracemalloc
+from os.path import join
+from pycentroid.common import AnyObject
+from pycentroid.sqlite import SqliteAdapter
+
+SQL = 'SELECT x AS id, x % 100 AS category, x * 0.5 AS price, x % 7 AS quantity ' \
+      'FROM (WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n WHERE x < ?) SELECT x FROM n)'
+
+
+async def measure(name: str, func):
+    start = time.perf_counter()
+    await func()
+    duration = time.perf_counter() - start
+    # measure memory in a second pass because tracing slows down execution
+    gc.collect()
+    tracemalloc.start()
+    results = await func()
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del results
+    print(f'{name:<8} time={duration * 1000:.0f}ms memory={memory / 1024 / 1024:.1f}MB')
+
+
+async def run(size: int):
+    with tempfile.TemporaryDirectory() as path:
+        db = SqliteAdapter(AnyObject(database=join(path, 'bench.db')))
+        await db.open()
+
+        async def get_items():
+            return await db.execute(SQL, [size])
+
+        async def get_columns():
+            return await db.execute_columns(SQL, [size])
+
+        await measure('objects', get_items)
+        await measure('columns', get_columns)
+        await db.close()
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 500000
+    asyncio.run(run(size))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""Compares the throughput and the correctness of escaping string literals
+with sequential regular expressions and with a single-pass translation
+e.g. PYTHONPATH=. python benchmarks/bench_escape.py 100000
+"""
+import random
+import re
+import sqlite3
+import sys
+import time
+from pycentroid.query import SqlUtils, QUOTE_ESCAPE_TABLE
+
+CHARACTERS = 'abcdefghijklmnopqrstuvwxyz ABC 0123456789\'"\\\n\t\0'
+
+
+def legacy_escape_string(val):
+    # the previous implementation of SqlUtils.escape_string
+    val = re.sub('\'', '\\\'', val)
+    val = re.sub('\n', '\\\\n', val)
+    val = re.sub('\r', '\\\\r', val)
+    val = re.sub('\b', '\\\\b', val)
+    val = re.sub('\t', '\\\\t', val)
+    val = re.sub('\0', '\\\\0', val)
+    val = re.sub('\x1a', '\\\\Z', val)
+    val = re.sub('"', '\\"', val)
+    val = re.sub('\\\\', '\\\\\\\\', val)
+    return val
+
+
+def correctness(values, escape) -> int:
+    # returns the number of string literals which are not evaluated to their original value by SQLite
+    connection = sqlite3.connect(':memory:')
+    failures = 0
+    for value in values:
+        try:
+            result = connection.execute(f'SELECT \'{escape(value)}\'').fetchone()[0]
+        except sqlite3.Error:
+            result = None
+        if result != value:
+            failures += 1
+    connection.close()
+    return failures
+
+
+def run(size: int):
+    generator = random.Random(1)
+    values = [''.join(generator.choice(CHARACTERS) for _ in range(generator.randint(0, 32))) for _ in range(size)]
+    start = time.perf_counter()
+    for value in values:
+        legacy_escape_string(value)
+    legacy = (time.perf_counter() - start) / size
+    start = time.perf_counter()
+    for value in values:
+        SqlUtils.escape_string(value, QUOTE_ESCAPE_TABLE)
+    translate = (time.perf_counter() - start) / size
+    print(f'legacy={legacy * 1000000:.2f}us translate={translate * 1000000:.2f}us')
+    legacy_failures = correctness(values, legacy_escape_string)
+    translate_failures = correctness(values, lambda x: SqlUtils.escape_string(x, QUOTE_ESCAPE_TABLE))
+    print(f'sqlite failures: legacy={legacy_failures}/{size} translate={translate_failures}/{size}')
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    run(size)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""Measures the event overhead of a query: creating a queryable with its event emitters
+and emitting the events of get_items(), whose results are cached in order to leave out the database.
+Every measurement is the best of a few rounds
+e.g. PYTHONPATH=. python benchmarks/bench_events.py 10000
+"""
+import asyncio
+import sys
+import time
+from os.path import abspath, join, dirname
+from pycentroid.data.application import DataApplication
+from pycentroid.data.types import ExecuteEventArgs
+
+APP_PATH = abspath(join(dirname(__file__), '..', 'tests'))
+ROUNDS = 5
+
+
+async def measure(size: int, func) -> float:
+    durations = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        for _ in range(size):
+            await func()
+        durations.append((time.perf_counter() - start) / size)
+    return min(durations) * 1000000
+
+
+async def run(size: int):
+    app = DataApplication(cwd=APP_PATH)
+    context = app.create_context()
+    model = context.model('Product')
+    await model.migrate()
+
+    async def create():
+        model.as_queryable()
+
+    query = model.as_queryable().select('id', 'name')
+
+    async def emit():
+        # the events of get_items()
+        await model.before.execute.emit(ExecuteEventArgs(model=model, emitter=query))
+        await model.after.execute.emit(ExecuteEventArgs(model=model, emitter=query, results=[]))
+
+    async def empty():
+        # an event without subscribers
+        await model.before.remove.emit(None)
+
+    async def get_items():
+        # a query whose results are cached
+        q = model.as_queryable().select('id', 'name').where(lambda x: x.id == 1)
+        await q.cache(60).get_items()
+
+    results = []
+    for name, func in [('create', create), ('emit', emit), ('empty', empty), ('get_items', get_items)]:
+        duration = await measure(size, func)
+        results.append(f'{name}={duration:.2f}us')
+    print(' '.join(results))
+    await context.finalize()
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    asyncio.run(run(size))
+
+
+if __name__ == '__main__':
+    main()
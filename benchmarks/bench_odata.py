@@ -0,0 +1,36 @@
+"""Measures the time which is needed for parsing $filter expressions which are new,
+which share the same template with different literals, or which are repeated
+e.g. PYTHONPATH=. python benchmarks/bench_odata.py 2000
+"""
+import sys
+import time
+from pycentroid.query import OpenDataParser
+
+FILTER = 'category eq \'{}\' and price gt {} and startswith(name,\'Lenovo\') eq true and year(releaseDate) ge 2020'
+
+
+def measure(name: str, size: int, get_source, clear: bool = False):
+    parser = OpenDataParser()
+    start = time.perf_counter()
+    for i in range(size):
+        if clear:
+            OpenDataParser.__tokens__.clear()
+            OpenDataParser.__expressions__.clear()
+        parser.parse(get_source(i))
+    duration = (time.perf_counter() - start) / size
+    print(f'{name:<10} {duration * 1000000:.1f}us')
+
+
+def run(size: int):
+    measure('new', size, lambda i: FILTER.format('Laptops', i), clear=True)
+    measure('template', size, lambda i: FILTER.format(f'Category {i}', i))
+    measure('repeated', size, lambda i: FILTER.format('Laptops', 500))
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    run(size)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""Compares the cost of deep pages with offset and keyset pagination on a large table
+e.g. PYTHONPATH=. python benchmarks/bench_pagination.py 200000
+"""
+import asyncio
+import sys
+import tempfile
+import time
+from os.path import join
+from pycentroid.common import AnyObject
+from pycentroid.query import QueryExpression, DataColumn
+from pycentroid.sqlite import SqliteAdapter
+
+
+async def run(size: int, page_size: int = 50):
+    with tempfile.TemporaryDirectory() as path:
+        db = SqliteAdapter(AnyObject(database=join(path, 'bench.db')))
+        await db.table('Items').create([
+            DataColumn(name='id', type='Counter'),
+            DataColumn(name='name', type='Text', size=64, nullable=False)
+        ])
+        await db.table('Items').indexes().create('INDEX_ITEMS_NAME_ID', [AnyObject(name='name'), AnyObject(name='id')])
+
+        async def insert():
+            await db.execute('WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n WHERE x < ?) '
+                             'INSERT INTO Items (name) SELECT printf(\'Item %08d\', x % 1000) FROM n', [size])
+
+        await db.execute_in_transaction(insert)
+        for page in [1, size // page_size // 10, size // page_size // 2, size // page_size - 1]:
+            skip = (page - 1) * page_size
+            # offset pagination
+            query = QueryExpression().select('id', 'name').from_collection('Items') \
+                .order_by('name').then_by('id').take(page_size).skip(skip)
+            start = time.perf_counter()
+            items = await db.execute(query)
+            offset = time.perf_counter() - start
+            # keyset pagination which starts after the last item of the previous page
+            previous = await db.execute(QueryExpression().select('id', 'name').from_collection('Items')
+                                        .order_by('name').then_by('id').take(1).skip(max(skip - 1, 0)))
+            query = QueryExpression().select('id', 'name').from_collection('Items') \
+                .order_by('name').then_by('id').take(page_size)
+            if skip > 0:
+                query.seek([previous[0].name, previous[0].id])
+            start = time.perf_counter()
+            results = await db.execute(query)
+            keyset = time.perf_counter() - start
+            assert list(map(lambda x: x.id, results)) == list(map(lambda x: x.id, items))
+            print(f'page={page:<6} offset={offset * 1000:.2f}ms keyset={keyset * 1000:.2f}ms')
+        await db.close()
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    asyncio.run(run(size))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""Compares the time and the memory which are needed for fetching a large result set as objects or as rows
+e.g. PYTHONPATH=. python benchmarks/bench_rows.py 100000
+"""
+import asyncio
+import gc
+import sys
+import tempfile
+import time
+import tracemalloc
+from os.path import join
+from pycentroid.common import AnyObject
+from pycentroid.sqlite import SqliteAdapter
+
+COLUMNS = 20
+
+
+async def fetch(database: str, size: int, row_factory: str):
+    db = SqliteAdapter(AnyObject(database=database, rowFactory=row_factory))
+    await db.open()
+    columns = ', '.join(map(lambda x: f'x + {x} AS field{x}', range(COLUMNS)))
+    sql = f'SELECT {columns} FROM (WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n WHERE x < ?) ' \
+          'SELECT x FROM n)'
+    start = time.perf_counter()
+    items = await db.execute(sql, [size])
+    duration = time.perf_counter() - start
+    assert len(items) == size
+    assert items[-1].field0 == size
+    del items
+    # measure memory in a second pass because tracing slows down execution
+    gc.collect()
+    tracemalloc.start()
+    items = await db.execute(sql, [size])
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f'rowFactory={row_factory:<8} time={duration * 1000:.0f}ms memory={memory / 1024 / 1024:.1f}MB')
+    del items
+    await db.close()
+
+
+async def run(size: int):
+    with tempfile.TemporaryDirectory() as path:
+        database = join(path, 'bench.db')
+        for row_factory in ['object', 'row']:
+            await fetch(database, size, row_factory)
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    asyncio.run(run(size))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+"""Measures the time to first query of an application with and without a schema bundle
+e.g. PYTHONPATH=. python benchmarks/bench_startup.py
+"""
+import asyncio
+import tempfile
+import time
+from os.path import abspath, join, dirname
+from shutil import copytree
+from pycentroid.data import DataApplication
+from pycentroid.data.bundle import write_bundle
+
+APP_PATH = abspath(join(dirname(__file__), '../tests'))
+
+
+async def first_query(cwd: str):
+    start = time.perf_counter()
+    app = DataApplication(cwd=cwd)
+    context = app.create_context()
+    # resolve a few models and their associations before executing a query
+    items = await context.model('Order').as_queryable().expand(
+        lambda x: (x.customer,)
+    ).take(1).get_items()
+    assert len(items) == 1
+    await context.finalize()
+    return time.perf_counter() - start
+
+
+def main(iterations: int = 10):
+    with tempfile.TemporaryDirectory() as cwd:
+        copytree(join(APP_PATH, 'config'), join(cwd, 'config'))
+        # warm up imports and database
+        asyncio.run(first_query(cwd))
+        elapsed = min(asyncio.run(first_query(cwd)) for _ in range(iterations))
+        print(f'schema files:  time to first query={elapsed * 1000:.1f}ms')
+        write_bundle(DataApplication(cwd=cwd).create_context())
+        elapsed = min(asyncio.run(first_query(cwd)) for _ in range(iterations))
+        print(f'schema bundle: time to first query={elapsed * 1000:.1f}ms')
+
+
+if __name__ == '__main__':
+    main()
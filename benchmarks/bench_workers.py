@@ -0,0 +1,60 @@
+"""Measures the throughput of concurrent coroutines which execute slow queries
+with and without worker threads e.g. PYTHONPATH=. python benchmarks/bench_workers.py 8
+"""
+import asyncio
+import sys
+import time
+from os.path import abspath, join, dirname
+from pycentroid.common import AnyObject
+from pycentroid.sqlite import SqliteAdapter, SqliteWorkers
+
+DATABASE = abspath(join(dirname(__file__), '../tests/db/local.db'))
+
+# a query which keeps sqlite busy for a while
+SLOW_QUERY = 'WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n WHERE x < ?) ' \
+             'SELECT COUNT(*) AS total FROM n'
+
+
+async def run(concurrency: int, workers=None, iterations: int = 5):
+    options = AnyObject(database=DATABASE, workers=workers)
+    databases = [SqliteAdapter(options) for _ in range(concurrency)]
+
+    async def execute(db: SqliteAdapter):
+        for _ in range(iterations):
+            await db.execute(SLOW_QUERY, [200000])
+
+    async def tick(delays: list):
+        # measures how long the event loop is being blocked
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            delays.append(time.perf_counter() - start - 0.001)
+
+    lags = []
+    ticker = asyncio.create_task(tick(lags))
+    # let ticker start
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    await asyncio.gather(*[execute(db) for db in databases])
+    elapsed = time.perf_counter() - start
+    # let ticker record its last delay
+    await asyncio.sleep(0.002)
+    ticker.cancel()
+    for db in databases:
+        await db.close()
+    SqliteWorkers.shutdown_all()
+    return elapsed, max(lags, default=0)
+
+
+def main():
+    concurrency = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    queries = concurrency * 5
+    for workers in [None, 2, 4, concurrency]:
+        elapsed, lag = asyncio.run(run(concurrency, workers))
+        print(f'workers={workers or "none":<6} coroutines={concurrency} queries={queries} '
+              f'elapsed={elapsed:.3f}s throughput={queries / elapsed:.1f} queries/s '
+              f'max event loop lag={lag * 1000:.1f}ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,8 @@
 # flake8:noqa
 from .expect import Expected, expect, NoneError
 from .exceptions import DataError, NotImplementError
-from .events import SyncSeriesEventEmitter, EventSubscription, AsyncSeriesEventEmitter
+from .events import SyncSeriesEventEmitter, EventSubscription, AsyncSeriesEventEmitter, EventEmitterProperty
+from .cache import LRUCache
 from .objects import *
 from .datetime import isdatetime, year, month, day, hour, minute, second
 from .configuration import ConfigurationBase, ConfigurationStrategy, ExpectedStrategyTypeError, \
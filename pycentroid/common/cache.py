@@ -0,0 +1,57 @@
+from collections import OrderedDict
+
+
+class LRUCache:
+    """A bounded dictionary which discards the least recently used items
+    """
+
+    def __init__(self, max_size: int = 256):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.__items__ = OrderedDict()
+
+    def __len__(self):
+        return len(self.__items__)
+
+    def __contains__(self, key):
+        return key in self.__items__
+
+    def get(self, key, default=None):
+        """Returns the value of the given key, if any, and marks it as recently used
+
+        Args:
+            key: The key to search for
+            default (*, optional): A value to return if the given key does not exist
+
+        Returns:
+            The cached value or the default value
+        """
+        items = self.__items__
+        if key in items:
+            items.move_to_end(key)
+            self.hits += 1
+            return items[key]
+        self.misses += 1
+        return default
+
+    def set(self, key, value):
+        """Sets the value of the given key and discards the least recently used items, if the cache is full
+
+        Args:
+            key: The key to set
+            value (*): The value to cache
+        """
+        items = self.__items__
+        items[key] = value
+        items.move_to_end(key)
+        while len(items) > self.max_size:
+            items.popitem(last=False)
+
+    def delete(self, key):
+        self.__items__.pop(key, None)
+
+    def clear(self):
+        self.__items__.clear()
+        self.hits = 0
+        self.misses = 0
@@ -43,6 +43,8 @@ class ConfigurationBase:
     cwd = None
 
     def __init__(self, cwd=None):
+        # each configuration holds its own strategies
+        self.__strategy__ = {}
         self.cwd = cwd or join(getcwd(), 'config')
         # load configuration from file
         path = join(self.cwd, f'app.{self.__env__}.yml')
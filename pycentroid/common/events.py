@@ -1,3 +1,8 @@
+from types import MappingProxyType
+
+# an empty collection of handlers which is shared by emitters until their first subscription
+EMPTY_HANDLERS = MappingProxyType({})
+
 
 class SyncEventHandler:
     def __init__(self, handler):
@@ -19,59 +24,6 @@ class OnceSyncEventHandler(SyncEventHandler):
         self.fired = True
 
 
-class EventSubscription:
-    def __init__(self, emitter, handler):
-        self.__emitter__ = emitter
-        self.__handler__ = handler
-
-    def unsubscribe(self):
-        self.__emitter__.unsubscribe(self.__handler__.handler)
-
-
-class SyncSeriesEventEmitter:
-
-    __handlers__ = []
-
-    def __init__(self):
-        self.__handlers__ = []
-
-    def subscribe(self, handler):
-        """Appends an event handler and waits for event
-        Parameters:
-                    handler (Callable): An event handler to include
-        Returns:
-                subscription (EventSubscription): An object which represents an event subscription for later use
-        """
-        handle = SyncEventHandler(handler)
-        self.__handlers__.append(handle)
-        return EventSubscription(self, handle)
-
-    def subscribe_once(self, handler):
-        """Appends an event handler and waits for event
-        Parameters:
-                    handler (Callable): An event handler to include
-        Returns:
-                subscription (EventSubscription): An object which represents an event subscription for later use
-        """
-        handle = OnceSyncEventHandler(handler)
-        self.__handlers__.append(handle)
-        return EventSubscription(self, handle)
-
-    def unsubscribe(self, handler):
-        """Removes a previously added event handler
-
-        Args:
-            handler (SyncEventHandler): An event handler to remove
-        """
-        __handler__ = next(filter(lambda x: x.handler == handler, self.__handlers__), None)
-        if __handler__ is not None:
-            self.__handlers__.remove(__handler__)
-
-    def emit(self, *args):
-        for handler in self.__handlers__:
-            handler.execute(*args)
-
-
 class AsyncEventHandler:
     def __init__(self, handler):
         self.handler = handler
@@ -92,45 +44,136 @@ class OnceAsyncEventHandler(AsyncEventHandler):
         self.fired = True
 
 
-class AsyncSeriesEventEmitter:
+class EventSubscription:
+    def __init__(self, emitter, handler):
+        self.__emitter__ = emitter
+        self.__handler__ = handler
 
-    __handlers__ = []
+    def unsubscribe(self):
+        self.__emitter__.unsubscribe(self.__handler__)
+
+
+class SeriesEventEmitter:
+    """A base class of event emitters which execute their handlers in series.
+    Handlers are kept in an ordered dictionary, which is created on first subscription, next to an index of handles
+    by callable, so subscribing and unsubscribing a handler are direct lookups.
+    The callables which are executed while emitting an event are kept in a tuple, which is rebuilt on the next emit
+    after a change, so an emitter without handlers returns immediately
+    """
+
+    __handlers__ = EMPTY_HANDLERS
+    # the callables which are executed in order while emitting an event or None if they should be collected again
+    __compiled__ = ()
+    # the handles of event handlers by callable
+    __callables__ = EMPTY_HANDLERS
+    # the classes of event handlers
+    __handler_class__ = None
+    __once_handler_class__ = None
 
     def __init__(self):
-        self.__handlers__ = []
+        # instance attributes are looked up faster than class attributes
+        self.__handlers__ = EMPTY_HANDLERS
+        self.__compiled__ = ()
+        self.__callables__ = EMPTY_HANDLERS
+
+    def __append__(self, handle, execute):
+        if self.__handlers__ is EMPTY_HANDLERS:
+            self.__handlers__ = {}
+            self.__callables__ = {}
+        self.__handlers__[handle] = execute
+        # a callable may be subscribed more than once, so keep its handles in order
+        self.__callables__.setdefault(handle.handler, []).append(handle)
+        self.__compiled__ = None
+        return EventSubscription(self, handle)
+
+    def __compile__(self) -> tuple:
+        self.__compiled__ = tuple(self.__handlers__.values())
+        return self.__compiled__
 
     def subscribe(self, handler):
         """Appends an event handler and waits for event
         Parameters:
                     handler (Callable): An event handler to include
         Returns:
-                subscription (SyncSubscription): An object which represents an event subscription for later use
+                subscription (EventSubscription): An object which represents an event subscription for later use
         """
-        handle = AsyncEventHandler(handler)
-        self.__handlers__.append(handle)
-        return EventSubscription(self, handle)
+        # a plain handler is executed directly instead of through its wrapper
+        return self.__append__(self.__handler_class__(handler), handler)
 
     def subscribe_once(self, handler):
-        """Appends an asynchronous event handler and waits for event
+        """Appends an event handler which is going to be executed once and waits for event
         Parameters:
-                    handler (Callable): An asynchronous event handler to include
+                    handler (Callable): An event handler to include
         Returns:
-                subscription (SyncSubscription): An object which represents an event subscription for later use
+                subscription (EventSubscription): An object which represents an event subscription for later use
         """
-        handle = OnceAsyncEventHandler(handler)
-        self.__handlers__.append(handle)
-        return EventSubscription(self, handle)
+        handle = self.__once_handler_class__(handler)
+        return self.__append__(handle, handle.execute)
 
     def unsubscribe(self, handler):
-        """Removes a previously added asynchronous event handler
+        """Removes a previously added event handler
 
         Args:
-            handler (SyncEventHandler): An asynchronous event handler to remove
+            handler (SyncEventHandler | AsyncEventHandler | Callable): An event handler to remove
         """
-        __handler__ = next(filter(lambda x: x.handler == handler, self.__handlers__), None)
-        if __handler__ is not None:
-            self.__handlers__.remove(__handler__)
+        if handler in self.__handlers__:
+            handle = handler
+            handles = self.__callables__[handle.handler]
+            handles.remove(handle)
+        else:
+            handles = self.__callables__.get(handler)
+            if not handles:
+                return
+            # remove the first subscription of a callable
+            handle = handles.pop(0)
+        if len(handles) == 0:
+            del self.__callables__[handle.handler]
+        del self.__handlers__[handle]
+        self.__compiled__ = None
+
+
+class SyncSeriesEventEmitter(SeriesEventEmitter):
+
+    __handler_class__ = SyncEventHandler
+    __once_handler_class__ = OnceSyncEventHandler
+
+    def emit(self, *args):
+        compiled = self.__compiled__
+        if compiled is None:
+            compiled = self.__compile__()
+        for handler in compiled:
+            handler(*args)
+
+
+class AsyncSeriesEventEmitter(SeriesEventEmitter):
+
+    __handler_class__ = AsyncEventHandler
+    __once_handler_class__ = OnceAsyncEventHandler
 
     async def emit(self, *args):
-        for handler in self.__handlers__:
-            await handler.execute(*args)
+        compiled = self.__compiled__
+        if compiled is None:
+            compiled = self.__compile__()
+        for handler in compiled:
+            await handler(*args)
+
+
+class EventEmitterProperty:
+    """Creates the event emitter of an instance on first access, so instances which never subscribe
+    to or emit an event do not allocate it e.g. resolving_member = EventEmitterProperty(SyncSeriesEventEmitter)
+    """
+
+    def __init__(self, emitter_class):
+        self.emitter_class = emitter_class
+        self.name = None
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        emitter = self.emitter_class()
+        # the emitter is an instance attribute which takes precedence over this property from now on
+        setattr(instance, self.name, emitter)
+        return emitter
@@ -6,5 +6,8 @@ from .model import *
 from .queryable import *
 from .configuration import *
 from .loaders import *
+from .registry import *
+from .migrations import *
 from .data_types import *
 from .functions import *
+from .cache import *
@@ -0,0 +1,12 @@
+import sys
+from .bundle import main as bundle
+
+COMMANDS = {
+    'bundle': bundle
+}
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2 or sys.argv[1] not in COMMANDS:
+        print('Usage: python -m pycentroid.data bundle [cwd] [path]')
+        sys.exit(1)
+    COMMANDS[sys.argv[1]](sys.argv[2:])
@@ -0,0 +1,143 @@
+import json
+import logging
+from os.path import join, isfile, getmtime
+from pycentroid.common import ConfigurationBase
+from .types import DataContextBase
+from .loaders import SchemaLoaderStrategy, FileSchemaLoaderStrategy
+from .registry import DataModelRegistry
+
+# the version of schema bundle format
+BUNDLE_VERSION = 2
+
+
+def get_bundle_path(configuration: ConfigurationBase) -> str:
+    """Returns the path of the schema bundle of an application which may be defined by settings/schema/bundle setting
+
+    Args:
+        configuration (ConfigurationBase): The application configuration
+
+    Returns:
+        str: The path of schema bundle e.g. config/models.bundle.json
+    """
+    return configuration.get('settings/schema/bundle') or join(configuration.cwd, 'models.bundle.json')
+
+
+def get_bundle_sources(configuration: ConfigurationBase) -> dict:
+    """Returns the modification time of each schema file of an application by file name
+
+    Args:
+        configuration (ConfigurationBase): The application configuration
+
+    Returns:
+        dict: A dictionary of modification times e.g. { "Product.json": 1700000000.0 }
+    """
+    loader: SchemaLoaderStrategy = configuration.getstrategy(SchemaLoaderStrategy)
+    if not isinstance(loader, FileSchemaLoaderStrategy):
+        return {}
+    return dict(map(lambda x: (x + '.json', getmtime(join(loader.path, x + '.json'))), loader.read()))
+
+
+def compile_bundle(context: DataContextBase) -> dict:
+    """Resolves all data models which are reachable from the schema loader of the given context
+    and returns a schema bundle which holds model properties, attributes, super types, association mappings
+    and the plural flags of attributes
+
+    Args:
+        context (DataContextBase): A data context
+
+    Returns:
+        dict: A schema bundle
+    """
+    loader: SchemaLoaderStrategy = context.application.configuration.getstrategy(SchemaLoaderStrategy)
+    names = loader.read() if isinstance(loader, FileSchemaLoaderStrategy) else []
+    for name in names:
+        context.model(name)
+    models = {}
+    # models may be loaded while resolving other models e.g. base models
+    pending = loader.list()
+    while len(pending) > 0:
+        for name in pending:
+            model = context.model(name)
+            mappings = {}
+            for attribute in model.attributes:
+                try:
+                    mapping = model.infermapping(attribute.name)
+                except Exception as error:
+                    # association mapping cannot be determined e.g. an associated model is missing,
+                    # so leave it unresolved
+                    logging.debug(f'Association mapping of {name}.{attribute.name} cannot be resolved. {error}')
+                    continue
+                mappings[attribute.name] = mapping
+            models[model.properties.name] = {
+                'properties': model.properties,
+                'attributes': model.attributes,
+                'superTypes': model.get_super_types(),
+                'mappings': mappings,
+                'depends': sorted(model.definition.depends),
+                'plurals': model.definition.plurals
+            }
+        pending = [name for name in loader.list() if name not in models]
+    return {
+        'version': BUNDLE_VERSION,
+        'sources': get_bundle_sources(context.application.configuration),
+        'models': models
+    }
+
+
+def write_bundle(context: DataContextBase, path: str = None) -> str:
+    """Compiles and writes the schema bundle of the application of the given context
+
+    Args:
+        context (DataContextBase): A data context
+        path (str, optional): The path of schema bundle. If it is empty, the default bundle path will be used
+
+    Returns:
+        str: The path of schema bundle
+    """
+    path = path or get_bundle_path(context.application.configuration)
+    bundle = compile_bundle(context)
+    with open(path, 'w') as file:
+        json.dump(bundle, file)
+    return path
+
+
+def load_bundle(configuration: ConfigurationBase, path: str = None) -> bool:
+    """Loads a schema bundle, if any, and populates schema loader and data model registry of the given configuration.
+    A schema bundle is ignored while schema revalidation is enabled
+    or if any schema file has been added, removed or modified after writing it.
+
+    Args:
+        configuration (ConfigurationBase): The application configuration
+        path (str, optional): The path of schema bundle. If it is empty, the default bundle path will be used
+
+    Returns:
+        bool: True if a schema bundle has been loaded
+    """
+    if configuration.get('settings/schema/revalidate') is True:
+        return False
+    path = path or get_bundle_path(configuration)
+    if not isfile(path):
+        return False
+    with open(path, 'r') as file:
+        bundle = json.load(file)
+    if bundle.get('version') != BUNDLE_VERSION:
+        return False
+    if bundle.get('sources') != get_bundle_sources(configuration):
+        logging.warning(f'Schema bundle {path} is out of date and will be ignored. Schema files have been changed.')
+        return False
+    loader: SchemaLoaderStrategy = configuration.getstrategy(SchemaLoaderStrategy)
+    registry: DataModelRegistry = configuration.getstrategy(DataModelRegistry)
+    # models are parsed when they are requested for the first time
+    for name, item in bundle['models'].items():
+        loader.set_source(item['properties'])
+        registry.set_source(name, item)
+    return True
+
+
+def main(args: list):
+    """Compiles the schema bundle of an application e.g. python -m pycentroid.data bundle [cwd] [path]
+    """
+    from .application import DataApplication
+    app = DataApplication(cwd=args[0] if len(args) > 0 else None)
+    path = write_bundle(app.create_context(), args[1] if len(args) > 1 else None)
+    print(f'Schema bundle has been written to {path}')
@@ -0,0 +1,104 @@
+import sys
+import time
+from typing import List, Iterable
+from pycentroid.common import LRUCache
+
+
+def sizeof(results: List[object]) -> int:
+    """Returns the estimated memory size of the given query results in bytes
+    """
+    size = sys.getsizeof(results)
+    for result in results:
+        size += sys.getsizeof(result)
+        values = getattr(result, '__dict__', None)
+        if values is not None:
+            size += sys.getsizeof(values)
+            size += sum(map(sys.getsizeof, values.values()))
+    return size
+
+
+class DataResultCache(LRUCache):
+    """A cache of query results which discards the least recently used results,
+    if the estimated memory size of cached results exceeds a limit.
+    Each result is tagged by the names of the data models which have been used by its query,
+    so it is discarded when one of them changes.
+    """
+
+    def __init__(self, max_memory: int = 32 * 1024 * 1024):
+        """Creates a cache of query results
+
+        Args:
+            max_memory (int, optional): The maximum memory size of cached results in bytes
+        """
+        super().__init__()
+        self.max_memory = max_memory
+        # the estimated memory size of cached results
+        self.memory = 0
+        # a collection of keys by tag
+        self.__tags__ = {}
+
+    def get(self, key, default=None):
+        """Returns the cached results of the given key, if any and if they have not been expired
+        """
+        items = self.__items__
+        item = items.get(key)
+        if item is None:
+            self.misses += 1
+            return default
+        expires, results, size, tags = item
+        if expires <= time.monotonic():
+            self.delete(key)
+            self.misses += 1
+            return default
+        items.move_to_end(key)
+        self.hits += 1
+        return results
+
+    def set(self, key, value: List[object], ttl: float = 60, tags: Iterable[str] = None):
+        """Caches the given results
+
+        Args:
+            key: The key of the results e.g. a tuple of a database, a statement and its parameters
+            value (List[object]): The results to cache
+            ttl (float, optional): The number of seconds after which the results expire
+            tags (Iterable[str], optional): The names of the data models which have been used by the query
+        """
+        size = sizeof(value)
+        if size > self.max_memory:
+            return
+        self.delete(key)
+        tags = frozenset(tags or ())
+        self.__items__[key] = (time.monotonic() + ttl, value, size, tags)
+        self.memory += size
+        for tag in tags:
+            self.__tags__.setdefault(tag, set()).add(key)
+        # discard the least recently used results
+        while self.memory > self.max_memory:
+            self.delete(next(iter(self.__items__)))
+
+    def delete(self, key):
+        item = self.__items__.pop(key, None)
+        if item is None:
+            return
+        _, _, size, tags = item
+        self.memory -= size
+        for tag in tags:
+            keys = self.__tags__.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if len(keys) == 0:
+                    del self.__tags__[tag]
+
+    def invalidate(self, tag: str):
+        """Discards the results which have been tagged by the given data model name
+
+        Args:
+            tag (str): The name of a data model
+        """
+        for key in list(self.__tags__.get(tag, ())):
+            self.delete(key)
+
+    def clear(self):
+        super().clear()
+        self.__tags__.clear()
+        self.memory = 0
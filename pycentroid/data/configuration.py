@@ -3,6 +3,8 @@ from pycentroid.common import ConfigurationBase, ConfigurationStrategy, Applicat
 import importlib
 from .loaders import SchemaLoaderStrategy, DefaultSchemaLoaderStrategy
 from .data_types import DataTypes
+from .registry import DataModelRegistry
+from .bundle import load_bundle
 
 
 class DataAdapters(ConfigurationStrategy):
@@ -65,4 +67,8 @@ class DataConfiguration(ConfigurationBase):
         self.usestrategy(DataTypes)
         # use DefaultSchemaLoaderStrategy
         self.usestrategy(SchemaLoaderStrategy, DefaultSchemaLoaderStrategy)
+        # use DataModelRegistry
+        self.usestrategy(DataModelRegistry)
+        # load pre-resolved data models, if any
+        load_bundle(self)
 
@@ -15,6 +15,8 @@ class DataContext(DataContextBase):
         super().__init__()
         self.application = application
         self.__db__ = None
+        # data models are created once per data context
+        self.__models__ = {}
 
     @property
     @abstractmethod
@@ -22,15 +24,21 @@ class DataContext(DataContextBase):
         pass
 
     def model(self, m) -> DataModel:
+        model = self.__models__.get(m)
+        if model is not None:
+            return model
         # get data model properties
         configuration: DataConfiguration = self.application.services.get(DataConfiguration)
         properties = configuration.getstrategy(SchemaLoaderStrategy).get(m)
         # validate existence
         expect(properties).to_be_truthy(Exception(f'{m} cannot be found.'))
-        return DataModel(context=self, properties=properties)
+        model = DataModel(context=self, properties=properties)
+        self.__models__[m] = model
+        return model
 
     async def finalize(self):
         if self.__db__ is not None:
+            # close database connection or return it to connection pool, if any
             await self.__db__.close()
 
     def execute_in_transaction(self, func: Callable):
@@ -61,6 +69,8 @@ class NamedDataContext(DataContext):
         expect(AdapterClass).to_be_truthy(Exception('Data adapter has not been set.'))
         # create instance
         self.__db__ = AdapterClass(adapter.options)
+        # set adapter name in order to share resources like connection pools
+        self.__db__.name = adapter.name
         return self.__db__
 
 
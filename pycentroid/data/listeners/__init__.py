@@ -1,5 +1,6 @@
 # flake8:noqa
 from .expand import ExecuteEventArgs, ExpandListener
+from .cache import CacheListener
 from .validator import DataValidator, AsyncDataValidator, MinLengthValidator, MaxLengthValidator, MinValueValidator, \
     MaxValueValidator, ValidationError, PatternValidator, RangeValidator,\
         DataTypeValidator, ValidationListener, RequiredValidator
\ No newline at end of file
@@ -0,0 +1,23 @@
+from ..queryable import DataQueryable
+from ..types import DataModelBase, DataEventArgs
+
+
+class CacheListener:
+    """Discards the cached query results of a data model when an item of the data model is saved or removed
+    """
+
+    @staticmethod
+    async def after_save(event: DataEventArgs):
+        CacheListener.invalidate(event.model)
+
+    @staticmethod
+    async def after_remove(event: DataEventArgs):
+        CacheListener.invalidate(event.model)
+
+    @staticmethod
+    def invalidate(model: DataModelBase):
+        name = model.properties.name
+        results = DataQueryable.__results__
+        results.invalidate(name)
+        # results which are cached by other queries until the current transaction ends may be stale
+        model.context.db.after_transaction(lambda committed: results.invalidate(name))
@@ -1,5 +1,6 @@
+from typing import Callable
 from pycentroid.common import expect, DataError
-from pycentroid.query import JOIN_DIRECTION, QueryExpression, QueryField, QueryEntity
+from pycentroid.query import QueryExpression, QueryField, QueryEntity
 from ..queryable import DataQueryable
 from ..types import DataModelBase, ExecuteEventArgs, DataFieldAssociationMapping, DataAssociationType
 
@@ -23,8 +24,9 @@ class ExpandListener:
         attributes = list(filter(lambda x: x.expandable is True, event.model.attributes))
         for attribute in attributes:
             found = next(filter(lambda x: x.__collection__.collection == attribute.name, expands), None)
-            if found is None and query.__select__[attribute.name] == 1:
+            if found is None and query.__select__.get(attribute.name) == 1:
                 expands.append(QueryExpression(collection=attribute.name))
+        results = event.results if isinstance(event.results, list) else [event.results]
         for expand in expands:
             # get attribute from expand collection
             attribute = model.getattr(expand.__collection__.collection)
@@ -40,52 +42,50 @@ class ExpandListener:
                 if attribute.many is True:
                     # get associated model
                     child_model = model.context.model(attribute.type)
-                    # get current query in order to use it as sub-query in join expression
-                    join_query = query
-                    # query children after joining collection with current query
-                    children = await child_model.as_queryable().distinct().join(join_query, 'q0').on(
-                        QueryExpression().where(
-                            QueryField(mapping.childField)
-                        ).equal(
-                            QueryField(mapping.parentField).from_collection('q0')
+                    child_entity = QueryEntity(child_model.properties.get_view())
+                    child_collection = child_entity.alias or child_entity.collection
+
+                    q = ExpandListener.select_attributes(child_model)
+                    # keep child field as a reference because it may be expanded as an object
+                    q.__select__.update(
+                        QueryField(mapping.childField).from_collection(child_collection).asattr('__ref__')
+                    )
+
+                    def children_of(values: list):
+                        return q.clone().where(
+                            QueryField(mapping.childField).from_collection(child_collection)
+                        ).in_list(values)
+
+                    # query children of current items
+                    children = await ExpandListener.fetch(
+                        children_of, ExpandListener.values_of(results, mapping.parentField), model
                         )
-                    ).get_items()
-                    if isinstance(event.results, list):
-                        # copy children to its parent
-                        for result in event.results:
-                            # get parent
-                            value = getattr(result, mapping.parentField)
-                            # filter children
-                            items = list(filter(lambda x: getattr(x, mapping.childField) == value, children))
-                            # and set property value (an array of items)
-                            # todo: copy items before set (needs analysis)
-                            setattr(result, attribute.name, items)
+                    groups = ExpandListener.group_by_ref(children)
+                    # copy children to its parent
+                    for result in results:
+                        # get parent
+                        value = getattr(result, mapping.parentField)
+                        # and set property value (an array of items)
+                        setattr(result, attribute.name, groups.get(value, []))
                 # many-to-one
                 else:
                     # get parent model
                     parent_model = model.context.model(attribute.type)
-                    # get current query
-                    join_query = query
-                    # todo: optimize sub-query
-                    parents = await parent_model.as_queryable().distinct().join(join_query, 'q0').on(
-                        QueryExpression().where(
-                            QueryField(mapping.parentField).from_collection(parent_model.properties.get_view())
-                        ).equal(
-                            QueryField(mapping.childField).from_collection('q0')
-                        )
-                    ).get_items()
-                    if isinstance(event.results, list):
-                        for result in event.results:
-                            # get parent
-                            value = getattr(result, mapping.childField)
-                            parent = next(filter(lambda x: getattr(x, mapping.parentField) == value, parents), None)
-                            # and set property value
-                            # todo: copy items before set (needs analysis)
-                            setattr(result, attribute.name, parent)
+                    # query parents of current items
+                    q = parent_model.as_queryable()
+                    parents = await ExpandListener.fetch(
+                        lambda values: q.clone().where(mapping.parentField).in_list(values),
+                        ExpandListener.values_of(results, mapping.childField),
+                        model
+                    )
+                    parents_by_key = dict(map(lambda x: (getattr(x, mapping.parentField), x), parents))
+                    for result in results:
+                        # get parent
+                        value = getattr(result, mapping.childField)
+                        # and set property value
+                        setattr(result, attribute.name, parents_by_key.get(value))
 
             elif mapping.associationType == DataAssociationType.JUNCTION:
-                # get current query
-                join_query = query
                 if mapping.parentModel == event.model.properties.name:
                     # get child model
                     child_model = model.context.model(attribute.type)
@@ -95,43 +95,37 @@ class ExpandListener:
                     junction_entity = QueryEntity(mapping.associationAdapter, alias='_' + attribute.name + '_')
                     # get child collection
                     child_collection = child_entity.alias or child_entity.collection
+
                     # prepare query
-                    q = child_model.as_queryable().select(
-                        *list(map(lambda x: x.name, filter(lambda x: x.many is not True, child_model.attributes)))
-                        )
+                    q = ExpandListener.select_attributes(child_model)
                     q.__select__.update(
                         QueryField(mapping.associationObjectField).from_collection(junction_entity.alias).asattr('__ref__')  # noqa:E501
                         )
-                    # q.__select__.update({
-                    #     '__object__' : f'${junction_entity.alias}.{mapping.associationObjectField}'
-                    # })
-                    # add attribute
-                    children = await q.join(
-                        junction_entity, direction=JOIN_DIRECTION.LEFT
+                    q.join(
+                        junction_entity
                     ).on(
                         QueryExpression().where(
                             QueryField(mapping.childField).from_collection(child_collection)
                         ).equal(
                             QueryField(mapping.associationValueField).from_collection(junction_entity.alias)
                             )
-                    ).join(join_query, 'q0').on(
-                        QueryExpression().where(
-                            QueryField(mapping.parentField).from_collection('q0')
-                        ).equal(
+                    )
+
+                    def children_of(values: list):
+                        return q.clone().where(
                             QueryField(mapping.associationObjectField).from_collection(junction_entity.alias)
-                            )
-                    ).get_items()
-                    if isinstance(event.results, list):
-                        # copy children to its parent
-                        for result in event.results:
-                            # get parent
-                            value = getattr(result, mapping.parentField)
-                            # filter children
-                            items = list(filter(lambda x: getattr(x, '__ref__') == value, children))
-                            for item in items:
-                                delattr(item, '__ref__')
-                            # and set property value (an array of items)
-                            setattr(result, attribute.name, items)
+                        ).in_list(values)
+
+                    children = await ExpandListener.fetch(
+                        children_of, ExpandListener.values_of(results, mapping.parentField), model
+                        )
+                    groups = ExpandListener.group_by_ref(children)
+                    # copy children to its parent
+                    for result in results:
+                        # get parent
+                        value = getattr(result, mapping.parentField)
+                        # and set property value (an array of items)
+                        setattr(result, attribute.name, groups.get(value, []))
                 elif mapping.childModel == event.model.properties.name:
                     # get child model
                     parent_model = model.context.model(attribute.type)
@@ -141,38 +135,87 @@ class ExpandListener:
                     junction_entity = QueryEntity(mapping.associationAdapter, alias='_' + attribute.name + '_')
                     # get child collection
                     parent_collection = parent_entity.alias or parent_entity.collection
+
                     # prepare query
-                    q = parent_model.as_queryable().select(
-                        *list(map(lambda x: x.name, filter(lambda x: x.many is not True, parent_model.attributes)))
-                        )
+                    q = ExpandListener.select_attributes(parent_model)
                     q.__select__.update(
                         QueryField(mapping.associationValueField).from_collection(junction_entity.alias).asattr('__ref__')  # noqa:E501
                         )
-                    # add attribute
-                    parents = await q.join(
-                        junction_entity, direction=JOIN_DIRECTION.LEFT
+                    q.join(
+                        junction_entity
                     ).on(
                         QueryExpression().where(
                             QueryField(mapping.parentField).from_collection(parent_collection)
                         ).equal(
                             QueryField(mapping.associationObjectField).from_collection(junction_entity.alias)
                             )
-                    ).join(join_query, 'q0').on(
-                        QueryExpression().where(
-                            QueryField(mapping.childField).from_collection('q0')
-                        ).equal(
+                    )
+
+                    def parents_of(values: list):
+                        return q.clone().where(
                             QueryField(mapping.associationValueField).from_collection(junction_entity.alias)
-                            )
-                    ).get_items()
-                    if isinstance(event.results, list):
-                        # copy children to its parent
-                        for result in event.results:
-                            # get parent
-                            value = getattr(result, mapping.childField)
-                            # filter children
-                            items = list(filter(lambda x: hasattr(x, '__ref__') and getattr(x, '__ref__') == value, parents))  # noqa:E501
-                            for item in items:
-                                delattr(item, '__ref__')
-                            # and set property value (an array of items)
-                            # todo: copy items before set (needs analysis)
-                            setattr(result, attribute.name, items)
+                        ).in_list(values)
+
+                    parents = await ExpandListener.fetch(
+                        parents_of, ExpandListener.values_of(results, mapping.childField), model
+                        )
+                    groups = ExpandListener.group_by_ref(parents)
+                    # copy parents to its child
+                    for result in results:
+                        # get child
+                        value = getattr(result, mapping.childField)
+                        # and set property value (an array of items)
+                        setattr(result, attribute.name, groups.get(value, []))
+
+    @staticmethod
+    def select_attributes(model: DataModelBase) -> DataQueryable:
+        return model.as_queryable().select(
+            *list(map(lambda x: x.name, filter(lambda x: x.many is not True, model.attributes)))
+            )
+
+    @staticmethod
+    def values_of(results: list, name: str) -> list:
+        """Returns the distinct non-empty values of the given attribute
+        """
+        values = {}
+        for result in results:
+            value = getattr(result, name, None)
+            if value is not None:
+                values[value] = True
+        return list(values.keys())
+
+    @staticmethod
+    def group_by_ref(items: list) -> dict:
+        """Groups the given items by their __ref__ attribute which is removed
+        """
+        groups = {}
+        for item in items:
+            value = getattr(item, '__ref__')
+            delattr(item, '__ref__')
+            group = groups.get(value)
+            if group is None:
+                groups[value] = [item]
+            else:
+                group.append(item)
+        return groups
+
+    @staticmethod
+    async def fetch(query_of: Callable[[list], DataQueryable], values: list, model: DataModelBase) -> list:
+        """Executes a query for each chunk of the given values which fits to the maximum number of query parameters
+
+        Args:
+            query_of (Callable): A callable which returns a query that filters items by a list of values
+                e.g. a clone of a base query which is prepared once
+            values (list): The values to query
+            model (DataModelBase): The model of the items which are being expanded
+
+        Returns:
+            list: The collection of items
+        """
+        items = []
+        if len(values) == 0:
+            return items
+        size = model.context.db.max_parameters
+        for index in range(0, len(values), size):
+            items.extend(await query_of(values[index:index + size]).get_items())
+        return items
@@ -3,33 +3,77 @@ from abc import abstractmethod
 from inspect import isclass
 from pycentroid.common import ConfigurationStrategy
 from typing import List
-from os.path import abspath, join, isfile, splitext
+from os.path import abspath, join, isfile, splitext, getmtime
 from os import listdir
-import re
 import importlib
 from .types import DataModelProperties
+from .registry import DataModelRegistry
+
+
+def copy_properties(value):
+    """Returns a deep copy of the given schema properties which consist of dictionaries, lists and constant values.
+    Dictionaries keep their class e.g. DataModelProperties or AnyDict without being initialized again.
+    """
+    if isinstance(value, dict):
+        result = value.__class__.__new__(value.__class__)
+        dict.update(result, {key: copy_properties(item) for key, item in value.items()})
+        return result
+    if isinstance(value, list):
+        return [copy_properties(item) for item in value]
+    return value
 
 
 class SchemaLoaderStrategy(ConfigurationStrategy):
-    __models__: dict = {}
-    loaded: dict = {}
+    __models__: dict
 
     def __init__(self, configuration):
         super().__init__(configuration)
+        # a dictionary of data models by case-folded name
+        self.__models__ = {}
+        # a dictionary of unparsed data models by case-folded name e.g. the models of a schema bundle
+        self.__sources__ = {}
 
     def get(self, name: str):
-        if name in self.__models__:
-            return self.__models__[name].copy()
-        return None
+        """Returns a copy of the properties of the given data model, so a caller may change them
+        without changing the models of this loader
+
+        Args:
+            name (str): The name of a data model
+
+        Returns:
+            DataModelProperties: The properties of the data model or None if it cannot be found
+        """
+        model = self.__find__(name)
+        return copy_properties(model) if model is not None else None
+
+    def __find__(self, name: str):
+        # returns the shared properties of the given data model, if any
+        return self.__models__.get(name.casefold()) or self.__get_source__(name.casefold())
+
+    def __get_source__(self, key: str):
+        source = self.__sources__.pop(key, None)
+        if source is None:
+            return None
+        model = DataModelProperties(**source)
+        self.set(model)
+        return model
+
+    def set_source(self, source: dict):
+        """Sets an unparsed data model which is going to be parsed when it is requested for the first time
+
+        Args:
+            source (dict): A dictionary which represents the properties of a data model
+        """
+        self.__sources__[source['name'].casefold()] = source
 
     def set(self, model):
         name = model['name']
         self.__models__.update({
-            name: model
+            name.casefold(): model
         })
 
     def list(self) -> List[str]:
-        return list(self.__models__.keys())
+        return list(map(lambda x: x['name'], list(self.__models__.values()) + list(self.__sources__.values())))
 
     @abstractmethod
     def read(self):
@@ -44,6 +88,10 @@ class FileSchemaLoaderStrategy(SchemaLoaderStrategy):
     def __init__(self, configuration):
         super().__init__(configuration)
         self.path = abspath(join(configuration.cwd, 'models'))
+        # check the modification time of schema files on every lookup e.g. while developing
+        self.revalidate = configuration.get('settings/schema/revalidate') is True
+        # the path and the modification time of each loaded schema file by case-folded name
+        self.__mtimes__ = {}
 
     def read(self):
         items = listdir(self.path)
@@ -55,32 +103,51 @@ class FileSchemaLoaderStrategy(SchemaLoaderStrategy):
                     results.append(name)
         return results
 
-    def get(self, name: str) -> DataModelProperties:
-        if self.__items__ is None:
-            self.__items__ = self.read()
-        # case-insensitive search
-        matcher = re.compile(f'^{name}$', re.IGNORECASE)
-        item = next(filter(matcher.match, self.__items__), None)
+    def __find__(self, name: str) -> DataModelProperties:
+        key = name.casefold()
+        result = self.__models__.get(key) or self.__get_source__(key)
+        if result is not None:
+            if self.revalidate is False or key not in self.__mtimes__:
+                return result
+            # reload schema if file has been modified or removed
+            path, mtime = self.__mtimes__[key]
+            if isfile(path) and getmtime(path) == mtime:
+                return result
+            self.__items__ = None
+            self.__models__.pop(key, None)
+            self.__mtimes__.pop(key, None)
+            # and remove resolved definitions of this model
+            registry = self.configuration.getstrategy(DataModelRegistry)
+            if registry is not None:
+                registry.invalidate(result['name'])
+        if self.__items__ is None or (self.revalidate is True and key not in self.__items__):
+            # index schema files by case-folded name
+            self.__items__ = dict(map(lambda x: (x.casefold(), x), self.read()))
+        item = self.__items__.get(key)
         result = None
         if item is not None:
             # get schema
-            with open(join(self.path, item + '.json'), 'r') as file:
+            path = join(self.path, item + '.json')
+            with open(path, 'r') as file:
                 # load file
                 d = json.load(file)
                 result = DataModelProperties(**d)
-                # set model
-                self.set(result)
+            # set model
+            self.set(result)
+            self.__models__[key] = result
+            self.__mtimes__[key] = (path, getmtime(path))
         # and return definition
         return result
 
 
 class DefaultSchemaLoaderStrategy(FileSchemaLoaderStrategy):
 
-    loaders = []
+    loaders: list
 
     def __init__(self, configuration):
         super().__init__(configuration)
         self.path = abspath(join(configuration.cwd, 'models'))
+        self.loaders = []
         # enumerate loaders
         loaders = configuration.get('settings/schema/loaders')
         if type(loaders) is list:
@@ -100,8 +167,8 @@ class DefaultSchemaLoaderStrategy(FileSchemaLoaderStrategy):
                         loader['loaderClass'] = LoaderClass
                         self.loaders.append(LoaderClass(configuration))
 
-    def get(self, name: str) -> DataModelProperties | None:
-        model = super().get(name)
+    def __find__(self, name: str) -> DataModelProperties | None:
+        model = super().__find__(name)
         if model is not None:
             return model
         for loader in self.loaders:
@@ -0,0 +1,148 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import List
+from weakref import WeakKeyDictionary
+from .types import DataModelBase, DataContextBase
+from .loaders import SchemaLoaderStrategy
+
+
+class DataModelMigrations:
+    """A process-wide state of data models which have been already verified or upgraded against a database.
+    A data model is checked once per database and version, so the upgrade of a data model
+    does not cost anything after the first check.
+    """
+
+    # a collection of verified data models keyed by database, model name and version
+    __done__: dict = {}
+    # a collection of data models which have been verified or upgraded inside a transaction
+    # and are going to be marked as done when the transaction is committed
+    __pending__: WeakKeyDictionary = WeakKeyDictionary()
+    # a collection of locks which serialize the concurrent checks of a data model keyed by event loop,
+    # because a lock cannot be shared by different event loops e.g. of different threads
+    __locks__: WeakKeyDictionary = WeakKeyDictionary()
+    # the number of checks which have been skipped because a data model has been already verified
+    hits = 0
+    # the number of checks which have queried the database
+    misses = 0
+    # the number of tables which have been created or altered
+    upgrades = 0
+
+    @staticmethod
+    def key(db, name: str, version: str = None) -> tuple:
+        """Returns a key which identifies a database object e.g. the table of a data model
+
+        Args:
+            db (DataAdapterBase): A data adapter
+            name (str): The name of a data model or a database object
+            version (str, optional): The version of a data model
+
+        Returns:
+            tuple: A key which identifies the given object in the given database
+        """
+        options = getattr(db, 'options', None)
+        database = getattr(options, 'database', None) if options is not None else None
+        return db.__class__, db.name, database, name, version
+
+    @staticmethod
+    def key_of(model: DataModelBase) -> tuple:
+        """Returns a key which identifies the given data model in the database of its context
+        """
+        return DataModelMigrations.key(model.context.db, model.properties.name, model.properties.version)
+
+    @staticmethod
+    def is_done(key: tuple, db=None) -> bool:
+        """Returns True if the given object has been already verified or upgraded
+
+        Args:
+            key (tuple): A key which identifies a database object
+            db (DataAdapterBase, optional): A data adapter which may hold objects that have been upgraded
+                inside a transaction in progress
+        """
+        if key in DataModelMigrations.__done__ or (
+                db is not None and key in DataModelMigrations.__pending__.get(db, ())):
+            DataModelMigrations.hits += 1
+            return True
+        return False
+
+    @staticmethod
+    def done(key: tuple, db=None):
+        """Marks the given object as verified or upgraded. If a data adapter is given,
+        the object is marked as done when the current transaction of the data adapter is committed.
+
+        Args:
+            key (tuple): A key which identifies a database object
+            db (DataAdapterBase, optional): A data adapter
+        """
+        if db is None:
+            DataModelMigrations.__done__[key] = True
+            return
+        pending = DataModelMigrations.__pending__.get(db)
+        if pending is not None:
+            # transaction end has been already registered
+            pending.add(key)
+            return
+        DataModelMigrations.__pending__[db] = {key}
+
+        def end_transaction(committed: bool):
+            keys = DataModelMigrations.__pending__.pop(db, set())
+            if committed is True:
+                for item in keys:
+                    DataModelMigrations.done(item)
+
+        db.after_transaction(end_transaction)
+
+    @staticmethod
+    @asynccontextmanager
+    async def lock(key: tuple):
+        """Acquires a lock which is used for checking the given object by one coroutine at a time
+        e.g. async with DataModelMigrations.lock(key): ...
+        The lock is removed when it is released by the last coroutine which uses it, even if the check fails.
+
+        Args:
+            key (tuple): A key which identifies a database object
+        """
+        locks = DataModelMigrations.__locks__.setdefault(asyncio.get_running_loop(), {})
+        # a lock and the number of coroutines which hold it or wait for it
+        lock, count = locks.get(key, (None, 0))
+        if lock is None:
+            lock = asyncio.Lock()
+        locks[key] = (lock, count + 1)
+        try:
+            async with lock:
+                yield
+        finally:
+            lock, count = locks[key]
+            if count == 1:
+                del locks[key]
+            else:
+                locks[key] = (lock, count - 1)
+
+    @staticmethod
+    async def migrate(context: DataContextBase, names: List[str] = None, dry_run: bool = False) -> List[str]:
+        """Verifies or upgrades the given data models, or all the data models of the schema loader, in one pass
+        e.g. while an application starts
+
+        Args:
+            context (DataContextBase): A data context
+            names (List[str], optional): The names of data models to migrate
+            dry_run (bool, optional): If it is true, the statements of the upgrade are returned but not executed
+
+        Returns:
+            List[str]: The statements of the upgrade
+        """
+        from .upgrade import DataModelUpgrade
+        if names is None:
+            loader: SchemaLoaderStrategy = context.application.configuration.getstrategy(SchemaLoaderStrategy)
+            names = loader.read()
+        return await DataModelUpgrade.upgrade_many(context, list(map(lambda x: context.model(x), names)), dry_run)
+
+    @staticmethod
+    def reset():
+        """Clears migration state and counters e.g. after dropping database objects
+        """
+        DataModelMigrations.__done__.clear()
+        DataModelMigrations.__pending__.clear()
+        DataModelMigrations.__locks__.clear()
+        DataModelMigrations.hits = 0
+        DataModelMigrations.misses = 0
+        DataModelMigrations.upgrades = 0
@@ -1,5 +1,5 @@
 from typing import List
-from .types import DataContextBase, DataModelBase, DataField, DataModelProperties,\
+from .types import DataContextBase, DataModelBase, DataModelAttribute, DataModelProperties,\
     UpgradeEventArgs, DataEventArgs, DataObjectState, ExecuteEventArgs, DataFieldAssociationMapping
 from .queryable import DataQueryable
 from .configuration import DataConfiguration
@@ -8,8 +8,13 @@ from pydash import assign
 from pycentroid.query import QueryExpression, QueryEntity
 from pycentroid.common import DataError, expect, AnyDict
 from .upgrade import DataModelUpgrade
+from .migrations import DataModelMigrations
+from .registry import DataModelRegistry, DataModelDefinition
 from .listeners.expand import ExpandListener
 from .listeners.validator import ValidationListener
+from .listeners.cache import CacheListener
+from itertools import groupby
+from copy import copy
 import inflect
 import re
 
@@ -41,50 +46,86 @@ def is_plural(text: str) -> bool:
     return p == text
 
 
-class DataModelAttribute(DataField):
-    model: str
-
-
 class DataModel(DataModelBase):
 
     __silent__ = False
-    __attributes__: List[DataModelAttribute]
+    # the maximum number of rows of a multi-row insert statement
+    __insert_batch_size__ = 500
 
     def __init__(self, context: DataContextBase = None, properties: DataModelProperties = None, **kwargs):
         super().__init__(context, properties)
+        self.__registry__ = None
         self.before.upgrade.subscribe(DataModelUpgrade.before)
         self.after.upgrade.subscribe(DataModelUpgrade.after)
         # append execute listeners
         self.after.execute.subscribe(ExpandListener.after_execute)
         self.before.save.subscribe(ValidationListener.before_save)
+        # discard cached query results
+        self.after.save.subscribe(CacheListener.after_save)
+        self.after.remove.subscribe(CacheListener.after_remove)
 
     def silent(self, value: bool = True):
-        self.__silent__ = value
-        return self
+        # data models are shared in a data context, so use a copy of this model
+        model = copy(self)
+        model.__silent__ = value
+        return model
 
     def base(self) -> DataModelBase | None:
         if self.properties is not None and self.properties.inherits is not None:
             return self.context.model(self.properties.inherits)
         return None
 
+    @property
+    def definition(self) -> DataModelDefinition:
+        """Returns the resolved definition of this model which is shared across data contexts
+        """
+        if self.__registry__ is None:
+            configuration: DataConfiguration = self.context.application.services.get(DataConfiguration)
+            self.__registry__ = configuration.getstrategy(DataModelRegistry)
+        return self.__registry__.get(self.properties.name)
+
+    def __resolve__(self) -> DataModelDefinition:
+        definition = self.definition
+        if definition.attributes is None:
+            attributes = self.__resolve_attributes__()
+            definition.index = dict(map(lambda x: (x.name, x), attributes))
+            definition.key = next(filter(lambda x: x.primary is True, attributes), None)
+            definition.attributes = attributes
+        return definition
+
     @property
     def attributes(self) -> List[DataModelAttribute]:
-        if hasattr(self, '__attributes__'):
-            return self.__attributes__
+        return self.__resolve__().attributes
+
+    def key(self):
+        return self.__resolve__().key
+
+    def get_attribute(self, name: str):
+        return self.__resolve__().index.get(name)
+
+    def getattr(self, name: str):
+        return self.__resolve__().index.get(name)
+
+    def __resolve_attributes__(self) -> List[DataModelAttribute]:
+        # important note: attributes of other models are shared, so they should be copied before any change
         base_model = self.base()
         attributes: List[DataModelAttribute] = []
         if base_model is not None:
-            attributes = base_model.attributes
+            self.definition.depends.add(base_model.properties.name)
+            attributes = list(base_model.attributes)
             # get base model key
             key = base_model.key()
             # if it's an auto increment identity
             if key.type == 'Counter':
                 # revert type to int
-                attr = next(filter(lambda x: x.name == key.name, attributes), None)
-                attr.type = 'Integer'
+                index = attributes.index(key)
+                attributes[index] = assign(DataModelAttribute(**key), {
+                    'type': 'Integer'
+                })
         else:
             implements = self.context.model(self.properties.implements)if self.properties.implements is not None else None  # noqa:E501
             if implements is not None:
+                self.definition.depends.add(implements.properties.name)
                 attributes = list(map(lambda x: assign(DataModelAttribute(**x), {
                     'model': self.properties.name
                 }), implements.attributes))
@@ -93,17 +134,23 @@ class DataModel(DataModelBase):
             if found is None:
                 attr = DataModelAttribute(**field, model=self.properties.name)
             else:
-                clone = assign(found, field)
+                clone = assign(DataModelAttribute(**found), field)
                 attr = DataModelAttribute(**clone)
                 attributes.remove(found)
             # # check many attribute
-            if attr.many is None and is_plural(attr.name):
+            if attr.many is None and self.__is_plural__(attr.name):
                 attr.many = True
             if attr.many is None and attr.multiplicity == 'ZeroOrOne':
                 attr.many = True
             attributes.append(attr)
-        self.__attributes__ = attributes
-        return self.__attributes__
+        return attributes
+
+    def __is_plural__(self, name: str) -> bool:
+        plurals = self.definition.plurals
+        plural = plurals.get(name)
+        if plural is None:
+            plural = plurals[name] = is_plural(name)
+        return plural
 
     def as_queryable(self):
         return DataQueryable(self)
@@ -115,14 +162,30 @@ class DataModel(DataModelBase):
         return DataQueryable(self).find(obj)
 
     def get_super_types(self) -> List[str]:
-        results = []
-        model = self.base()
-        while model is not None:
-            results.append(model.properties.name)
-            model = model.base()
-        return results
+        definition = self.definition
+        if definition.super_types is None:
+            results = []
+            model = self.base()
+            while model is not None:
+                results.append(model.properties.name)
+                model = model.base()
+            definition.super_types = results
+        return definition.super_types
 
     def infermapping(self, name: str) -> DataFieldAssociationMapping | None:
+        mappings = self.definition.mappings
+        if name in mappings:
+            return mappings[name]
+        mapping = self.__infermapping__(name)
+        if mapping is not None:
+            # association mappings depend on associated models
+            for model in [mapping.parentModel, mapping.childModel]:
+                if model is not None and model != self.properties.name:
+                    self.definition.depends.add(model)
+        mappings[name] = mapping
+        return mapping
+
+    def __infermapping__(self, name: str) -> DataFieldAssociationMapping | None:
         attribute: DataModelAttribute = self.getattr(name)
         expect(attribute).to_be_truthy(
             DataError(message='Attribute not found.', model=self.properties.name, field=name, code='ERR_ATTR')
@@ -232,7 +295,16 @@ class DataModel(DataModelBase):
                 raise DataError('Association mapping cannot be determined due to multiple associations')
         return None
 
+    @property
+    def upgraded(self) -> bool:
+        """Returns True if this model has been already verified or upgraded against the database of current context
+        """
+        return DataModelMigrations.is_done(DataModelMigrations.key_of(self), self.context.db)
+
     async def migrate(self):
+        if self.upgraded:
+            return
+
         async def execute():
             await self.before.upgrade.emit(UpgradeEventArgs(model=self))
         await self.context.execute_in_transaction(execute)
@@ -260,7 +332,7 @@ class DataModel(DataModelBase):
 
             async def remove_one():
                 # infer state
-                item = await self.silent().find(o)
+                item = await self.silent().find(o).get_item()
                 if item is not None:
                     # emit before remove event
                     event = DataEventArgs(model=self, state=DataObjectState.DELETE, target=item)
@@ -280,8 +352,8 @@ class DataModel(DataModelBase):
                     await self.context.db.execute(query)
                     # raise after execute event
                     await self.after.execute.emit(execute_event)
-                    # emit after remove query
-                    await self.before.remove.emit(event)
+                    # emit after remove event
+                    await self.after.remove.emit(event)
                     # get base model
                     base = self.base()
                     if base is not None:
@@ -367,6 +439,55 @@ class DataModel(DataModelBase):
 
         await self.context.execute_in_transaction(execute)
 
+    async def __insert_many__(self, items: List[object]):
+
+        async def execute():
+            # ensure that current model has been upgraded once
+            await self.migrate()
+            # get base model
+            base = self.base()
+            if base is not None:
+                await base.insert(items)
+            # emit before save event for each item
+            events = []
+            for item in items:
+                event = DataEventArgs(model=self, state=DataObjectState.INSERT, target=item)
+                await self.before.save.emit(event)
+                events.append(event)
+            collection = QueryEntity(self.properties.get_source())
+            key = self.key()
+            db = self.context.db
+            # group consecutive items by column set (and null values, which are part of query shape)
+            rows = [(item, self.__pre_insert__(item)) for item in items]
+            for _, group in groupby(rows, lambda x: tuple((k, v is None) for k, v in x[1].items())):
+                group = list(group)
+                columns = max(1, len(group[0][1]))
+                size = max(1, min(self.__insert_batch_size__, db.max_parameters // columns))
+                for index in range(0, len(group), size):
+                    chunk = group[index:index + size]
+                    query = QueryExpression().insert(list(map(lambda x: x[1], chunk))).into(collection)
+                    execute_event = ExecuteEventArgs(model=self, emitter=query)
+                    # emit before execute event
+                    await self.before.execute.emit(execute_event)
+                    # execute multi-row insert
+                    await db.execute(query)
+                    # items are grouped by null values, so either all items of a chunk have an explicit key,
+                    # which is kept as is, or none of them
+                    if key.type == 'Counter' and chunk[0][1].get(key.name) is None:
+                        # identity values of a multi-row insert statement are consecutive
+                        last_insert_id = await db.last_identity()
+                        if last_insert_id is not None:
+                            first_insert_id = last_insert_id - len(chunk) + 1
+                            for i, (item, _) in enumerate(chunk):
+                                setattr(item, key.name, first_insert_id + i)
+                    # emit after execute event
+                    await self.after.execute.emit(execute_event)
+            # emit after save event for each item
+            for event in events:
+                await self.after.save.emit(event)
+
+        await self.context.execute_in_transaction(execute)
+
     async def __update__(self, o: object):
 
         async def execute():
@@ -403,8 +524,8 @@ class DataModel(DataModelBase):
     async def insert(self, o: object or List[object]):
         async def execute():
             if isinstance(o, list):
-                for item in o:
-                    await self.__insert__(item)
+                if len(o) > 0:
+                    await self.__insert_many__(o)
             else:
                 await self.__insert__(o)
         await self.context.execute_in_transaction(execute)
@@ -1,10 +1,18 @@
 from .types import DataModelBase, UpgradeEventArgs, ExecuteEventArgs,\
     DataField, DataFieldAssociationMapping, DataAssociationType
 from pycentroid.query import JOIN_DIRECTION, OpenDataQueryExpression, QueryExpression, QueryField,\
-     QueryEntity, ResolvingJoinMemberEvent, ResolvingMemberEvent, trim_field_reference
-from pycentroid.common import expect, DataError, is_object_like
-from typing import List
+     QueryEntity, ResolvingJoinMemberEvent, ResolvingMemberEvent, SelectExpressionEncoder, SqlUtils,\
+     trim_field_reference, TYPECODES
+from .data_types import DataTypes
+from .cache import DataResultCache
+from pycentroid.common import expect, AnyObject, DataError, is_object_like, LRUCache
+from typing import List, AsyncIterator
 from types import SimpleNamespace
+from datetime import datetime
+from copy import copy
+import base64
+import json
+import time
 
 
 class DataQueryable(OpenDataQueryExpression):
@@ -12,6 +20,12 @@ class DataQueryable(OpenDataQueryExpression):
     __model__: DataModelBase
     __silent__ = False
     __levels__ = 2
+    # a process-wide cache of counted items which is used by get_list() if window functions are not supported
+    __counts__ = LRUCache(max_size=1000)
+    # a process-wide cache of query results which is used by queries that have been marked with cache()
+    __results__ = DataResultCache()
+    # the number of seconds for which the results of this query are cached
+    __ttl__ = 0
 
     def __init__(self, model: DataModelBase):
         super().__init__(model.properties.view)
@@ -107,6 +121,18 @@ class DataQueryable(OpenDataQueryExpression):
             model = join_model
             index += 1
 
+    def clone(self):
+        """Returns a copy of this query which shares its expressions until one of them changes,
+        e.g. in order to derive a count or a page query from a base query without changing it
+
+        Returns:
+            DataQueryable: A new query of the same model
+        """
+        result = super().clone()
+        result.resolving_member.subscribe(result.__on_resolving_member__)
+        result.resolving_join_member.subscribe(result.__on_resolving_join_member__)
+        return result
+
     def silent(self, value: bool = True):
         self.__silent__ = value
         return self
@@ -223,10 +249,142 @@ class DataQueryable(OpenDataQueryExpression):
             self.__where__ = where
         return self
 
+    def __seek_attribute__(self, expr: str) -> str:
+        # returns the attribute of an item which holds the value of the given order by expression
+        collection = self.__collection__.alias or self.__collection__.collection
+
+        def trim(name: str) -> str:
+            # remove the collection of this query e.g. ProductData.name -> name
+            members = trim_field_reference(name).split('.')
+            return '.'.join(members[1:] if len(members) > 1 and members[0] == collection else members)
+
+        name = trim(expr)
+        for alias, value in (self.__select__ or {}).items():
+            if value == 1:
+                # a selected attribute e.g. { 'orderedItem.name': 1 } is returned by its name
+                if trim(alias) == name:
+                    return name.split('.')[-1]
+                continue
+            if isinstance(value, dict) and len(value) == 1 and next(iter(value.values())) == 1:
+                # a field e.g. { 'productName': { 'orderedItem.name': 1 } }
+                value = next(iter(value))
+            if type(value) is str and trim(value) == name:
+                return alias
+        if '.' in name:
+            raise DataError('Keyset pagination requires selecting the attributes of joined models which order items',
+                            model=self.model.properties.name, field=name, code='ERR_SEEK')
+        return name
+
+    def __seek_attributes__(self) -> List[str]:
+        # get the attributes of order by expressions and append primary key, if it is missing,
+        # in order to have a unique order of items
+        key = self.model.key()
+        attributes = []
+        for item in self.__order_by__ or []:
+            expr = item.get('$expr')
+            if type(expr) is not str:
+                raise DataError('Keyset pagination supports only ordering by attributes',
+                                model=self.model.properties.name, code='ERR_SEEK')
+            attributes.append(self.__seek_attribute__(expr))
+        if key.name not in attributes:
+            direction = self.__order_by__[-1].get('direction') if self.__order_by__ else 1
+            self.__append_order__(QueryField(key.name), direction)
+            attributes.append(key.name)
+        return attributes
+
+    def after(self, value: object or str = None):
+        """Returns the items which follow the given item or continuation token in the order of this query.
+        The primary key is appended to order by expressions, if it is missing, so call after() with no arguments
+        to get the first page of items.
+
+        Args:
+            value (object | str, optional): The last item of the previous page or a continuation token
+
+        Returns:
+            DataQueryable
+        """
+        attributes = self.__seek_attributes__()
+        if value is None:
+            return self
+        if type(value) is str:
+            try:
+                values = json.loads(base64.urlsafe_b64decode(value.encode()))
+            except ValueError as error:
+                raise DataError('Continuation token is invalid', str(error), model=self.model.properties.name,
+                                code='ERR_TOKEN')
+            if type(values) is not list or len(values) != len(attributes):
+                raise DataError('Continuation token is invalid', model=self.model.properties.name, code='ERR_TOKEN')
+        else:
+            values = list(map(lambda x: getattr(value, x), attributes))
+        self.seek(values)
+        return self
+
+    def token(self, item: object) -> str:
+        """Returns an opaque continuation token which may be used for getting the items which follow the given item
+        e.g. q.after(token)
+
+        Args:
+            item (object): The last item of a page
+
+        Returns:
+            str: A continuation token
+        """
+        attributes = self.__seek_attributes__()
+        values = list(map(lambda x: getattr(item, x), attributes))
+        data = json.dumps(values, default=lambda x: SqlUtils.date_to_string(x) if isinstance(x, datetime) else str(x))
+        return base64.urlsafe_b64encode(data.encode()).decode()
+
+    def cache(self, ttl: float = 60):
+        """Caches the results of this query for the given number of seconds.
+        Cached results are discarded when the current model, its base models or a joined model change.
+
+        Args:
+            ttl (float, optional): The number of seconds for which results are cached. Zero disables caching
+
+        Returns:
+            DataQueryable: This query
+        """
+        self.__ttl__ = ttl
+        return self
+
+    def __tags__(self) -> set:
+        # returns the names of the data models which are used by this query, including their base models
+        tags = set()
+        models = [self.model] + list(map(lambda x: self.model.context.model(x['model']),
+                                         filter(lambda x: x.get('model') is not None, self.__lookup__)))
+        for model in models:
+            while model is not None and model.properties.name not in tags:
+                tags.add(model.properties.name)
+                model = model.base()
+        return tags
+
+    async def __execute__(self) -> List[object]:
+        # executes this query or returns its cached results
+        db = self.model.context.db
+        compile_query = getattr(db, '__compile__', None)
+        if self.__ttl__ <= 0 or compile_query is None:
+            return await db.execute(self)
+        sql, values = compile_query(self)
+        options = getattr(db, 'options', None)
+        key = (db.__class__, db.name, getattr(options, 'database', None), sql, tuple(values or ()))
+        try:
+            results = DataQueryable.__results__.get(key)
+        except TypeError:
+            # a query parameter cannot be used as a key
+            return await db.execute(sql, values)
+        if results is not None:
+            # return copies of cached items which may be modified e.g. by expand listener
+            return list(map(copy, results))
+        results = await db.execute(sql, values)
+        # the results of a query which is executed in a transaction may contain uncommitted changes
+        if getattr(db, '__transaction__', False) is not True:
+            DataQueryable.__results__.set(key, list(map(copy, results)), self.__ttl__, self.__tags__())
+        return results
+
     async def count(self) -> int:
         key = self.model.key()
-        self.take(0).skip(0)
-        result = await self.select(
+        # count items by a clone, so this query may be executed afterwards
+        result = await self.clone().take(0).skip(0).select(
                 QueryField(key.name).count().asattr('length')
             ).get_item()
         # noinspection PyUnresolvedReferences
@@ -239,13 +397,14 @@ class DataQueryable(OpenDataQueryExpression):
             # get attributes
             attributes = self.__model__.attributes
             self.select(*list(map(lambda x: x.name, filter(lambda x: x.many is not True, attributes))))
-        # stage #1 emit before upgrade
-        await self.model.before.upgrade.emit(UpgradeEventArgs(model=self.model))
+        # stage #1 emit before upgrade, if current model has not been verified yet
+        if not self.model.upgraded:
+            await self.model.before.upgrade.emit(UpgradeEventArgs(model=self.model))
         # stage #2 emit before execute
         event = ExecuteEventArgs(model=self.model, emitter=self)
         await self.model.before.execute.emit(event)
         # execute query
-        results = await self.model.context.db.execute(self)
+        results = await self.__execute__()
         if len(results) == 0:
             return None
         else:
@@ -259,17 +418,185 @@ class DataQueryable(OpenDataQueryExpression):
             # get attributes
             attributes = self.__model__.attributes
             self.select(*list(map(lambda x: x.name, filter(lambda x: x.many is not True, attributes))))
-        # stage #1 emit before upgrade
-        await self.model.before.upgrade.emit(UpgradeEventArgs(model=self.model))
+        # stage #1 emit before upgrade, if current model has not been verified yet
+        if not self.model.upgraded:
+            await self.model.before.upgrade.emit(UpgradeEventArgs(model=self.model))
         # stage #2 emit before execute
         event = ExecuteEventArgs(model=self.model, emitter=self)
         await self.model.before.execute.emit(event)
         # execute query
-        results = await self.model.context.db.execute(self)
+        results = await self.__execute__()
         # stage #3 emit after execute
         event = ExecuteEventArgs(model=self.model, emitter=self, results=results)
         await self.model.after.execute.emit(event)
         return results
 
-    async def get_list(self):
-        pass
+    async def stream(self, batch_size: int = 100) -> AsyncIterator[object]:
+        """Executes the current query and returns an asynchronous iterator of items.
+        Items are fetched in batches and after execute listeners, including expand, are applied to each batch.
+
+        Args:
+            batch_size (int, optional): The number of items to fetch at once
+
+        Returns:
+            AsyncIterator[object]: An asynchronous iterator of items
+        """
+        if self.__select__ is None:
+            # get attributes
+            attributes = self.__model__.attributes
+            self.select(*list(map(lambda x: x.name, filter(lambda x: x.many is not True, attributes))))
+        # stage #1 emit before upgrade, if current model has not been verified yet
+        if not self.model.upgraded:
+            await self.model.before.upgrade.emit(UpgradeEventArgs(model=self.model))
+        # stage #2 emit before execute
+        event = ExecuteEventArgs(model=self.model, emitter=self)
+        await self.model.before.execute.emit(event)
+        # execute query
+        async for results in self.model.context.db.stream(self, batch_size=batch_size):
+            # stage #3 emit after execute for each batch
+            event = ExecuteEventArgs(model=self.model, emitter=self, results=results)
+            await self.model.after.execute.emit(event)
+            for result in results:
+                yield result
+
+    def __aiter__(self):
+        return self.stream()
+
+    async def __count__(self) -> int:
+        # count items without changing this query and without emitting after execute event e.g. for expanding items
+        query = self.clone()
+        query.__order_by__ = None
+        query.take(0).skip(0)
+        # the groups or the distinct items of a query are counted by selecting from it as a subquery
+        subquery = query.__group_by__ is not None or query.__distinct__ is True
+        if not subquery:
+            query.select(QueryField(self.model.key().name).count().asattr('length'))
+        max_age = self.model.context.application.configuration.get('settings/query/countMaxAge') or 0
+        key = None
+        if max_age > 0:
+            db = self.model.context.db
+            options = getattr(db, 'options', None)
+            key = (db.__class__, db.name, getattr(options, 'database', None),
+                   json.dumps(query, cls=SelectExpressionEncoder, default=str))
+            item = DataQueryable.__counts__.get(key)
+            if item is not None and item[0] > time.monotonic():
+                return item[1]
+        await self.model.before.execute.emit(ExecuteEventArgs(model=self.model, emitter=query))
+        db = self.model.context.db
+        compile_query = getattr(db, '__compile__', None)
+        if not subquery:
+            results = await db.execute(query)
+            total = results[0].length if len(results) > 0 else 0
+        elif compile_query is not None:
+            sql, values = compile_query(query)
+            results = await db.execute(f'SELECT COUNT(*) AS length FROM ({sql}) AS t0', values)
+            total = results[0].length
+        else:
+            total = len(await db.execute(query))
+        if key is not None:
+            DataQueryable.__counts__.set(key, (time.monotonic() + max_age, total))
+        return total
+
+    async def get_list(self) -> AnyObject:
+        """Returns a page of items and the total number of items which match this query.
+        The total number of items is selected by the same statement, if window functions are supported by database,
+        otherwise, it is counted by another statement and it may be cached for settings/query/countMaxAge seconds.
+        A page of items is cached like the results of get_items(), if this query has been marked with cache().
+
+        Returns:
+            AnyObject: An object with value, total and skip attributes
+        """
+        if self.__select__ is None:
+            # get attributes
+            attributes = self.__model__.attributes
+            self.select(*list(map(lambda x: x.name, filter(lambda x: x.many is not True, attributes))))
+        # stage #1 emit before upgrade, if current model has not been verified yet
+        if not self.model.upgraded:
+            await self.model.before.upgrade.emit(UpgradeEventArgs(model=self.model))
+        # stage #2 emit before execute
+        event = ExecuteEventArgs(model=self.model, emitter=self)
+        await self.model.before.execute.emit(event)
+        db = self.model.context.db
+        total = None
+        # window functions are evaluated before DISTINCT, so they cannot be used for distinct items
+        use_window = self.__limit__ > 0 and db.window_functions is True and self.__distinct__ is not True
+        if use_window:
+            query = self.clone()
+            query.__select__ = dict(self.__select__, __total__={'$countOver': []})
+            results = await query.__execute__()
+            if len(results) > 0:
+                total = results[0].__total__
+                for result in results:
+                    delattr(result, '__total__')
+        else:
+            results = await self.__execute__()
+        if total is None:
+            if self.__limit__ > 0:
+                total = await self.__count__()
+            else:
+                total = len(results)
+        # stage #3 emit after execute
+        event = ExecuteEventArgs(model=self.model, emitter=self, results=results)
+        await self.model.after.execute.emit(event)
+        return AnyObject(value=results, total=total, skip=self.__skip__)
+
+    def __typecode__(self, name: str) -> str or None:
+        # returns the typecode of a column which holds the values of the given attribute
+        attribute = self.model.getattr(name)
+        if attribute is None or attribute.many is True:
+            return None
+        types: DataTypes = self.model.context.application.configuration.getstrategy(DataTypes)
+        if types.has(attribute.type):
+            return TYPECODES.get(types.get(attribute.type).sqltype)
+        # a foreign key has the type of the primary key of the associated model
+        parent = self.model.context.model(attribute.type)
+        key = parent.key() if parent is not None else None
+        if key is None or types.has(key.type) is False:
+            return None
+        return TYPECODES.get(types.get(key.type).sqltype)
+
+    def __typecodes__(self) -> dict:
+        # returns the typecodes of selected columns which are known by the attributes of the current model
+        typecodes = {}
+        for name, expr in self.__select__.items():
+            typecode = None
+            if expr == 1:
+                typecode = self.__typecode__(name)
+            elif isinstance(expr, dict) and len(expr) == 1:
+                method, args = next(iter(expr.items()))
+                if method == '$count':
+                    typecode = 'q'
+                elif method == '$avg':
+                    typecode = 'd'
+                elif not method.startswith('$') and args == 1:
+                    typecode = self.__typecode__(method)
+                elif method in ('$sum', '$min', '$max') and isinstance(args, list) and len(args) == 1 \
+                        and isinstance(args[0], str) and args[0].startswith('$'):
+                    typecode = self.__typecode__(args[0][1:])
+            if typecode is not None:
+                typecodes[name] = typecode
+        return typecodes
+
+    async def get_columns(self) -> dict:
+        """Executes the current query and returns a dictionary of column values by name
+        e.g. for aggregating or analyzing a large number of items.
+        Database records are fetched straight into columns without creating an object for each item.
+        Numeric columns are numpy arrays, if numpy is available, otherwise, they are compact arrays (array.array).
+        Their types are defined by the attributes of the current model, or by the values which have been fetched.
+        Other columns are numpy arrays of objects or lists.
+        Important note: after execute listeners e.g. expand are not applied to columns
+
+        Returns:
+            dict: A dictionary of column values by name
+        """
+        if self.__select__ is None:
+            # get attributes
+            attributes = self.__model__.attributes
+            self.select(*list(map(lambda x: x.name, filter(lambda x: x.many is not True, attributes))))
+        # stage #1 emit before upgrade, if current model has not been verified yet
+        if not self.model.upgraded:
+            await self.model.before.upgrade.emit(UpgradeEventArgs(model=self.model))
+        # stage #2 emit before execute
+        event = ExecuteEventArgs(model=self.model, emitter=self)
+        await self.model.before.execute.emit(event)
+        return await self.model.context.db.execute_columns(self, typecodes=self.__typecodes__())
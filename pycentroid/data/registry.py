@@ -0,0 +1,116 @@
+from types import SimpleNamespace
+from pycentroid.common import ConfigurationStrategy
+from .types import DataModelAttribute, DataFieldAssociationMapping
+
+
+class DataModelDefinition(SimpleNamespace):
+    """Holds the resolved attributes, primary key and association mappings of a data model
+    """
+    attributes: list
+    """The resolved attributes of a data model including inherited attributes"""
+    key: object
+    """The primary key of a data model"""
+    index: dict
+    """A dictionary of attributes by name"""
+    mappings: dict
+    """A dictionary of association mappings by attribute name"""
+    super_types: list
+    """The names of the models which are inherited by a data model"""
+    depends: set
+    """The names of the data models which are used while resolving this definition"""
+    plurals: dict
+    """A dictionary of plural flags by attribute name which have been determined while resolving attributes"""
+
+    def __init__(self):
+        super().__init__(attributes=None, key=None, mappings={}, index=None, super_types=None, depends=set(),
+                         plurals={})
+
+    @staticmethod
+    def parse(source: dict):
+        """Creates a data model definition from a dictionary e.g. an item of a schema bundle
+
+        Args:
+            source (dict): A dictionary which contains attributes, superTypes, mappings, depends and plurals
+
+        Returns:
+            DataModelDefinition: The data model definition
+        """
+        definition = DataModelDefinition()
+        attributes = [DataModelAttribute(**attribute) for attribute in source['attributes']]
+        definition.index = dict(map(lambda x: (x.name, x), attributes))
+        definition.key = next(filter(lambda x: x.primary is True, attributes), None)
+        definition.attributes = attributes
+        definition.super_types = source['superTypes']
+        definition.mappings = {
+            key: DataFieldAssociationMapping(**value) if value is not None else None
+            for key, value in source['mappings'].items()
+        }
+        definition.depends = set(source['depends'])
+        definition.plurals = source['plurals']
+        return definition
+
+
+class DataModelRegistry(ConfigurationStrategy):
+    """A per-application registry of resolved data model definitions which are shared across data contexts.
+    Resolved definitions should be treated as read-only and they should be invalidated whenever a schema changes.
+    """
+
+    def __init__(self, configuration):
+        super().__init__(configuration)
+        self.__definitions__ = {}
+        # a dictionary of unparsed definitions e.g. the definitions of a schema bundle
+        self.__sources__ = {}
+
+    def __contains__(self, name: str):
+        return name in self.__definitions__ or name in self.__sources__
+
+    def set_source(self, name: str, source: dict):
+        """Sets an unparsed data model definition which is going to be parsed when it is requested for the first time
+
+        Args:
+            name (str): The name of a data model
+            source (dict): A dictionary which contains attributes, superTypes, mappings, depends and plurals
+        """
+        self.__sources__[name] = source
+
+    def get(self, name: str) -> DataModelDefinition:
+        """Returns the definition of the given data model or creates a new one
+
+        Args:
+            name (str): The name of a data model
+
+        Returns:
+            DataModelDefinition: The definition of the given data model
+        """
+        definition = self.__definitions__.get(name)
+        if definition is None:
+            source = self.__sources__.pop(name, None)
+            definition = DataModelDefinition() if source is None else DataModelDefinition.parse(source)
+            self.__definitions__[name] = definition
+        return definition
+
+    def invalidate(self, name: str = None):
+        """Removes the definition of the given data model and the definitions of the models which depend on it
+        e.g. derived models or models which are associated with it. If name is empty, it removes all definitions.
+
+        Args:
+            name (str, optional): The name of a data model
+        """
+        if name is None:
+            self.__definitions__.clear()
+            self.__sources__.clear()
+            return
+        names = {name}
+        while True:
+            dependents = set(
+                key for key, value in self.__definitions__.items() if key not in names and value.depends & names
+            )
+            dependents.update(
+                key for key, value in self.__sources__.items() if key not in names and names.intersection(value['depends'])  # noqa:E501
+            )
+            if len(dependents) == 0:
+                break
+            names.update(dependents)
+        for key in names:
+            self.__definitions__.pop(key, None)
+            self.__sources__.pop(key, None)
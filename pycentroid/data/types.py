@@ -2,7 +2,7 @@ from abc import abstractmethod
 from enum import Enum
 from typing import List, Callable
 from types import SimpleNamespace
-from pycentroid.common import ApplicationBase, AsyncSeriesEventEmitter, AnyDict
+from pycentroid.common import ApplicationBase, AsyncSeriesEventEmitter, EventEmitterProperty, AnyDict
 from pycentroid.query import DataAdapter, QueryExpression
 
 
@@ -116,6 +116,11 @@ class DataField(AnyDict):
     validation: DataFieldValidation
 
 
+class DataModelAttribute(DataField):
+    model: str
+    """A string which represents the name of the data model which defines this attribute"""
+
+
 class DataModelEventListener(AnyDict):
     name: str
     """A string which the name of this event listener e.g. 'After Update Person'"""
@@ -194,16 +199,10 @@ class DataContextBase:
 
 class DataModelEventEmitter:
 
-    upgrade: AsyncSeriesEventEmitter
-    save: AsyncSeriesEventEmitter
-    remove: AsyncSeriesEventEmitter
-    execute: AsyncSeriesEventEmitter
-
-    def __init__(self):
-        self.upgrade = AsyncSeriesEventEmitter()
-        self.save = AsyncSeriesEventEmitter()
-        self.remove = AsyncSeriesEventEmitter()
-        self.execute = AsyncSeriesEventEmitter()
+    upgrade = EventEmitterProperty(AsyncSeriesEventEmitter)
+    save = EventEmitterProperty(AsyncSeriesEventEmitter)
+    remove = EventEmitterProperty(AsyncSeriesEventEmitter)
+    execute = EventEmitterProperty(AsyncSeriesEventEmitter)
 
 
 class DataModelBase:
@@ -1,49 +1,66 @@
 from .types import DataContextBase, DataModelBase, DataField, DataModelProperties, UpgradeEventArgs
 from .configuration import DataConfiguration
-from .loaders import SchemaLoaderStrategy
+from .migrations import DataModelMigrations
 from pycentroid.common import expect, DataError
 from pycentroid.query import DataColumn
 from .data_types import DataTypes
 import json
+from typing import List
 from os.path import dirname, join
 
 
 class DataModelUpgrade:
 
+    # the properties of migrations model which are loaded once
+    __migrations__: DataModelProperties = None
+
+    @staticmethod
+    def migrations() -> DataModelProperties:
+        """Returns the properties of the data model which holds the versions of data models
+        """
+        if DataModelUpgrade.__migrations__ is None:
+            with open(join(dirname(__file__), 'resources/models/Migration.json'), 'r') as file:
+                # load json schema for Migrations
+                DataModelUpgrade.__migrations__ = DataModelProperties(**json.load(file))
+        return DataModelUpgrade.__migrations__
+
     @staticmethod
     async def before(event: UpgradeEventArgs):
+        db = event.model.context.db
+        key = DataModelMigrations.key_of(event.model)
+        # check if the current model has been already verified
+        if DataModelMigrations.is_done(key, db):
+            return
+        # and serialize concurrent checks
+        async with DataModelMigrations.lock(key):
+            if DataModelMigrations.is_done(key, db):
+                return
+            await DataModelUpgrade.upgrade(event, key)
+
+    @staticmethod
+    async def upgrade(event: UpgradeEventArgs, model_key: tuple):
         # get context
         context: DataContextBase = event.model.context
-        configuration: DataConfiguration = context.application.services.get(DataConfiguration)
-        # get schema loader
-        loader: SchemaLoaderStrategy = configuration.getstrategy(SchemaLoaderStrategy)
-        # and check if the current model has been already loaded
-        if event.model.properties.name in loader.loaded:
-            return
         # check if the current model is sealed and cannot be upgrade
         if event.model.properties.sealed is True:
-            loader.loaded.update({
-                event.model.properties.name: 1
-            })
+            DataModelMigrations.done(model_key, context.db)
             # exit
             return
-        # check version
-        with open(join(dirname(__file__), 'resources/models/Migration.json'), 'r') as file:
-            # load json schema for Migrations
-            d = json.load(file)
-            migrations: DataModelProperties = DataModelProperties(**d)
-        # create table if it does not exist
-        exists = await context.db.table(migrations.get_source()).exists()
-        if exists is False:
-            await context.db.table(migrations.get_source()).create(migrations.fields)
+        DataModelMigrations.misses += 1
+        # create migrations table if it does not exist
+        migrations = DataModelUpgrade.migrations()
+        migrations_key = DataModelMigrations.key(context.db, migrations.name, migrations.version)
+        if DataModelMigrations.is_done(migrations_key, context.db) is False:
+            exists = await context.db.table(migrations.get_source()).exists()
+            if exists is False:
+                await context.db.table(migrations.get_source()).create(migrations.fields)
+            DataModelMigrations.done(migrations_key, context.db)
         # get version of current model
         version = await context.db.table(event.model.properties.get_source()).version()
         # if version found is greater than or equal to current version
         if version is not None and version >= event.model.properties.version:
             # set updated
-            loader.loaded.update({
-                event.model.properties.name: 1
-            })
+            DataModelMigrations.done(model_key, context.db)
             # and exit
             return
         # get base model
@@ -52,9 +69,104 @@ class DataModelUpgrade:
             # try to upgrade base model
             upgrade_event = UpgradeEventArgs(model=base)
             await base.before.upgrade.emit(upgrade_event)
+        # do upgrade
+        await context.db.planner().apply({
+            event.model.properties.get_source(): DataModelUpgrade.columns(event.model)
+        }, indexes=DataModelUpgrade.indexes(event.model))
+        DataModelMigrations.upgrades += 1
+        # set upgraded before emitting after upgrade event which may use this model e.g. to seed data
+        DataModelMigrations.done(model_key, context.db)
+        # emit after upgrade event
+        setattr(event, 'done', True)
+        await event.model.after.upgrade.emit(event)
+
+    @staticmethod
+    async def upgrade_many(context: DataContextBase, models: List[DataModelBase], dry_run: bool = False) -> List[str]:
+        """Upgrades the given data models and their base models by comparing their tables
+        with the database in one pass and executing the statements of the upgrade in one transaction
+
+        Args:
+            context (DataContextBase): A data context
+            models (List[DataModelBase]): A collection of data models
+            dry_run (bool, optional): If it is true, the statements of the upgrade are returned but not executed
+
+        Returns:
+            List[str]: The statements of the upgrade
+        """
+        db = context.db
+        planner = db.planner()
+        migrations = DataModelUpgrade.migrations()
+        schema = await planner.inspect(migrations=migrations.get_source())
+        # base models are upgraded first
+        items = []
+
+        def append(item: DataModelBase):
+            if next(filter(lambda x: x.properties.name == item.properties.name, items), None) is not None:
+                return
+            base = item.base()
+            if base is not None:
+                append(base)
+            items.append(item)
+
+        for model in models:
+            append(model)
+        tables = {}
+        indexes = {}
+        if migrations.get_source() not in schema.tables:
+            tables[migrations.get_source()] = migrations.fields
+        verified = []
+        upgraded = []
+        for model in items:
+            if DataModelMigrations.is_done(DataModelMigrations.key_of(model), db):
+                continue
+            if model.properties.sealed is True:
+                verified.append(model)
+                continue
+            DataModelMigrations.misses += 1
+            source = model.properties.get_source()
+            version = schema.versions.get(source)
+            if version is not None and version >= model.properties.version:
+                verified.append(model)
+                continue
+            tables[source] = DataModelUpgrade.columns(model)
+            for table, columns_list in DataModelUpgrade.indexes(model).items():
+                indexes.setdefault(table, []).extend(columns_list)
+            upgraded.append(model)
+        statements = planner.plan(tables, schema, indexes)
+        if dry_run is True:
+            return statements
+        await planner.execute(statements)
+
+        async def execute():
+            DataModelMigrations.done(DataModelMigrations.key(db, migrations.name, migrations.version), db)
+            for item in verified + upgraded:
+                DataModelMigrations.done(DataModelMigrations.key_of(item), db)
+            DataModelMigrations.upgrades += len(upgraded)
+            # emit after upgrade event e.g. to seed data
+            for item in upgraded:
+                event = UpgradeEventArgs(model=item)
+                setattr(event, 'done', True)
+                await item.after.upgrade.emit(event)
+
+        await context.execute_in_transaction(execute)
+        return statements
+
+    @staticmethod
+    def columns(model: DataModelBase) -> List[DataColumn]:
+        """Returns the columns of the database table of the given data model
+
+        Args:
+            model (DataModelBase): A data model
+
+        Returns:
+            List[DataColumn]: A collection of columns
+        """
+        context: DataContextBase = model.context
+        configuration: DataConfiguration = context.application.services.get(DataConfiguration)
+        base: DataModelBase = model.base()
         # get model attributes
         attributes = list(
-            filter(lambda x: x.model == event.model.properties.name and bool(x.many) is False, event.model.attributes)
+            filter(lambda x: x.model == model.properties.name and bool(x.many) is False, model.attributes)
             )
         if base is not None:
             # get primary key
@@ -82,7 +194,7 @@ class DataModelUpgrade:
                 # try to find attribute type as data model
                 parent = context.model(attribute.type)
                 expect(parent).to_be_truthy(
-                    DataError('The specified type cannot be found', None, event.model.properties.name, attribute.name)
+                    DataError('The specified type cannot be found', None, model.properties.name, attribute.name)
                     )
                 # find primary key
                 attr = next(filter(lambda x: x.primary is True, parent.attributes), None)
@@ -98,15 +210,54 @@ class DataModelUpgrade:
             # append column
             column = DataColumn(name=attribute.name, type=sqltype, nullable=nullable, size=size, scale=scale)
             columns.append(column)
-        # do upgrade
-        await context.db.table(event.model.properties.get_source()).change(columns)
-        # set loaded
-        loader.loaded.update({
-                event.model.properties.name: 1
-            })
-        # emit after upgrade event
-        setattr(event, 'done', True)
-        await event.model.after.upgrade.emit(event)
+        return columns
+
+    @staticmethod
+    def indexes(model: DataModelBase) -> dict:
+        """Returns the indexes of the database table of the given data model, and the indexes of its junction tables,
+        which cover indexed attributes, foreign keys, constraints and the join paths of associations
+
+        Args:
+            model (DataModelBase): A data model
+
+        Returns:
+            dict: A dictionary of index column lists by table name
+        """
+        source = model.properties.get_source()
+        columns = list(map(lambda x: x.name, DataModelUpgrade.columns(model)))
+        types: DataTypes = model.context.application.configuration.getstrategy(DataTypes)
+        results = {
+            source: []
+        }
+
+        def append(table: str, items: List[str]):
+            items = list(items)
+            if items not in results.setdefault(table, []):
+                results[table].append(items)
+
+        # the primary key of a derived model joins it with its base model
+        if model.base() is not None:
+            key = model.key()
+            if key is not None:
+                append(source, [key.name])
+        for attribute in model.attributes:
+            if attribute.model != model.properties.name:
+                continue
+            if bool(attribute.many) is False:
+                # an indexed attribute or a foreign key
+                if attribute.indexed is True or types.has(attribute.type) is False:
+                    append(source, [attribute.name])
+                continue
+            mapping = model.infermapping(attribute.name)
+            if mapping is not None and mapping.associationType == 'junction' \
+                    and mapping.parentModel == model.properties.name:
+                append(mapping.associationAdapter, [mapping.associationObjectField])
+                append(mapping.associationAdapter, [mapping.associationValueField])
+        for constraint in model.properties.constraints or []:
+            fields = constraint.fields or []
+            if len(fields) > 0 and all(map(lambda x: x in columns, fields)):
+                append(source, fields)
+        return results
 
     @staticmethod
     async def after(event: UpgradeEventArgs):
@@ -5,13 +5,16 @@ from .query_field import QueryField, trim_field_reference, format_collection_ref
      format_field_reference, format_any_field_reference, is_qualified_reference
 from .query_value import QueryValue
 from .query_entity import QueryEntity
-from .utils import SqlUtils, SelectMap, select, CancelTransactionError, TestUtils
+from .utils import SqlUtils, SelectMap, select, CancelTransactionError, TestUtils, BACKSLASH_ESCAPE_TABLE, \
+    QUOTE_ESCAPE_TABLE
 from .object_name_validator import ObjectNameValidator, ValidatorPatterns, InvalidObjectNameError
-from .sql_formatter import SqlDialect, SqlFormatter, SqlDialectOptions
+from .sql_formatter import SqlDialect, SqlFormatter, SqlDialectOptions, SqlFormatterState
+from .query_plan import QueryPlan, QueryPlanCache, QueryParameter, QueryShape
 from .resolvers import MemberResolver, MethodResolver
 from .method_parser import MethodParserDialect, InstanceMethodParser, InstanceMethodParserDialect
 from .closure_parser import ClosureParser, count
-from .data_objects import DataAdapter, DataTable, DataView, DataTableIndex, DataColumn
+from .result_columns import ColumnBuffer, TYPECODES, to_columns
+from .data_objects import DataAdapter, DataTable, DataView, DataTableIndex, DataColumn, DataSchemaPlanner
 from .open_data_parser import OpenDataParser, Token, TokenOperator, TokenType, LiteralToken, SyntaxToken, StringType, LiteralType, IdentifierToken
 from .open_data_formatter import OpenDataFormatter, OpenDataDialect
 from .open_data_query import OpenDataQueryExpression
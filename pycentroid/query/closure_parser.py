@@ -1,14 +1,31 @@
 import ast
 import re
 from dill.source import getsource
-from pycentroid.common import expect, SyncSeriesEventEmitter, AnyObject
+from pycentroid.common import expect, SyncSeriesEventEmitter, EventEmitterProperty, AnyObject, LRUCache
 from .query_field import is_qualified_reference, format_any_field_reference
 from .method_parser import MethodParserDialect, InstanceMethodParserDialect
 
+# a cache of the syntax trees of closures by code object
+__closures__ = LRUCache(max_size=1024)
 
-def try_extract_closure_from(func: callable, throw_error: bool = False):
+
+def __parse_closure__(func: callable, kind: str, parse: callable):
+    # returns the cached syntax tree of the given function, if any, or parses its source code
+    code = getattr(func, '__code__', None)
+    if code is None:
+        return parse(func)
+    key = (code, kind)
+    result = __closures__.get(key)
+    if result is None:
+        result = parse(func)
+        # syntax trees are not modified while parsing closures, so they may be shared
+        __closures__.set(key, result)
+    return result
+
+
+def __extract_closure__(func: callable):
     source = getsource(func).strip()
-    final_source = source if re.search('^(\s+)?def\s', source) is not None else ast.parse(f'func0({source})')
+    final_source = source if re.search(r'^(\s+)?def\s', source) is not None else ast.parse(f'func0({source})')
     module: ast.Module = ast.parse(final_source)
     if type(module.body[0]) is ast.FunctionDef:
         return module.body[0]
@@ -21,6 +38,21 @@ def try_extract_closure_from(func: callable, throw_error: bool = False):
     for arg in args:
         if type(arg.value) is ast.Lambda:
             return arg.value
+    # an empty list is cached for a source without a closure
+    return []
+
+
+def parse_source(func: callable) -> ast.Module:
+    """Returns the syntax tree of the source code of the given function.
+    Syntax trees are cached by code object, so the source code of a function is read and parsed once.
+    """
+    return __parse_closure__(func, 'source', lambda x: ast.parse(getsource(x).strip()))
+
+
+def try_extract_closure_from(func: callable, throw_error: bool = False):
+    closure = __parse_closure__(func, 'closure', __extract_closure__)
+    if type(closure) is not list:
+        return closure
     if throw_error is True:
         raise Exception('Invalid expression. Expected a lambda function.')
     return None
@@ -31,11 +63,56 @@ def count(field):
     pass
 
 
+class ClosureParameter:
+    """Represents a parameter of a closure in a cached expression e.g. category in
+    lambda x, category: x.category == category
+    """
+    __slots__ = ('name',)
+
+    def __init__(self, name: str):
+        self.name = name
+
+
+class UncacheableClosureError(Exception):
+    """Raised while parsing a closure whose expression depends on the values of its parameters
+    e.g. a method call which formats a parameter
+    """
+    pass
+
+
+def has_parameter(value) -> bool:
+    """Returns True if the given expression contains a parameter of a closure
+    """
+    if type(value) is ClosureParameter:
+        return True
+    if isinstance(value, dict):
+        return any(map(has_parameter, value.values()))
+    if isinstance(value, list):
+        return any(map(has_parameter, value))
+    return False
+
+
+def bind_parameters(value, params: dict):
+    """Returns a copy of the given expression where the parameters of a closure have been replaced by their values
+    """
+    if type(value) is ClosureParameter:
+        return params.get(value.name)
+    if isinstance(value, dict):
+        return dict((key, bind_parameters(item, params)) for key, item in value.items())
+    if isinstance(value, list):
+        return [bind_parameters(item, params) for item in value]
+    return value
+
+
 class ClosureParser:
+
+    resolving_member = EventEmitterProperty(SyncSeriesEventEmitter)
+    resolving_join_member = EventEmitterProperty(SyncSeriesEventEmitter)
+    resolving_method = EventEmitterProperty(SyncSeriesEventEmitter)
+    # a process-wide cache of parsed expressions, where closure parameters are placeholders, by code object
+    __expressions__ = LRUCache(max_size=1024)
+
     def __init__(self):
-        self.resolving_member = SyncSeriesEventEmitter()
-        self.resolving_join_member = SyncSeriesEventEmitter()
-        self.resolving_method = SyncSeriesEventEmitter()
         self.args = []
         self.params = {}
         # add method parsers
@@ -43,8 +120,57 @@ class ClosureParser:
             MethodParserDialect(self),
             InstanceMethodParserDialect(self)
         ]
+        # the number of built-in method handlers which do not prevent caching parsed expressions
+        self.__builtin_handlers__ = len(self.resolving_method.__handlers__)
+        # the member events which are collected while parsing a cached expression, if any
+        self.__members__ = None
+
+    def __parse_cached__(self, kind: str, func, params: dict, parse: callable):
+        # returns a cached expression of the given closure bound to the given params, if any, or parses it
+        code = getattr(func, '__code__', None)
+        if code is None or params is None or \
+                len(self.resolving_method.__handlers__) != self.__builtin_handlers__:
+            return parse(func, params)
+        key = (code, kind)
+        item = ClosureParser.__expressions__.get(key)
+        if item is None:
+            # parse closure with placeholders and collect member events without emitting them
+            self.__members__ = []
+            try:
+                item = (parse(func, params), tuple(self.__members__))
+            except UncacheableClosureError:
+                item = False
+            finally:
+                self.__members__ = None
+            ClosureParser.__expressions__.set(key, item)
+        if item is False:
+            return parse(func, params)
+        expr, members = item
+        # emit member events e.g. to resolve the joins of a query
+        for member, qualified in members:
+            if self.__emit_member__(member, qualified) != member:
+                # a member has been resolved to another one, so the cached expression cannot be used
+                return parse(func, params)
+        self.params = params
+        return bind_parameters(expr, params)
+
+    def __emit_member__(self, attr: str, qualified: bool) -> str:
+        # emits resolving member event, or collects it while parsing a cached expression, and returns the member
+        if self.__members__ is not None:
+            self.__members__.append((attr, qualified))
+            return attr
+        event = AnyObject(target=self, member=attr)
+        if qualified:
+            event.fully_qualified_name = attr
+            self.resolving_join_member.emit(event)
+        else:
+            self.resolving_member.emit(event)
+        return event.member
 
     def parse_filter(self, func, params: dict = None):
+        return self.__parse_cached__('filter', func, params, self.__parse_filter__)
+
+    def __parse_filter__(self, func, params: dict = None):
 
         expr = try_extract_closure_from(func)
         if expr is not None:
@@ -56,7 +182,7 @@ class ClosureParser:
                 return self.parse_common(expr.body[0].value)
             return self.parse_common(expr.body) 
 
-        module: ast.Module = ast.parse(getsource(func).strip())
+        module: ast.Module = parse_source(func)
         # set params
         self.params = params
         if type(module.body[0].value) is ast.Lambda:
@@ -78,7 +204,10 @@ class ClosureParser:
         raise TypeError('Invalid or unsupported lamda function')
 
     def parse_select(self, func, params: dict = None):
-        module: ast.Module = ast.parse(getsource(func).strip())
+        return self.__parse_cached__('select', func, params, self.__parse_select__)
+
+    def __parse_select__(self, func, params: dict = None):
+        module: ast.Module = parse_source(func)
         # set params
         self.params = params
         if type(module.body[0].value) is ast.Lambda:
@@ -145,15 +274,7 @@ class ClosureParser:
             obj = expr.value
             if obj.id != self.args[0].arg:
                 attr = '$' + obj.id + '.' + attr[1:]
-            event = AnyObject(target=self, member=attr)
-            if is_qualified_reference(attr):
-                event.fully_qualified_name = attr
-                self.resolving_join_member.emit(event)
-            else:
-                self.resolving_member.emit(event)
-            if event.member != attr:
-                return event.member
-            return attr
+            return self.__emit_member__(attr, is_qualified_reference(attr))
         if type(expr.value) is ast.Attribute:
             # a nested member like x.address.streetAddress
             obj = expr.value
@@ -163,15 +284,7 @@ class ClosureParser:
                 # get next value
                 obj = obj.value
             # emit event
-            event = AnyObject(target=self, member=attr)
-            if is_qualified_reference(attr):
-                event.fully_qualified_name = attr
-                self.resolving_join_member.emit(event)
-            else:
-                self.resolving_member.emit(event)
-            if event.member != attr:
-                return event.member
-            return attr
+            return self.__emit_member__(attr, is_qualified_reference(attr))
 
     def parse_sequence(self, expr):
         sequence = {}
@@ -179,6 +292,8 @@ class ClosureParser:
             expect(type(expr.keywords)).to_equal(list, 'Sequence call expression must be an array of named params')
             for keyword in expr.keywords:
                 keyword_expr = self.parse_common(keyword.value)
+                if type(keyword_expr) is ClosureParameter:
+                    raise UncacheableClosureError()
                 if type(keyword_expr) is str:
                     if keyword_expr == '$' + keyword.arg:
                         # simplify expression
@@ -191,6 +306,8 @@ class ClosureParser:
         if type(expr) is ast.List or type(expr) is ast.Tuple:
             for elt in expr.elts:
                 attr = self.parse_common(elt)
+                if type(attr) is ClosureParameter:
+                    raise UncacheableClosureError()
                 if type(attr) is str:
                     sequence.__setitem__(attr[1:], 1)
                 elif type(attr) is dict:
@@ -234,6 +351,9 @@ class ClosureParser:
 
     def parse_identifier(self, expr: ast.Name):
         expect(expr.id in self.params).to_be_truthy(Exception('The specified param cannot be found'))
+        if self.__members__ is not None:
+            # a parameter of a cached expression is bound to its value later
+            return ClosureParameter(expr.id)
         return self.params.get(expr.id)
 
     def parse_method_call(self, expr: ast.Call or ast.Attribute):
@@ -247,6 +367,9 @@ class ClosureParser:
             method = format_any_field_reference(expr.func.id)
         for arg in expr.args:
             arguments.append(self.parse_common(arg))
+        if self.__members__ is not None and has_parameter(arguments):
+            # methods may format the values of their arguments e.g. startswith
+            raise UncacheableClosureError()
         event = AnyObject(target=self, method=method, instance_method=instance_method)
         self.resolving_method.emit(event)
         if event.resolve is not None:
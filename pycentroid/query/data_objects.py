@@ -1,12 +1,19 @@
-from typing import Callable
+from typing import Callable, AsyncIterator, List
 from abc import abstractmethod
 from pycentroid.common import AnyDict
+from .result_columns import to_columns
 import logging
 
 
 class DataAdapterBase:
 
     __raw_connection__ = None
+    name: str = None
+    """A string which represents the name of this data adapter, if it has been defined in application configuration"""
+    max_parameters: int = 999
+    """The maximum number of query parameters of a single statement"""
+    window_functions: bool = False
+    """A boolean which indicates whether window functions e.g. COUNT(*) OVER () are supported or not"""
 
     @abstractmethod
     async def open(self):
@@ -112,6 +119,28 @@ class DataView:
         pass
 
 
+class DataSchemaPlanner:
+
+    def __init__(self, adapter: DataAdapterBase):
+        self.__adapter__ = adapter
+
+    @abstractmethod
+    async def inspect(self, tables: List[str] = None, migrations: str = None):
+        pass
+
+    @abstractmethod
+    def plan(self, tables: dict, schema, indexes: dict = None) -> List[str]:
+        pass
+
+    @abstractmethod
+    async def execute(self, statements: List[str]):
+        pass
+
+    @abstractmethod
+    async def apply(self, tables: dict, dry_run: bool = False, indexes: dict = None) -> List[str]:
+        pass
+
+
 class DataAdapter(DataAdapterBase):
 
     def __init__(self):
@@ -140,6 +169,41 @@ class DataAdapter(DataAdapterBase):
     async def execute_in_transaction(self, func: Callable):
         pass
 
+    @abstractmethod
+    def stream(self, query, values=None, batch_size: int = 100) -> AsyncIterator[list]:
+        pass
+
+    async def execute_columns(self, query, values=None, typecodes: dict = None) -> dict:
+        """Executes the given query and returns a dictionary of column values by name.
+        Numeric columns are returned as numpy arrays, if numpy is available, otherwise, as compact arrays.
+        This implementation converts the objects which are returned by execute(),
+        so a data adapter may override it in order to fetch database records straight into columns.
+
+        Args:
+            query (str | QueryExpression): The query to execute
+            values (list, optional): Query parameters
+            typecodes (dict, optional): A dictionary of typecodes by column name e.g. { 'price': 'd' }
+
+        Returns:
+            dict: A dictionary of column values by name
+        """
+        results = await self.execute(query, values)
+        if len(results) == 0:
+            return {}
+        names = list(results[0].__dict__.keys())
+        rows = list(map(lambda x: tuple(map(lambda name: getattr(x, name, None), names)), results))
+        return to_columns(names, [rows], typecodes)
+
+    def after_transaction(self, func: Callable[[bool], None]):
+        """Registers a callable which is going to be called with a boolean that indicates whether
+        the current transaction has been committed or not. If there is no transaction in progress, the callable
+        is called immediately.
+
+        Args:
+            func (Callable[[bool], None]): A callable to execute
+        """
+        func(True)
+
     @abstractmethod
     async def select_identity(self):
         pass
@@ -155,3 +219,7 @@ class DataAdapter(DataAdapterBase):
     @abstractmethod
     def view(self, view: str) -> DataView:
         pass
+
+    @abstractmethod
+    def planner(self) -> DataSchemaPlanner:
+        pass
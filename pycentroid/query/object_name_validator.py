@@ -1,4 +1,5 @@
 import re
+from pycentroid.common import LRUCache
 
 
 class InvalidObjectNameError(Exception):
@@ -18,23 +19,35 @@ class ValidatorPatterns:
 
 
 class ObjectNameValidator:
+    # compiled expressions by pattern
+    __expressions__ = {}
+    # a process-wide collection of escaped object names by pattern, name and format
+    __escaped__ = LRUCache(max_size=4096)
+
     def __init__(self, pattern=ValidatorPatterns.Default):
         self.pattern = pattern
         self.qualified_pattern = f'\\*$|^{pattern}((\\.|\\/){pattern})*(\\.\\*)?$'
+        expressions = ObjectNameValidator.__expressions__.get(pattern)
+        if expressions is None:
+            expressions = (re.compile(pattern), re.compile(self.qualified_pattern), re.compile(f'^{pattern}$'))
+            ObjectNameValidator.__expressions__[pattern] = expressions
+        self.__expression__, self.__qualified_expression__, self.__unqualified_expression__ = expressions
 
     def test(self, name, qualified=True, throw_error=True):
         if qualified:
-            result = re.match(self.qualified_pattern, name)
+            result = self.__qualified_expression__.match(name)
         else:
-            result = re.match(f'^{self.pattern}$', name)
+            result = self.__unqualified_expression__.match(name)
         if result is not None:
             return True
         if throw_error:
             raise InvalidObjectNameError()
         return False
-    
+
     def escape(self, name, format_string=r'\1'):
-        """Escapes a database object name based on the given format
+        """Escapes a database object name based on the given format.
+        Escaped names are cached, so escaping a name which has been already escaped is a dictionary lookup
+
         Args:
             name (str): An object name expression to escape
             format_string (str, optional): Object name format expression
@@ -42,5 +55,11 @@ class ObjectNameValidator:
         Returns:
                 str: An object name expression to escape
         """
+        key = (self.pattern, name, format_string)
+        escaped = ObjectNameValidator.__escaped__.get(key)
+        if escaped is not None:
+            return escaped
         self.test(name)
-        return re.sub(self.pattern, format_string, name)
+        escaped = self.__expression__.sub(format_string, name)
+        ObjectNameValidator.__escaped__.set(key, escaped)
+        return escaped
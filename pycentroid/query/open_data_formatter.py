@@ -213,8 +213,7 @@ class OpenDataDialect(SqlDialect):
 
 class OpenDataFormatter(SqlFormatter):
     def __init__(self):
-        super().__init__()
-        self.__dialect__ = OpenDataDialect()
+        super().__init__(OpenDataDialect())
 
     def format_delete(self, query):
         raise NotSupportedException()
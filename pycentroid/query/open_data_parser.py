@@ -1,12 +1,32 @@
 import re
+from copy import copy, deepcopy
 from enum import Enum
 
+from pycentroid.common.cache import LRUCache
 from pycentroid.common.datetime import isdatetime, getdatetime
-from pycentroid.common.events import SyncSeriesEventEmitter
+from pycentroid.common.events import SyncSeriesEventEmitter, EventEmitterProperty
 from pycentroid.common.objects import AnyDict
 from .query_field import format_any_field_reference, get_first_key
 
 
+LOGICAL_OPERATORS = frozenset(['$and', '$or', '$not', '$nor'])
+ARITHMETIC_OPERATORS = frozenset(['$add', '$mul', '$div', '$sub', '$mod'])
+COMPARISON_OPERATORS = frozenset(['$lt', '$lte', '$gt', '$gte', '$eq', '$ne'])
+
+DIGITS = frozenset('0123456789')
+CHARS = frozenset('ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz')
+IDENTIFIER_CHARS = CHARS | frozenset('_$')
+IDENTIFIER_START_CHARS = IDENTIFIER_CHARS | DIGITS
+SYNTAX_CHARS = frozenset(')(/,-=;:')
+
+# a placeholder which replaces the literals of a source while tokenizing its template
+LITERAL_PLACEHOLDER = '__literal__'
+# matches the strings and the numeric literals of a source which are not a part of another token
+# e.g. 'Laptops' and 500 in category eq 'Laptops' and price gt 500
+# important note: prefixed strings e.g. datetime'2020-01-01' are matched in order to be left as they are
+LITERAL_PATTERN = re.compile(r"([\w$]*)('(?:[^']|'')*')|(?<![\w$/\-'.])(\d+(?:\.\d+)?)(?![\w$.'])")
+
+
 class TokenOperator(Enum):
     Not = '$not'
     Mul = '$mul'
@@ -29,22 +49,21 @@ class TokenOperator(Enum):
     def is_logical_operator(op):
         if op is None:
             return False
-        return re.search(r'^(\$and|\$or|\$not|\$nor)$', op.value)
+        return op.value in LOGICAL_OPERATORS
 
     @staticmethod
     def is_arithmetic_operator(op):
         if op is None:
             return False
-        pattern = r'^(\$add|\$mul|\$div|\$sub|\$mod)$'
         if type(op) is str:
-            return re.search(pattern, op)
-        return re.search(pattern, op.value)
+            return op in ARITHMETIC_OPERATORS
+        return op.value in ARITHMETIC_OPERATORS
 
     @staticmethod
     def is_comparison_operator(op):
         if op is None:
             return False
-        return re.search(r'^(\$lt|\$lte|\$gt|\$gte|\$eq|\$ne)$', op.value)
+        return op.value in COMPARISON_OPERATORS
 
 
 class TokenType(Enum):
@@ -229,12 +248,16 @@ class SyntaxToken(Token):
 
 
 class OpenDataParser:
-    current = 0
-    offset = 0
-    source = None
-    tokens = []
-    resolving_member = SyncSeriesEventEmitter()
-    resolving_method = SyncSeriesEventEmitter()
+    current: int
+    offset: int
+    source: str
+    tokens: list
+    resolving_member = EventEmitterProperty(SyncSeriesEventEmitter)
+    resolving_method = EventEmitterProperty(SyncSeriesEventEmitter)
+    # a process-wide cache of tokens by source or template
+    __tokens__ = LRUCache(max_size=1024)
+    # a process-wide cache of parsed expressions by query option and source
+    __expressions__ = LRUCache(max_size=1024)
 
     __method__ = dict([
         ['count', '$count'],
@@ -268,6 +291,11 @@ class OpenDataParser:
     ])
 
     def __init__(self):
+        # parser state is kept per instance, so a parser may be reused
+        self.current = 0
+        self.offset = 0
+        self.source = None
+        self.tokens = []
 
         def resolve_method_regex_match(event):
             if event.method == '$regexMatch':
@@ -285,6 +313,8 @@ class OpenDataParser:
                 }
 
         self.resolving_method.subscribe(resolve_method_regex_match)
+        # the number of built-in method handlers which do not prevent caching parsed expressions
+        self.__builtin_handlers__ = len(self.resolving_method.__handlers__)
 
     @property
     def current_token(self):
@@ -334,7 +364,29 @@ class OpenDataParser:
                 return TokenOperator.Not
         return None
 
+    def __cacheable__(self) -> bool:
+        # parsed expressions may be cached if they have not been modified by custom event handlers
+        return len(self.resolving_member.__handlers__) == 0 and \
+            len(self.resolving_method.__handlers__) == self.__builtin_handlers__
+
+    def __parse_cached__(self, option: str, source, parse):
+        # returns a copy of a cached expression, if any, or parses the given source
+        if type(source) is not str or not self.__cacheable__():
+            return parse(source)
+        key = (option, source)
+        result = OpenDataParser.__expressions__.get(key)
+        if result is None:
+            result = parse(source)
+            OpenDataParser.__expressions__.set(key, result)
+        # expressions are modified by query expressions, so use a copy
+        return deepcopy(result)
+
     def parse(self, string):
+        """Parses the given $filter expression
+        """
+        return self.__parse_cached__('$filter', string, self.__parse__)
+
+    def __parse__(self, string):
         self.current = 0
         self.offset = 0
         self.source = string
@@ -441,7 +493,7 @@ class OpenDataParser:
         if len(self.tokens) == 0:
             return None
         if self.current_token.type == TokenType.Identifier:
-            if self.next_token and self.next_token.syntax == SyntaxToken.ParenOpen().syntax and \
+            if self.next_token and self.next_token.syntax == '(' and \
                     self.get_operator(self.current_token) is None:
                 return self.parse_method_call()
             elif self.get_operator(self.current_token) == TokenOperator.Not:
@@ -455,9 +507,9 @@ class OpenDataParser:
             self.move_next()
             return value
         elif self.current_token.type == TokenType.Syntax:
-            if self.current_token.syntax == SyntaxToken.Negative().syntax:
+            if self.current_token.syntax == '-':
                 raise Exception('Negative syntax is not yet implemented.')
-            if self.current_token.syntax == SyntaxToken.ParenOpen().syntax:
+            if self.current_token.syntax == '(':
                 self.move_next()
                 result = self.parse_common()
                 self.expect(SyntaxToken.ParenClose())
@@ -469,7 +521,7 @@ class OpenDataParser:
         if self.current_token.type != TokenType.Identifier:
             raise Exception('Expected identifier')
         identifier = self.current_token.identifier
-        while self.next_token is not None and self.next_token.syntax == SyntaxToken.Slash().syntax:
+        while self.next_token is not None and self.next_token.syntax == '/':
             self.move_next()
             if self.next_token.type != TokenType.Identifier:
                 raise Exception('Expected identifier')
@@ -538,7 +590,7 @@ class OpenDataParser:
         }
         branches.append(branch)
         current_token = self.current_token
-        if current_token.type == TokenType.Syntax and current_token.syntax == SyntaxToken.ParenClose().syntax:
+        if current_token.type == TokenType.Syntax and current_token.syntax == ')':
             self.move_next()
             return {
                 'branches': branches,
@@ -549,11 +601,11 @@ class OpenDataParser:
 
     def parse_method_call_args(self, method_args):
         self.expect_any()
-        if self.current_token.syntax == SyntaxToken.Comma().syntax:
+        if self.current_token.syntax == ',':
             self.move_next()
             self.expect_any()
             self.parse_method_call_args(method_args)
-        elif self.current_token.syntax == SyntaxToken.ParenClose().syntax:
+        elif self.current_token.syntax == ')':
             self.move_next()
         else:
             arg = self.parse_common()
@@ -562,6 +614,11 @@ class OpenDataParser:
         return method_args
 
     def parse_select_sequence(self, source):
+        """Parses the given $select expression
+        """
+        return self.__parse_cached__('$select', source, self.__parse_select_sequence__)
+
+    def __parse_select_sequence__(self, source):
         self.source = source
         self.tokens = self.to_list()
         self.offset = 0
@@ -586,7 +643,7 @@ class OpenDataParser:
                     result: 1
                 })
             results.append(result)
-            if not self.at_end() and self.current_token.syntax == SyntaxToken.Comma().syntax:
+            if not self.at_end() and self.current_token.syntax == ',':
                 self.move_next()
         return results
 
@@ -594,6 +651,11 @@ class OpenDataParser:
         return self.parse_select_sequence(string)
 
     def parse_order_by_sequence(self, string):
+        """Parses the given $orderby expression
+        """
+        return self.__parse_cached__('$orderby', string, self.__parse_order_by_sequence__)
+
+    def __parse_order_by_sequence__(self, string):
         self.source = string
         self.tokens = self.to_list()
         self.offset = self.current = 0
@@ -620,11 +682,16 @@ class OpenDataParser:
                     'direction': direction
                 }
             results.append(result)
-            if not self.at_end() and self.current_token.syntax == SyntaxToken.Comma().syntax:
+            if not self.at_end() and self.current_token.syntax == ',':
                 self.move_next()
         return results
 
     def parse_expand_sequence(self, string):
+        """Parses the given $expand expression
+        """
+        return self.__parse_cached__('$expand', string, self.__parse_expand_sequence__)
+
+    def __parse_expand_sequence__(self, string):
         self.source = string
         self.tokens = self.to_list()
         self.current = 0
@@ -649,7 +716,7 @@ class OpenDataParser:
             # set source
             result['source'] = self.get_source(offset, self.offset)
             results.append(result)
-            if not self.at_end() and self.current_token.syntax == SyntaxToken.Comma().syntax:
+            if not self.at_end() and self.current_token.syntax == ',':
                 self.move_next()
         return results
 
@@ -978,27 +1045,27 @@ class OpenDataParser:
 
     @staticmethod
     def is_char(c):
-        return re.search(r'[A-Za-z]', c) is not None
+        return c in CHARS
 
     @staticmethod
     def is_digit(c):
-        return re.search(r'[0-9]', c) is not None
+        return c in DIGITS
 
     @staticmethod
     def is_identifier_start(c):
-        return re.search(r'[A-Za-z0-9_$]', c) is not None
+        return c in IDENTIFIER_START_CHARS
 
     @staticmethod
     def is_whitespace(c):
-        return re.search(r'\s', c) is not None
+        return c.isspace()
 
     @staticmethod
     def is_identifier_char(c):
-        return re.search(r'[A-Za-z_$]', c) is not None
+        return c in IDENTIFIER_CHARS
 
     @staticmethod
     def is_syntax(c):
-        return re.search(r'[)(\/,\-=;:]', c[0]) is not None
+        return c[0] in SYNTAX_CHARS
 
     def next(self):
         _current = self.current
@@ -1027,10 +1094,25 @@ class OpenDataParser:
             raise Exception(f'Unexpected character {c} at offset {_current}.')
 
     def to_list(self):
+        """Returns the tokens of the current source. Tokens are cached by source,
+        and the sources which differ only in string or numeric literals share the tokens of the same template
+        """
         if type(self.source) is not str:
             return []
         self.current = 0
         self.offset = 0
+        tokens = OpenDataParser.__tokens__.get(self.source)
+        if tokens is None:
+            tokens = OpenDataParser.__to_template_list__(self.source)
+            if tokens is None:
+                tokens = self.__to_list__()
+            OpenDataParser.__tokens__.set(self.source, tokens)
+        # tokens are not modified while parsing, so they may be shared
+        return list(tokens)
+
+    def __to_list__(self):
+        self.current = 0
+        self.offset = 0
         result = []
         offset = 0
         token = self.next()
@@ -1041,6 +1123,54 @@ class OpenDataParser:
             token = self.next()
         return result
 
+    @staticmethod
+    def __tokenize__(source: str) -> list:
+        # returns the cached tokens of the given source
+        tokens = OpenDataParser.__tokens__.get(source)
+        if tokens is None:
+            parser = OpenDataParser()
+            parser.source = source
+            tokens = parser.__to_list__()
+            OpenDataParser.__tokens__.set(source, tokens)
+        return tokens
+
+    @staticmethod
+    def __to_template_list__(source: str) -> list or None:
+        # replaces the literals of the given source with placeholders and uses the tokens of the template
+        if LITERAL_PLACEHOLDER in source:
+            return None
+        literals = []
+
+        def replace(match):
+            if match.group(1):
+                # a prefixed string
+                return match.group(0)
+            literals.append(match.group(2) or match.group(3))
+            return LITERAL_PLACEHOLDER
+
+        template = LITERAL_PATTERN.sub(replace, source)
+        if len(literals) == 0:
+            return None
+        tokens = OpenDataParser.__tokenize__(template)
+        results = []
+        index = 0
+        for token in tokens:
+            if token.type != TokenType.Identifier or token.identifier != LITERAL_PLACEHOLDER:
+                results.append(token)
+                continue
+            if index >= len(literals):
+                return None
+            text = literals[index]
+            index += 1
+            literal_tokens = OpenDataParser.__tokenize__(text)
+            if len(literal_tokens) != 1 or literal_tokens[0].type != TokenType.Literal:
+                return None
+            literal = copy(literal_tokens[0])
+            # keep the whitespace which precedes the literal
+            literal.source = token.source.replace(LITERAL_PLACEHOLDER, text)
+            results.append(literal)
+        return results if index == len(literals) else None
+
     def get_source(self, start, end):
         source = ''
         for token in self.tokens[start:end]:
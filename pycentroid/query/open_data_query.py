@@ -1,14 +1,11 @@
 import inspect
 from .query_expression import QueryExpression
 from pycentroid.common import expect
-import logging
-from dill.source import getsource
 from typing import List
 
 
 def any(expr: callable):
     expect(inspect.isfunction(expr)).to_be_truthy(TypeError('Expected callable.'))
-    logging.debug(getsource(expr).strip())
     # parse expression
     select = OpenDataQueryExpression().get_closure_parser().parse_select(expr)
     # get first argument
@@ -22,7 +19,8 @@ def any(expr: callable):
 class OpenDataQueryExpression(QueryExpression):
 
     __expand__: List[QueryExpression]
-    
+    __containers__ = QueryExpression.__containers__ + ('__expand__',)
+
     def __init__(self, collection=None):
         super().__init__(collection)
         self.__expand__ = []
@@ -30,9 +28,9 @@ class OpenDataQueryExpression(QueryExpression):
     def expand(self, *args):
         for arg in args:
             if isinstance(arg, QueryExpression):
-                self.__expand__.append(arg)
+                self.__own__('__expand__').append(arg)
             elif inspect.isfunction(arg):
-                self.__expand__.append(any(arg))
+                self.__own__('__expand__').append(any(arg))
             else:
                 raise TypeError('Invalid argument type.Expected closure or query expression')
         return self
@@ -1,11 +1,12 @@
 import inspect
-from pycentroid.common import expect, AnyObject, NoneError, SyncSeriesEventEmitter
+from pycentroid.common import expect, AnyObject, NoneError, SyncSeriesEventEmitter, EventEmitterProperty
 from .closure_parser import ClosureParser
 from .query_entity import QueryEntity
 from .query_field import QueryField, get_field_expression, format_field_reference
 from types import SimpleNamespace
 from enum import Enum
 import json
+from copy import copy, deepcopy
 from typing import overload
 from typing_extensions import Self
 
@@ -46,9 +47,13 @@ class JOIN_DIRECTION(str, Enum):
 
 class QueryExpression:
 
-    resolving_member: SyncSeriesEventEmitter
-    resolving_join_member: SyncSeriesEventEmitter
-    resolving_method: SyncSeriesEventEmitter
+    resolving_member = EventEmitterProperty(SyncSeriesEventEmitter)
+    resolving_join_member = EventEmitterProperty(SyncSeriesEventEmitter)
+    resolving_method = EventEmitterProperty(SyncSeriesEventEmitter)
+    # the names of the containers which are shared with a clone and are copied before changing them
+    __shared__ = frozenset()
+    # the names of the lists which are changed in place e.g. while appending joins or orders
+    __containers__ = ('__lookup__', '__order_by__')
 
     def __init__(self, collection=None, alias=None):
         self.__where__ = None
@@ -68,9 +73,6 @@ class QueryExpression:
         self.__distinct__ = None
         self.__alias__ = alias
         self.__fixed__ = False
-        self.resolving_member = SyncSeriesEventEmitter()
-        self.resolving_join_member = SyncSeriesEventEmitter()
-        self.resolving_method = SyncSeriesEventEmitter()
 
         if collection is not None:
             self.__set_collection__(collection)
@@ -89,6 +91,41 @@ class QueryExpression:
         self.__alias__ = alias
         return self
 
+    def clone(self) -> Self:
+        """Returns a copy of this query expression which shares the expressions of this query.
+        A list which is changed in place e.g. the list of joins or orders is copied only before changing it,
+        so a query may be used as a base for other queries e.g. for counting or paging items.
+        Event subscriptions are not copied
+
+        Returns:
+            QueryExpression: A new query expression
+        """
+        result = copy(self)
+        values = result.__dict__
+        # the clone is going to create its own event emitters
+        for name in ('resolving_member', 'resolving_join_member', 'resolving_method'):
+            values.pop(name, None)
+        shared = frozenset(filter(lambda x: values.get(x) is not None, self.__containers__))
+        self.__shared__ = shared
+        result.__shared__ = shared
+        # an expression which is being prepared is copied
+        if self.__left__ is not None:
+            result.__left__ = copy(self.__left__)
+        if self.__joining__ is not None:
+            result.__joining__ = deepcopy(self.__joining__)
+        return result
+
+    def __own__(self, name: str):
+        """Returns a container of this query expression which may be changed in place
+        after copying it, if it is shared with a clone
+        """
+        value = getattr(self, name)
+        if name in self.__shared__:
+            value = copy(value)
+            setattr(self, name, value)
+            self.__shared__ = self.__shared__.difference((name,))
+        return value
+
     @property
     def alias(self) -> str:
         """Returns the alias of this expression when is going to be used a sub-query
@@ -100,21 +137,25 @@ class QueryExpression:
 
     def get_closure_parser(self) -> ClosureParser:
         parser = ClosureParser()
-
-        def resolving_join_member(event):
-            new_event = AnyObject(target=self, member=event.member, fully_qualified_name=event.fully_qualified_name)
-            self.resolving_join_member.emit(new_event)
-        parser.resolving_join_member.subscribe(resolving_join_member)
-
-        def resolving_member(event):
-            new_event = AnyObject(target=self, member=event.member)
-            self.resolving_member.emit(new_event)
-        parser.resolving_member.subscribe(resolving_member)
-
-        def resolving_method(event):
-            new_event = AnyObject(target=self, method=event.method)
-            self.resolving_method.emit(new_event)
-        parser.resolving_method.subscribe(resolving_method)
+        # forward only the events which have subscribers without creating the event emitters of this query
+        emitters = self.__dict__
+        if len(emitters.get('resolving_join_member', SyncSeriesEventEmitter).__handlers__) > 0:
+            def resolving_join_member(event):
+                new_event = AnyObject(target=self, member=event.member, fully_qualified_name=event.fully_qualified_name)
+                self.resolving_join_member.emit(new_event)
+            parser.resolving_join_member.subscribe(resolving_join_member)
+
+        if len(emitters.get('resolving_member', SyncSeriesEventEmitter).__handlers__) > 0:
+            def resolving_member(event):
+                new_event = AnyObject(target=self, member=event.member)
+                self.resolving_member.emit(new_event)
+            parser.resolving_member.subscribe(resolving_member)
+
+        if len(emitters.get('resolving_method', SyncSeriesEventEmitter).__handlers__) > 0:
+            def resolving_method(event):
+                new_event = AnyObject(target=self, method=event.method)
+                self.resolving_method.emit(new_event)
+            parser.resolving_method.subscribe(resolving_method)
 
         return parser
 
@@ -238,6 +279,26 @@ class QueryExpression:
     def not_equals(self, value):
         return self.not_equal(value)
 
+    def in_list(self, values: list):
+        expect(self.__left__).to_be_truthy(NoneError)
+        self.__append({
+            '$in': [
+                get_field_expression(self.__left__),
+                list(values)
+            ]
+        })
+        return self
+
+    def not_in_list(self, values: list):
+        expect(self.__left__).to_be_truthy(NoneError)
+        self.__append({
+            '$nin': [
+                get_field_expression(self.__left__),
+                list(values)
+            ]
+        })
+        return self
+
     def greater_than(self, value):
         expect(self.__left__).to_be_truthy(NoneError)
         self.__append({
@@ -473,14 +534,29 @@ class QueryExpression:
         return self
 
     def insert(self, source):
-        self.__insert__ = lambda: None
+        """Prepares an insert expression for the given object or list of objects.
+        A list of objects is formatted as a multi-row insert statement, so every object should have the same keys.
+
+        Args:
+            source (dict | object | list): The object or the list of objects to insert
+        """
+        if isinstance(source, list):
+            expect(len(source)).to_be_truthy(Exception('Expected a non-empty list of objects'))
+            self.__insert__ = [self.__insert_item__(item) for item in source]
+        else:
+            self.__insert__ = self.__insert_item__(source)
+        return self
+
+    @staticmethod
+    def __insert_item__(source):
+        item = lambda: None  # noqa:E731
         if type(source) is dict:
             for key in source:
-                setattr(self.__insert__, key, source[key])
+                setattr(item, key, source[key])
         else:
             for key, value in source.__dict__.items():
-                setattr(self.__insert__, key, value)
-        return self
+                setattr(item, key, value)
+        return item
 
     def into(self, collection):
         self.__select__ = None
@@ -535,7 +611,7 @@ class QueryExpression:
             }
         })
         # append join expression
-        self.__lookup__.append(self.__joining__)
+        self.__own__('__lookup__').append(self.__joining__)
         # cleanup joining expression
         self.__joining__ = None
         return self
@@ -552,7 +628,7 @@ class QueryExpression:
         Returns:
             QueryExpression
         """
-        self.__lookup__.append({
+        self.__own__('__lookup__').append({
             '$lookup': {
                 'from': collection,
                 'localField': local_field,
@@ -575,7 +651,7 @@ class QueryExpression:
         Returns:
             QueryExpression
         """
-        self.__lookup__.append({
+        self.__own__('__lookup__').append({
             '$lookup': {
                 'from': collection,
                 'localField': local_field,
@@ -589,8 +665,9 @@ class QueryExpression:
     def __append_order__(self, expr, direction) -> Self:
         if self.__order_by__ is None:
             self.__order_by__ = []
+        order_by = self.__own__('__order_by__')
         if type(expr) is str:
-            self.__order_by__.append({
+            order_by.append({
                 '$expr': format_field_reference(expr),
                 'direction': direction
             })
@@ -598,14 +675,14 @@ class QueryExpression:
             for key in expr:
                 value = expr[key]
                 if type(value) is int and expr[key] == 1:
-                    self.__order_by__.append({
+                    order_by.append({
                         '$expr': format_field_reference(key),
                         'direction': direction
                     })
                 elif type(value) is int and expr[key] == 0:
                     break
                 else:
-                    self.__order_by__.append({
+                    order_by.append({
                         '$expr': expr,
                         'direction': direction
                     })
@@ -695,6 +772,59 @@ class QueryExpression:
             return self.__append_order__(QueryField(expr), -1)
         return self.__append_order__(expr, -1)
 
+    def seek(self, values: list) -> Self:
+        """Filters the items which follow an item with the given values of order by expressions
+        e.g. WHERE (name,id)>('Product 1',50). This is keyset pagination, so a page is found by an index seek
+        instead of skipping the items of previous pages.
+        Order by expressions should be unique and not nullable e.g. they should end with the primary key.
+
+        Args:
+            values (list): The values of order by expressions of the last item of the previous page
+
+        Returns:
+            QueryExpression
+        """
+        expect(self.__order_by__).to_be_truthy(Exception('Order by expression is required while seeking items'))
+        expect(len(values) == len(self.__order_by__)).to_be_truthy(
+            Exception('The number of values must be equal to the number of order by expressions')
+            )
+        exprs = list(map(lambda x: x.get('$expr'), self.__order_by__))
+        directions = list(map(lambda x: x.get('direction'), self.__order_by__))
+        if len(exprs) == 1:
+            expr = {
+                '$lt' if directions[0] == -1 else '$gt': [exprs[0], values[0]]
+            }
+        elif len(set(directions)) == 1:
+            # compare row values e.g. (name,id)>(?,?)
+            expr = {
+                '$lt' if directions[0] == -1 else '$gt': [
+                    {'$row': exprs},
+                    {'$row': list(values)}
+                ]
+            }
+        else:
+            # use an expanded expression for mixed directions e.g. (name<?) OR (name=? AND id>?)
+            items = []
+            for index in range(len(exprs)):
+                conditions = [{'$eq': [exprs[i], values[i]]} for i in range(index)]
+                conditions.append({
+                    '$lt' if directions[index] == -1 else '$gt': [exprs[index], values[index]]
+                })
+                items.append(conditions[0] if len(conditions) == 1 else {'$and': conditions})
+            expr = {
+                '$or': items
+            }
+        if self.__where__ is None:
+            self.__where__ = expr
+        else:
+            self.__where__ = {
+                '$and': [
+                    self.__where__,
+                    expr
+                ]
+            }
+        return self
+
     def group_by(self, *args, **kwargs):
         arguments = args
         if inspect.isfunction(args[0]):
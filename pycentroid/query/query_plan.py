@@ -0,0 +1,311 @@
+from copy import copy
+from pycentroid.common import LRUCache
+from .query_expression import QueryExpression
+from .query_field import get_first_key
+
+
+class QueryParameter:
+    """Represents a constant value of a query expression which has been abstracted out of a query plan
+    """
+    __slots__ = ('index',)
+
+    def __init__(self, index: int):
+        self.index = index
+
+
+class QueryPlan:
+    """Holds the formatted SQL statement of a query shape and the parameters which are required for executing it
+    """
+    __slots__ = ('sql', 'parameters')
+
+    def __init__(self, sql: str, parameters: list):
+        self.sql = sql
+        self.parameters = tuple(parameters)
+
+    def bind(self, values: list) -> list:
+        """Returns the query parameters of this plan by using the constant values of a query expression
+
+        Args:
+            values (list): A list of constant values extracted from a query expression of the same shape
+
+        Returns:
+            list: The ordered collection of query parameters
+        """
+        return [values[p.index] if type(p) is QueryParameter else p for p in self.parameters]
+
+
+def freeze(value):
+    """Converts the given value to an equivalent hashable value
+    """
+    if isinstance(value, dict):
+        return tuple((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    if isinstance(value, QueryExpression):
+        return QueryShape().query(value)[0]
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return repr(value)
+
+
+def get_object_items(value):
+    if isinstance(value, dict):
+        return value.items()
+    return value.__dict__.items()
+
+
+class QueryShape:
+    """Walks through a query expression and produces a hashable key which describes its structure.
+    Constant values are abstracted out of this key and are being collected in order.
+    """
+
+    # named arguments which are evaluated by a dialect while formatting an expression e.g. $regexMatch options
+    StructuralArguments = ('options',)
+
+    def __init__(self, rebuild: bool = False):
+        """
+        Args:
+            rebuild (bool, optional): Indicates whether to produce a copy of each expression where constant values
+            have been replaced by query parameters
+        """
+        self.rebuild = rebuild
+        self.values = []
+
+    def constant(self, value):
+        index = len(self.values)
+        self.values.append(value)
+        return (QueryParameter,), QueryParameter(index) if self.rebuild else None
+
+    def expression(self, expr):
+        if expr is None:
+            return None, None
+        if isinstance(expr, dict):
+            name = get_first_key(expr)
+            if name is None:
+                return (), expr
+            if name.startswith('$'):
+                params = expr[name]
+                if isinstance(params, list):
+                    shapes = []
+                    rebuilt = [] if self.rebuild else None
+                    for param in params:
+                        shape, item = self.expression(param)
+                        shapes.append(shape)
+                        if self.rebuild:
+                            rebuilt.append(item)
+                    return (name, tuple(shapes)), {name: rebuilt} if self.rebuild else None
+                if isinstance(params, dict):
+                    shapes = []
+                    rebuilt = {} if self.rebuild else None
+                    for key, param in params.items():
+                        if key in QueryShape.StructuralArguments:
+                            shape, item = freeze(param), param
+                        else:
+                            shape, item = self.expression(param)
+                        shapes.append((key, shape))
+                        if self.rebuild:
+                            rebuilt[key] = item
+                    return (name, tuple(shapes)), {name: rebuilt} if self.rebuild else None
+                shape, item = self.expression(params)
+                return (name, shape), {name: item} if self.rebuild else None
+            # an object name or a dictionary which is formatted as is
+            return freeze(expr), expr
+        if isinstance(expr, list):
+            # a list of values e.g. the right operand of an $in expression
+            shapes = []
+            rebuilt = [] if self.rebuild else None
+            for value in expr:
+                shape, item = self.expression(value)
+                shapes.append(shape)
+                if self.rebuild:
+                    rebuilt.append(item)
+            return (list, tuple(shapes)), rebuilt
+        if type(expr) is str and expr.startswith('$'):
+            return expr, expr
+        return self.constant(expr)
+
+    def pairs(self, source):
+        if source is None:
+            return None, None
+        if isinstance(source, list):
+            # a multi-row insert expression
+            shapes = []
+            rebuilt = [] if self.rebuild else None
+            for item in source:
+                shape, item = self.pairs(item)
+                shapes.append(shape)
+                if self.rebuild:
+                    rebuilt.append(item)
+            return tuple(shapes), rebuilt
+        shapes = []
+        rebuilt = {} if self.rebuild else None
+        for key, value in get_object_items(source):
+            shape, item = self.expression(value)
+            shapes.append((key, shape))
+            if self.rebuild:
+                rebuilt[key] = item
+        return tuple(shapes), rebuilt
+
+    def select(self, select: dict):
+        if select is None:
+            return None, None
+        shapes = []
+        rebuilt = {} if self.rebuild else None
+        for key, value in select.items():
+            if value == 1:
+                shape, item = 1, value
+            else:
+                shape, item = self.expression(value)
+            shapes.append((key, shape))
+            if self.rebuild:
+                rebuilt[key] = item
+        return tuple(shapes), rebuilt
+
+    def lookup(self, lookup: list):
+        if lookup is None:
+            return None, None
+        shapes = []
+        rebuilt = [] if self.rebuild else None
+        for join in lookup:
+            expr: dict = join.get('$lookup')
+            shape = []
+            item = {} if self.rebuild else None
+            for key, value in expr.items():
+                if key == 'from' and isinstance(value, QueryExpression):
+                    value_shape, value = self.query(value)
+                elif key == 'pipeline' and value is not None:
+                    value_shape, match_expr = self.expression(value['$match']['$expr'])
+                    value = {'$match': {'$expr': match_expr}}
+                else:
+                    value_shape = freeze(value)
+                shape.append((key, value_shape))
+                if self.rebuild:
+                    item[key] = value
+            shapes.append(tuple(shape))
+            if self.rebuild:
+                rebuilt.append({'$lookup': item})
+        return tuple(shapes), rebuilt
+
+    def order_by(self, order_by: list):
+        if order_by is None:
+            return None, None
+        shapes = []
+        rebuilt = [] if self.rebuild else None
+        for item in order_by:
+            shape, expr = self.expression(item.get('$expr'))
+            shapes.append((shape, item.get('direction')))
+            if self.rebuild:
+                rebuilt.append({'$expr': expr, 'direction': item.get('direction')})
+        return tuple(shapes), rebuilt
+
+    def group_by(self, group_by: list):
+        if group_by is None:
+            return None, None
+        shapes = []
+        rebuilt = [] if self.rebuild else None
+        for item in group_by:
+            if type(item) is str:
+                shape, expr = self.expression(item)
+            else:
+                shape, expr = self.expression(item.get('$expr'))
+                expr = {'$expr': expr}
+            shapes.append(shape)
+            if self.rebuild:
+                rebuilt.append(expr)
+        return tuple(shapes), rebuilt
+
+    def query(self, query: QueryExpression):
+        """Returns the shape of the given query expression and a copy of it, if rebuild is enabled
+
+        Args:
+            query (QueryExpression): The query expression to walk through
+
+        Returns:
+            tuple: A tuple of a hashable key and a query expression
+        """
+        select_shape, select = self.select(query.__select__)
+        lookup_shape, lookup = self.lookup(query.__lookup__)
+        where_shape, where = self.expression(query.__where__)
+        order_shape, order_by = self.order_by(query.__order_by__)
+        group_shape, group_by = self.group_by(query.__group_by__)
+        insert_shape, insert = self.pairs(query.__insert__)
+        update_shape, update = self.pairs(query.__update__)
+        # limit and offset are query parameters, so only their presence is a part of query shape
+        # e.g. the pages of a paged result set share the same query plan
+        has_limit = query.__limit__ > 0
+        has_skip = has_limit and query.__skip__ > 0
+        limit = self.constant(query.__limit__)[1] if has_limit else 0
+        skip = self.constant(query.__skip__)[1] if has_skip else 0
+        shape = (
+            freeze(query.__collection__),
+            select_shape,
+            query.__distinct__,
+            lookup_shape,
+            where_shape,
+            order_shape,
+            group_shape,
+            has_limit,
+            has_skip,
+            insert_shape,
+            update_shape,
+            query.___delete___
+        )
+        if not self.rebuild:
+            return shape, None
+        result = copy(query)
+        result.__select__ = select
+        result.__lookup__ = lookup
+        result.__where__ = where
+        result.__order_by__ = order_by
+        result.__group_by__ = group_by
+        result.__insert__ = insert
+        result.__update__ = update
+        result.__limit__ = limit
+        result.__skip__ = skip
+        return shape, result
+
+
+class QueryPlanCache(LRUCache):
+    """A cache of query plans which are keyed by the shape of query expressions. Query expressions which differ
+    only in their constant values share the same SQL statement and skip formatting.
+    """
+
+    def __init__(self, max_size: int = 512):
+        super().__init__(max_size)
+
+    def format(self, formatter, query: QueryExpression):
+        """Formats the given query expression by using a cached query plan, if any
+
+        Args:
+            formatter (SqlFormatter): The formatter to use while compiling a new query plan
+            query (QueryExpression): The query expression to format
+
+        Returns:
+            tuple: The SQL statement and its query parameters
+        """
+        shape = QueryShape()
+        key = (formatter.__class__, shape.query(query)[0])
+        plan: QueryPlan = self.get(key)
+        if plan is None:
+            plan = self.compile(formatter, query)
+            self.set(key, plan)
+        return plan.sql, plan.bind(shape.values)
+
+    # noinspection PyMethodMayBeStatic
+    def compile(self, formatter, query: QueryExpression) -> QueryPlan:
+        """Formats a copy of the given query expression where constant values have been replaced by query parameters
+
+        Args:
+            formatter (SqlFormatter): The formatter to use
+            query (QueryExpression): The query expression to compile
+
+        Returns:
+            QueryPlan: A query plan for query expressions of the same shape
+        """
+        shape = QueryShape(rebuild=True)
+        _, final_query = shape.query(query)
+        parameters = []
+        sql = formatter.format(final_query, parameters)
+        return QueryPlan(sql, parameters)
@@ -0,0 +1,128 @@
+import math
+from array import array
+from typing import List, Iterable
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# the typecodes of compact arrays by sql type
+TYPECODES = {
+    'Integer': 'q',
+    'Counter': 'q',
+    'Float': 'd',
+    'Number': 'd',
+    'Boolean': 'b'
+}
+
+# the data types of numpy arrays by typecode
+DTYPES = {
+    'q': 'int64',
+    'd': 'float64',
+    'b': 'bool'
+}
+
+
+def infer_typecode(values: tuple) -> str or None:
+    """Returns the typecode of a compact array which may hold the given values,
+    or None if the values should be kept in a list
+    """
+    value = next(filter(lambda x: x is not None, values), None)
+    if type(value) is bool:
+        return 'b'
+    if type(value) is int:
+        return 'q'
+    if type(value) is float:
+        return 'd'
+    return None
+
+
+class ColumnBuffer:
+    """Collects the values of a result column into a compact array.
+    Integer, float and boolean values are stored in an array.array, while other values are stored in a list.
+    A NULL value converts an integer or a boolean column to a float column with NaN values,
+    and a value of another type converts a numeric column to a list.
+    """
+
+    def __init__(self, name: str, typecode: str = None):
+        """Creates a column buffer
+
+        Args:
+            name (str): The name of the column
+            typecode (str, optional): The typecode of the column e.g. q for integers, d for floats or b for booleans.
+                If it is empty, the typecode is inferred by the first value which is not NULL
+        """
+        self.name = name
+        self.typecode = typecode
+        self.__values__: array or list or None = None
+        # the number of NULL values which have been collected before inferring the typecode of the column
+        self.__nulls__ = 0
+
+    def extend(self, values: tuple):
+        """Appends the given values to this column
+        """
+        if self.__values__ is None:
+            if self.typecode is None:
+                self.typecode = infer_typecode(values)
+                if self.typecode is None and all(map(lambda x: x is None, values)):
+                    # wait for a value which is not NULL
+                    self.__nulls__ += len(values)
+                    return
+            self.__values__ = [] if self.typecode is None else array(self.typecode)
+            if self.__nulls__ > 0:
+                nulls = (None,) * self.__nulls__
+                self.__nulls__ = 0
+                self.extend(nulls)
+        if self.typecode is None:
+            self.__values__.extend(values)
+            return
+        if None in values:
+            if self.typecode != 'd':
+                self.__convert__('d')
+            values = [math.nan if x is None else x for x in values]
+        try:
+            # create a temporary array in order to extend this column with all the given values or none of them
+            self.__values__.extend(array(self.typecode, values))
+        except (TypeError, OverflowError):
+            self.__convert__(None)
+            self.__values__.extend(values)
+
+    def __convert__(self, typecode: str or None):
+        if typecode is None:
+            self.__values__ = self.__values__.tolist()
+        else:
+            self.__values__ = array(typecode, self.__values__)
+        self.typecode = typecode
+
+    def value(self):
+        """Returns the values of this column as a numpy array, if numpy is available,
+        otherwise, as an array.array or a list. A numpy array holds a copy of values, so it is writable.
+        """
+        values = self.__values__
+        if values is None:
+            values = [None] * self.__nulls__
+        if numpy is None:
+            return values
+        if self.typecode is None:
+            return numpy.array(values, dtype=object)
+        # a copy of the buffer of values is converted to the data type of the column e.g. int8 to bool
+        return numpy.array(values, dtype=DTYPES[self.typecode])
+
+
+def to_columns(names: List[str], batches: Iterable[List[tuple]], typecodes: dict = None) -> dict:
+    """Converts the given batches of rows to a dictionary of columns
+
+    Args:
+        names (List[str]): The names of columns
+        batches (Iterable[List[tuple]]): A collection of batches of rows e.g. the batches which are fetched by a cursor
+        typecodes (dict, optional): A dictionary of typecodes by column name
+
+    Returns:
+        dict: A dictionary of column values by name
+    """
+    buffers = list(map(lambda x: ColumnBuffer(x, (typecodes or {}).get(x)), names))
+    for rows in batches:
+        for buffer, values in zip(buffers, zip(*rows)):
+            buffer.extend(values)
+    return dict(map(lambda x: (x.name, x.value()), buffers))
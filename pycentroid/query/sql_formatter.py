@@ -1,20 +1,47 @@
 from .query_expression import QueryExpression
 from .query_field import get_first_key
-from pycentroid.common import expect, AnyObject
-from pycentroid.common.events import SyncSeriesEventEmitter
-from .utils import SqlUtils
+from .query_plan import QueryParameter
+from contextvars import ContextVar
+from pycentroid.common import expect
+from .utils import SqlUtils, BACKSLASH_ESCAPE_TABLE
 from .object_name_validator import ObjectNameValidator
 import re
 
 
 class SqlDialectOptions:
-    def __init__(self, name_format=r'\1', force_alias=True):
+    def __init__(self, name_format=r'\1', force_alias=True, placeholder='?', escape_table=BACKSLASH_ESCAPE_TABLE):
         self.name_format = name_format
         self.force_alias = force_alias
+        self.placeholder = placeholder
+        # a translation table which escapes the characters of string literals
+        self.escape_table = escape_table
+
+
+class SqlFormatterState:
+    """Holds the state of formatting a query expression. Dialects and formatters do not hold any state,
+    so a single instance of them may be shared by concurrent tasks and threads
+    """
+
+    __slots__ = ('collection', 'values')
+
+    def __init__(self, collection: str = None, values: list = None):
+        """Creates the state of formatting a query expression
+
+        Args:
+            collection (str, optional): The collection (or alias) which qualifies unqualified names
+                of a query with joins
+            values (list, optional): A list which collects query parameters while formatting a parameterized query
+        """
+        self.collection = collection
+        self.values = values
+
+
+# the state of the query expression which is being formatted by the current task or thread
+__format_state__: ContextVar = ContextVar('format_state', default=SqlFormatterState())
 
 
 LogicalOperators = ['$and', '$or']
-ComparisonOperators = ['$eq', '$ne', '$gt', '$gte', '$lt', '$lte']
+ComparisonOperators = ['$eq', '$ne', '$gt', '$gte', '$lt', '$lte', '$in', '$nin']
 
 
 class SqlDialect:
@@ -35,11 +62,19 @@ class SqlDialect:
     Inner = 'INNER'
     Left = 'LEFT'
     Right = 'RIGHT'
+    # field type definitions by type name
+    types = {}
+    # a validator which escapes object names and is shared by all dialects
+    __validator__ = ObjectNameValidator()
 
     def __init__(self, options=SqlDialectOptions()):
         self.options = options
-        self.types = dict()
-        self.resolving_collection = SyncSeriesEventEmitter()
+
+    @property
+    def state(self) -> SqlFormatterState:
+        """Returns the state of the query expression which is being formatted by the current task
+        """
+        return __format_state__.get()
 
     def format_type(self, name: str, type: str, nullable=True, size=None, scale=None, ordinal=None, primary=False):
         # get type definition
@@ -102,11 +137,24 @@ class SqlDialect:
                 return self.escape_name(self.__format_name__(key))
         if type(value) is str and value.startswith('$'):
             return self.escape_name(self.__format_name__(value))
-        return SqlUtils.escape(value)
+        return self.escape_constant(value)
 
-    # noinspection PyMethodMayBeStatic
     def escape_constant(self, value):
-        return SqlUtils.escape(value)
+        """Escapes a constant value or appends it to the collection of query parameters
+        while formatting a parameterized query
+
+        Args:
+            value (*): A value to escape
+
+        Returns:
+            str: An escaped sql string or a parameter placeholder
+        """
+        values = self.state.values
+        # null values are always formatted inline e.g. "IS NULL" expressions
+        if values is not None and value is not None and type(value) is not dict:
+            values.append(value)
+            return self.options.placeholder
+        return SqlUtils.escape(value, escape_table=self.options.escape_table)
 
     def escape_name(self, value):
         name = value if value.startswith('$') is False else value[1:]
@@ -117,34 +165,51 @@ class SqlDialect:
         if len(member) > 2:
             # get only the two last of them e.g. $customer.address.addressLocality -> address.addressLocality
             name = '.'.join(member[2:])
-        return ObjectNameValidator().escape(name, self.options.name_format)
+        return self.__validator__.escape(name, self.options.name_format)
 
     def __format_name__(self, value):
         name = value if value.startswith('$') is False else value[1:]
         if not name.__contains__('.'):
             # try to get in-process collection name, if any
-            event = AnyObject(collection=None)
-            # raise resolving collection event
-            self.resolving_collection.emit(event)
-            # if collection has been defined
-            if event.collection is not None:
+            collection = self.state.collection
+            if collection is not None:
                 # concatenate attribute name
-                name = event.collection + '.' + name
+                name = collection + '.' + name
         return name
 
     # noinspection PyMethodOverriding
     def __eq__(self, left, right):
+        # important note: escape left operand first to keep query parameters in order
+        final_left = self.escape(left)
         final_right = self.escape(right)
         if final_right == 'NULL':
-            return f'{self.escape(left)} IS NULL'
-        return f'({self.escape(left)}={final_right})'
+            return f'{final_left} IS NULL'
+        return f'({final_left}={final_right})'
 
     # noinspection PyMethodOverriding
     def __ne__(self, left, right):
+        final_left = self.escape(left)
         final_right = self.escape(right)
         if final_right == 'NULL':
-            return f'NOT {self.escape(left)} IS NULL'
-        return f'(NOT {self.escape(left)}<>{final_right})'
+            return f'NOT {final_left} IS NULL'
+        return f'(NOT {final_left}<>{final_right})'
+
+    def __in__(self, left, right: list):
+        if len(right) == 0:
+            return '(1=0)'
+        final_left = self.escape(left)
+        values = ','.join(map(lambda x: self.escape(x), right))
+        return f'({final_left} IN ({values}))'
+
+    def __nin__(self, left, right: list):
+        if len(right) == 0:
+            return '(1=1)'
+        final_left = self.escape(left)
+        values = ','.join(map(lambda x: self.escape(x), right))
+        return f'(NOT {final_left} IN ({values}))'
+
+    def __row__(self, *args):
+        return '(' + ','.join(map(lambda x: self.escape(x), args)) + ')'
 
     def __gt__(self, left, right):
         return f'({self.escape(left)}>{self.escape(right)})'
@@ -194,6 +259,10 @@ class SqlDialect:
     def __count__(self, expr):
         return f'COUNT({self.escape(expr)})'
 
+    def __countOver__(self):
+        # the total number of rows of a result set before applying limit and offset
+        return 'COUNT(*) OVER ()'
+
     def __min__(self, expr):
         return f'MIN({self.escape(expr)})'
 
@@ -346,11 +415,11 @@ class SqlFormatter:
                 sql += SqlDialect.Space
                 if isinstance(from_collection, QueryExpression):
                     sql += '('
-                    formatter = self.__class__()
                     expect(from_collection.__select__).to_be_truthy(
                         Exception('Expected select expression')
                         )
-                    sql += formatter.format(from_collection)
+                    # format subquery with its own state but keep collecting query parameters in order
+                    sql += self.format(from_collection, self.__dialect__.state.values)
                     sql += ')'
                 else:
                     sql += self.__dialect__.escape_name(from_collection)
@@ -470,16 +539,23 @@ class SqlFormatter:
             sql += self.format_group_by(query)
         return sql
 
+    @staticmethod
+    def __is_positive__(value) -> bool:
+        # a query parameter of a query plan stands for a positive limit or offset
+        return type(value) is QueryParameter or value > 0
+
     def format_limit_select(self, query: QueryExpression):
         sql = self.format_select(query)
-        if query.__limit__ > 0:
+        if self.__is_positive__(query.__limit__):
             sql += SqlDialect.Space
             sql += 'LIMIT'
             sql += SqlDialect.Space
-            sql += str(query.__limit__)
-            if query.__skip__ > 0:
-                sql += ','
-                sql += str(query.__skip__)
+            sql += self.__dialect__.escape_constant(query.__limit__)
+            if self.__is_positive__(query.__skip__):
+                sql += SqlDialect.Space
+                sql += 'OFFSET'
+                sql += SqlDialect.Space
+                sql += self.__dialect__.escape_constant(query.__skip__)
         return sql
 
     def format_update(self, query: QueryExpression):
@@ -519,16 +595,22 @@ class SqlFormatter:
         sql += SqlDialect.Space
         sql += self.__dialect__.escape_name(query.__collection__.collection)
 
-        values = []
+        # a multi-row insert expression is a list of objects with the same keys
+        items = query.__insert__ if isinstance(query.__insert__, list) else [query.__insert__]
+        rows = []
         keys = []
-        # get keys and values
-        if type(query.__insert__) is dict:
-            pairs = query.__insert__.items()
-        else:
-            pairs = query.__insert__.__dict__.items()
-        for key, value in pairs:
-            keys.append(self.__dialect__.escape_name(key))
-            values.append(self.__dialect__.escape(value))
+        for item in items:
+            values = []
+            # get keys and values
+            if type(item) is dict:
+                pairs = item.items()
+            else:
+                pairs = item.__dict__.items()
+            for key, value in pairs:
+                if len(rows) == 0:
+                    keys.append(self.__dialect__.escape_name(key))
+                values.append(self.__dialect__.escape(value))
+            rows.append('(' + ','.join(values) + ')')
 
         # format keys
         sql += '('
@@ -540,9 +622,7 @@ class SqlFormatter:
         sql += SqlDialect.Values
         sql += SqlDialect.Space
 
-        sql += '('
-        sql += ','.join(values)
-        sql += ')'
+        sql += ','.join(rows)
 
         return sql
 
@@ -579,19 +659,23 @@ class SqlFormatter:
     def format_where(self, where):
         return self.__dialect__.escape(where)
 
-    def format(self, query: QueryExpression):
-        collection = None
-        if query.__collection__ is not None:
-            # get collection name (or alias)
-            collection = query.__collection__.alias if query.__collection__.alias is not None else query.__collection__.collection  # noqa:E501
+    def format(self, query: QueryExpression, values: list = None):
+        """Formats the given query expression
 
-        # subscriber for resolving collection
-        def resolving_collection(event):
-            if query.__lookup__ is not None and len(query.__lookup__) > 0:
-                event.collection = collection
+        Args:
+            query (QueryExpression): The query expression to format
+            values (list, optional): A list which is going to hold query parameters. If defined, constant values
+                are being formatted as parameter placeholders and appended to this list in order.
 
-        # subscribe event
-        subscription = self.__dialect__.resolving_collection.subscribe(resolving_collection)
+        Returns:
+            str: The equivalent SQL statement
+        """
+        collection = None
+        # unqualified names are qualified by collection name (or alias) only if query has joins
+        if query.__collection__ is not None and query.__lookup__ is not None and len(query.__lookup__) > 0:
+            collection = query.__collection__.alias if query.__collection__.alias is not None else query.__collection__.collection  # noqa:E501
+        # set the state of formatting for the current task
+        token = __format_state__.set(SqlFormatterState(collection, values))
         try:
             if query.__update__ is not None:
                 return self.format_update(query)
@@ -600,10 +684,10 @@ class SqlFormatter:
             elif query.___delete___:
                 return self.format_delete(query)
             else:
-                if query.__limit__ > 0:
+                if self.__is_positive__(query.__limit__):
                     return self.format_limit_select(query)
                 else:
                     return self.format_select(query)
         finally:
-            # unsubscribe collection event
-            subscription.unsubscribe()
+            # restore the previous state e.g. while formatting a subquery
+            __format_state__.reset(token)
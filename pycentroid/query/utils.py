@@ -37,52 +37,74 @@ class TestUtils:
                 raise error
 
 
+# a translation table which escapes the special characters of a string literal with backslashes
+# in a single pass, so the backslashes which are inserted are not escaped again e.g. for MySQL
+BACKSLASH_ESCAPE_TABLE = str.maketrans({
+    '\0': '\\0',
+    '\b': '\\b',
+    '\t': '\\t',
+    '\n': '\\n',
+    '\r': '\\r',
+    '\x1a': '\\Z',
+    '"': '\\"',
+    '\'': '\\\'',
+    '\\': '\\\\'
+})
+
+# a translation table which escapes a string literal of standard SQL e.g. for SQLite,
+# where a single quote is doubled and a backslash is an ordinary character.
+# A NUL character cannot be a part of an SQL statement, so it is concatenated as CHAR(0)
+QUOTE_ESCAPE_TABLE = str.maketrans({
+    '\'': '\'\'',
+    '\0': '\'||CHAR(0)||\''
+})
+
+
 class SqlUtils:
+    # value escaping by type
+    __escape__ = {
+        type(None): lambda value, timezone, escape_table: 'NULL',
+        bool: lambda value, timezone, escape_table: 'true' if value is True else 'false',
+        int: lambda value, timezone, escape_table: str(value),
+        float: lambda value, timezone, escape_table: str(value),
+        bytearray: lambda value, timezone, escape_table: SqlUtils.bytes_to_string(value),
+        datetime: lambda value, timezone, escape_table: SqlUtils.date_to_string(value, timezone),
+        dict: lambda value, timezone, escape_table: SqlUtils.dict_to_values(value, timezone),
+        str: lambda value, timezone, escape_table: '\'' + value.translate(escape_table) + '\''
+    }
 
     @staticmethod
-    def escape(value, timezone=None):
+    def escape(value, timezone=None, escape_table: dict = BACKSLASH_ESCAPE_TABLE):
         """Escapes any value to an equivalent sql string
 
         Args:
             value (*): A value to escape
             timezone (*): A value to escape
+            escape_table (dict, optional): A translation table which escapes the characters of string literals
 
         Returns:
                 value (str) An escaped sql string
         """
-        if value is None:
-            return 'NULL'
-        # escape boolean
-        if type(value) is bool:
-            return 'true' if value is True else 'false'
-        # escape boolean
-        if type(value) is int or type(value) is float:
-            return str(value)
-        if type(value) is bytearray:
-            return SqlUtils.bytes_to_string(value)
-        if type(value) is datetime:
-            return SqlUtils.date_to_string(value, timezone)
-        if type(value) is dict:
-            return SqlUtils.dict_to_values(value, timezone)
-
-        val = str(value)
+        escape = SqlUtils.__escape__.get(type(value))
+        if escape is not None:
+            return escape(value, timezone, escape_table)
         # surround with single quotes
-        return '\'' + SqlUtils.escape_string(val) + '\''
+        return '\'' + str(value).translate(escape_table) + '\''
 
     @staticmethod
-    def escape_string(val):
+    def escape_string(val, escape_table: dict = BACKSLASH_ESCAPE_TABLE):
+        """Escapes the special characters of the given string in a single pass
+
+        Args:
+            val (str): A string to escape
+            escape_table (dict, optional): A translation table e.g. BACKSLASH_ESCAPE_TABLE or QUOTE_ESCAPE_TABLE
+
+        Returns:
+            str: The escaped string without surrounding quotes
+        """
         if val is None:
             return 'NULL'
-        val = re.sub('\'', '\\\'', val)  # ' => \\'
-        val = re.sub('\n', '\\\\n', val)  # \n => \\n
-        val = re.sub('\r', '\\\\r', val)  # \r => \\r
-        val = re.sub('\b', '\\\\b', val)  # \b => \\b
-        val = re.sub('\t', '\\\\t', val)  # \t => \\t
-        val = re.sub('\0', '\\\\0', val)  # \0 => \\0
-        val = re.sub('\x1a', '\\\\Z', val)  # \x1a => \\Z
-        val = re.sub('"', '\\"', val)  # " => \"
-        val = re.sub('\\\\', '\\\\\\\\', val)  # \\ => \\\\
-        return val
+        return val.translate(escape_table)
 
     @staticmethod
     def convert_timezone(tz):
@@ -1,2 +1,6 @@
-from .dialect import SqliteDialect, SqliteFormatter
+from .dialect import SqliteDialect, SqliteFormatter, SQLITE_DIALECT, SQLITE_FORMATTER
 from .adapter import SqliteAdapter, SqliteTable, SqliteView, SqliteTableIndex
+from .pool import SqlitePool
+from .workers import SqliteWorkers
+from .planner import SqliteSchemaPlanner
+from .rows import SqliteRow
@@ -1,11 +1,17 @@
-from .dialect import SqliteDialect, SqliteFormatter
-from pycentroid.query import QueryExpression, DataAdapter, DataTable, DataView, DataTableIndex
+from .dialect import SqliteDialect, SQLITE_DIALECT, SQLITE_FORMATTER
+from .pool import SqlitePool
+from .workers import SqliteWorkers
+from .planner import SqliteSchemaPlanner, to_column
+from .rows import row_class
+from pycentroid.query import QueryExpression, DataAdapter, DataTable, DataView, DataTableIndex, to_columns
 import sqlite3
 import re
-import time
 from typing import Callable
+from datetime import datetime
 from pycentroid.common import AnyObject
+from pycentroid.query import SqlUtils, QueryPlanCache
 import logging
+from os.path import abspath
 
 
 class SqliteTableIndex(DataTableIndex):
@@ -15,31 +21,23 @@ class SqliteTableIndex(DataTableIndex):
 
     async def create(self, name: str, columns: list):
         await self.drop(name)
-        sql = 'CREATE INDEX'
-        sql += SqliteDialect.Space
-        sql += SqliteDialect().escape_name(name)
-        sql += SqliteDialect.Space
-        sql += 'ON'
-        sql += SqliteDialect.Space
-        sql += SqliteDialect().escape_name(self.table)
-        sql += '('
-        sql += ','.join(map(lambda x: SqliteDialect().escape_name(x.name), columns))
-        sql += ');'
-        await self.__adapter__.execute(sql)
+        await self.__adapter__.execute(
+            SqliteSchemaPlanner.format_create_index(name, self.table, list(map(lambda x: x.name, columns)))
+        )
 
     async def exists(self, name: str):
-        table = SqliteDialect().escape_name(self.table)
+        table = SQLITE_DIALECT.escape_name(self.table)
         results = await self.__adapter__.execute(f'PRAGMA INDEX_LIST({table})')
         return next(filter(lambda x: x.origin == 'c' and x.name == name, results), None) is not None
 
     async def drop(self, name: str):
         exists = await self.exists(name)
         if exists:
-            index = SqliteDialect().escape_name(name)
+            index = SQLITE_DIALECT.escape_name(name)
             await self.__adapter__.execute(f'DROP INDEX {index}')
 
     async def list(self):
-        table = SqliteDialect().escape_name(self.table)
+        table = SQLITE_DIALECT.escape_name(self.table)
         # get index list
         results = await self.__adapter__.execute(f'PRAGMA INDEX_LIST({table})')
         # prepare index list
@@ -59,95 +57,12 @@ class SqliteTable(DataTable):
         super().__init__(table, adapter)
 
     async def create(self, fields: list):
-        if len(fields) == 0:
-            Exception('Field collection cannot be empty while creating a database table.')
-        dialect = SqliteDialect()
-        sql = 'CREATE TABLE'
-        sql += SqliteDialect.Space
-        sql += dialect.escape_name(self.table)
-        sql += '('
-        sql += ','.join(map(lambda x: dialect.format_type(name=x.name, type=x.type, nullable=x.nullable, size=x.size,
-                                                          scale=x.scale), fields))
-        sql += ')'
-        return await self.__adapter__.execute(sql)
+        return await self.__adapter__.execute(SqliteSchemaPlanner.format_create(self.table, fields))
 
     async def change(self, fields: list):
-        exists = await self.__adapter__.table(self.table).exists()
-        if not exists:
-            return await self.create(fields)
-        # get table fields
-        existing_fields = await self.columns()
-        dialect = SqliteDialect()
-        sqls = []
-        table = dialect.escape_name(self.table)
-        should_copy_table = False
-        for field in fields:
-            existing_field = next(filter(lambda x: x.name == field.name, existing_fields), None)
-            if existing_field is not None:
-                if not existing_field.primary:
-                    existing_field_type = dialect.escape_name(existing_field.name)
-                    existing_field_type += SqliteDialect.Space
-                    existing_field_type = existing_field.type
-                    existing_field_type += SqliteDialect.Space
-                    if not existing_field.nullable:
-                        existing_field_type += 'NOT NULL'
-                    else:
-                        existing_field_type += 'NULL'
-                    args = field
-                    new_field_type = dialect.format_type(**args)
-                    if new_field_type != existing_field_type:
-                        # important note: ALTER COLUMN is not supported by SQLite
-                        # so, we should try table copy operation
-                        should_copy_table = True
-                        break
-            else:
-                args = field.__dict__
-                new_field_type = dialect.format_type(**args)
-                # add column
-                sqls.append(f'ALTER TABLE {table} ADD COLUMN {new_field_type};')
-        if should_copy_table:
-            # rename table (with a random name)
-            rename = dialect.escape_name('__' + self.table + '_' + str(int(time.time())) + '__')
-
-            # drop indexes
-            table_indexes = self.indexes()
-            indexes = await table_indexes.list()
-            for index in indexes:
-                await table_indexes.drop(index.name)
-
-            await self.__adapter__.execute(f'ALTER TABLE {table} RENAME TO {rename}')
-            # create new table
-            await self.create(fields)
-            # get all existing fields that are existing also into the new table
-            insert_fields = []
-            for existing_field in existing_fields:
-                insert_field = next(filter(lambda x: x.name == existing_field.name, fields), None)
-                if insert_field is not None:
-                    insert_fields.append(insert_field)
-            # copy data
-            sql = 'INSERT INTO'
-            sql += SqliteDialect.Space
-            sql += table
-            sql += SqliteDialect.Space
-            sql += '('
-            sql += ','.join(map(lambda x: dialect.escape_name(x.name), insert_fields))
-            sql += ')'
-            sql += SqliteDialect.Space
-            sql += 'SELECT'
-            sql += SqliteDialect.Space
-            sql += ','.join(map(lambda x: dialect.escape_name(x.name), insert_fields))
-            sql += SqliteDialect.Space
-            sql += 'FROM'
-            sql += SqliteDialect.Space
-            sql += rename
-            await self.__adapter__.execute(sql)
-            # important note: the renamed table is not being dropped for security reasons
-            # this cleanup operation may be done by using SQLite data tools
-            return
-
-        if len(sqls) > 0:
-            for sql in sqls:
-                await self.__adapter__.execute(sql)
+        await self.__adapter__.planner().apply({
+            self.table: fields
+        })
 
     async def exists(self):
         table = self.table
@@ -165,7 +80,7 @@ class SqliteTable(DataTable):
         migration_exists = await self.__adapter__.table('migrations').exists()
         if not migration_exists:
             return None
-        table = SqliteDialect().escape(self.table)
+        table = SQLITE_DIALECT.escape(self.table)
         results = await self.__adapter__.execute(
             f'SELECT MAX(version) AS version FROM migrations WHERE appliesTo={table}'
             )
@@ -175,19 +90,7 @@ class SqliteTable(DataTable):
 
     async def columns(self):
         results = await self.__adapter__.execute(f'PRAGMA table_info({self.table});')
-        cols = []
-        for result in results:
-            col = AnyObject(name=result.name, ordinal=result.cid, type=result.type,
-                            nullable=False if result.notnull == 1 else True, primary=(result.pk == 1))
-            col.size = None
-            col.scale = None
-            matches = re.match(r'(\w+)\((\d+)\,?(\d+)?\)', col.type)
-            if matches is not None:
-                col.size = int(matches.group(2))
-                if matches.group(3) is not None:
-                    col.scale = int(matches.group(3))
-            cols.append(col)
-        return cols
+        return list(map(lambda x: to_column(x.name, x.cid, x.type, x.notnull, x.pk), results))
 
     def indexes(self):
         return SqliteTableIndex(self.table, self.__adapter__)
@@ -204,11 +107,11 @@ class SqliteView(DataView):
         # and create
         sql = 'CREATE VIEW'
         sql += SqliteDialect.Space
-        sql += SqliteDialect().escape_name(self.view)
+        sql += SQLITE_DIALECT.escape_name(self.view)
         sql += SqliteDialect.Space
         sql += 'AS'
         sql += SqliteDialect.Space
-        sql += SqliteFormatter().format_select(query)
+        sql += SQLITE_FORMATTER.format_select(query)
         return await self.__adapter__.execute(sql)
 
     async def exists(self):
@@ -221,7 +124,7 @@ class SqliteView(DataView):
         return False
 
     async def drop(self):
-        view = SqliteDialect().escape_name(self.view)
+        view = SQLITE_DIALECT.escape_name(self.view)
         return await self.__adapter__.execute(f'DROP VIEW IF EXISTS {view};')
 
 
@@ -243,65 +146,206 @@ def regexp(value, pattern):
     return regexp_like(value, pattern)
 
 
+def connect(database: str, check_same_thread: bool = True) -> sqlite3.Connection:
+    """Opens a new database connection and registers user-defined functions
+
+    Args:
+        database (str): The path of the database file
+        check_same_thread (bool, optional): Indicates whether the connection may be used only by the creating thread
+
+    Returns:
+        sqlite3.Connection: The database connection
+    """
+    connection = sqlite3.connect(database, check_same_thread=check_same_thread)
+    connection.create_function('REGEXP', 2, regexp)
+    connection.create_function('REGEXP_LIKE', 3, regexp_like)
+    return connection
+
+
+def to_objects(cur: sqlite3.Cursor, results: list, row_factory: str = 'object') -> list:
+    """Converts the given database records to a list of objects
+
+    Args:
+        cur (sqlite3.Cursor): A database cursor
+        results (list): A list of database records
+        row_factory (str, optional): The type of objects, object or row. Row objects are instances of lightweight
+            row classes which are created per column names.
+
+    Returns:
+        list: A list of objects
+    """
+    items = []
+    cols = []
+    if cur.description is None:
+        # e.g. a PRAGMA statement which sets a value
+        return items
+    for description in cur.description:
+        cols.append(description[0])
+    if row_factory == 'row':
+        RowClass = row_class(tuple(cols))
+        return [RowClass(*result) for result in results]
+    for result in results:
+        item = AnyObject()
+        i = 0
+        for col in cols:
+            setattr(item, col, result[i])
+            i += 1
+        items.append(item)
+    return items
+
+
+def to_parameter(value):
+    """Converts a query parameter to a value which is supported by sqlite3 module
+
+    Args:
+        value (*): The value to convert
+
+    Returns:
+        An int, float, str, bytes or None value
+    """
+    if value is None or isinstance(value, (str, int, float, bytes)):
+        return value
+    if isinstance(value, datetime):
+        return SqlUtils.date_to_string(value)
+    if type(value) is bytearray:
+        return bytes(value)
+    return str(value)
+
+
 class SqliteAdapter(DataAdapter):
 
+    # a process-wide cache of query plans which are keyed by the shape of query expressions
+    __plans__ = QueryPlanCache()
+    # SQLITE_MAX_VARIABLE_NUMBER defaults to 32766 since SQLite 3.32.0
+    max_parameters = 32766 if sqlite3.sqlite_version_info >= (3, 32, 0) else 999
+    # window functions are supported since SQLite 3.25.0
+    window_functions = sqlite3.sqlite_version_info >= (3, 25, 0)
+
     def __init__(self, options):
         super().__init__()
         self.__raw_connection__: sqlite3.Connection
         self.__transaction__ = False
+        # a collection of callables which are going to be called when the current transaction ends
+        self.__after_transaction__ = []
         self.__last_insert_id__ = None
+        self.__pool__ = None
+        self.__workers__ = None
         self.options = options
 
+    def __del__(self):
+        # return connection to pool or close it, if data adapter has not been closed
+        try:
+            self.__release__()
+        except Exception as error:
+            logging.warning('An error occurred while closing database connection.')
+            logging.warning(error)
+
+    @property
+    def pool(self) -> SqlitePool | None:
+        """Returns the connection pool of this data adapter, if pool options have been defined
+        e.g. { 'database': 'db/local.db', 'pool': { 'min': 0, 'max': 25, 'idleTimeout': 30 } }
+        """
+        if self.__pool__ is None:
+            options = getattr(self.options, 'pool', None)
+            if options is None:
+                return None
+            if not isinstance(options, dict):
+                options = vars(options)
+            database = self.options.database
+            # pooled connections are shared by worker threads, if any
+            check_same_thread = self.workers is None
+            # adapters of the same name may use different databases e.g. in different configurations
+            key = (self.name, database if database == ':memory:' else abspath(database), check_same_thread)
+            self.__pool__ = SqlitePool.get(key, lambda: connect(database, check_same_thread), options)
+        return self.__pool__
+
+    @property
+    def workers(self) -> SqliteWorkers | None:
+        """Returns the worker threads which execute database operations of this data adapter,
+        if workers option has been defined e.g. { 'database': 'db/local.db', 'workers': 4 }
+        """
+        if self.__workers__ is None:
+            size = getattr(self.options, 'workers', None)
+            if size is None or size is False:
+                return None
+            # use adapter name or database as the name of worker threads
+            self.__workers__ = SqliteWorkers.get(self.name or self.options.database, int(size))
+        return self.__workers__
+
+    @property
+    def row_factory(self) -> str:
+        """Returns the type of objects which are returned by queries, object or row,
+        as it has been defined by rowFactory option e.g. { 'database': 'db/local.db', 'rowFactory': 'row' }
+        """
+        return getattr(self.options, 'rowFactory', None) or 'object'
+
+    async def __run__(self, func: Callable, *args):
+        # execute a blocking operation in a worker thread, if any, or in the current thread
+        workers = self.workers
+        if workers is None:
+            return func(*args)
+        return await workers.run(func, *args)
+
     async def open(self):
         if self.__raw_connection__ is None:
-            self.__raw_connection__ = sqlite3.connect(self.options.database)
-            self.__raw_connection__.create_function('REGEXP', 2, regexp)
-            self.__raw_connection__.create_function('REGEXP_LIKE', 3, regexp_like)
+            pool = self.pool
+            if pool is not None:
+                self.__raw_connection__ = await pool.acquire()
+            else:
+                self.__raw_connection__ = await self.__run__(connect, self.options.database,
+                                                             self.workers is None)
 
-    async def close(self):
+    def __release__(self):
         if self.__raw_connection__ is not None:
-            self.__raw_connection__.close()
+            connection = self.__raw_connection__
             self.__raw_connection__ = None
+            if self.__transaction__ is True:
+                # a pending transaction is rolled back while releasing connection
+                self.__transaction__ = False
+                self.__end_transaction__(False)
+            if self.__pool__ is not None:
+                self.__pool__.release(connection)
+            else:
+                connection.close()
 
-    async def execute(self, query, values=None):
+    async def close(self):
+        """Closes database connection or returns it to connection pool
+        """
+        self.__release__()
+
+    def __compile__(self, query, values=None):
+        # format query
+        if type(query) is str:
+            return query, values
+        if isinstance(query, QueryExpression):
+            # get a cached query plan and use query parameters instead of formatting constant values
+            return self.__plans__.format(SQLITE_FORMATTER, query)
+        raise TypeError('Expected string or an instance of query expression')
+
+    # noinspection PyMethodMayBeStatic
+    def __execute__(self, cur: sqlite3.Cursor, sql: str, values=None):
+        # execute query
+        logging.debug('SQL:%s', sql)
+        try:
+            if values is None or len(values) == 0:
+                cur.execute(sql)
+            else:
+                logging.debug('VALUES:%s', values)
+                cur.execute(sql, list(map(to_parameter, values)))
+        except Exception as error:
+            logging.error('SQL:%s', sql)
+            raise error
+
+    def __query__(self, sql: str, values=None):
         cur: sqlite3.Cursor or None = None
         try:
-            self.__last_insert_id__ = None
-            # ensure that database connection is open
-            await self.open()
             # open cursor
             cur = self.__raw_connection__.cursor()
-            sql = None
-            # format query
-            if type(query) is str:
-                sql = query
-            elif isinstance(query, QueryExpression):
-                sql = SqliteFormatter().format(query)
-            else:
-                TypeError('Expected string or an instance of query expression')
-            # execute query
-            logging.debug('SQL:%s', sql)
-            try:
-                cur.execute(sql)
-            except Exception as error:
-                logging.error('SQL:%s', sql)
-                raise error
+            self.__execute__(cur, sql, values)
             # if query is SELECT or PRAGMA
             if re.search('^(SELECT|PRAGMA)', sql, re.DOTALL) is not None:
                 # fetch records
-                results = cur.fetchall()
-                items = []
-                cols = []
-                for description in cur.description:
-                    cols.append(description[0])
-                for result in results:
-                    item = AnyObject()
-                    i = 0
-                    for col in cols:
-                        setattr(item, col, result[i])
-                        i += 1
-                    items.append(item)
-                return items
+                return to_objects(cur, cur.fetchall(), self.row_factory)
             elif re.search('^(INSERT)', sql, re.DOTALL) is not None:
                 cur.fetchone()
                 insert_id = cur.lastrowid
@@ -314,6 +358,73 @@ class SqliteAdapter(DataAdapter):
             if cur is not None:
                 cur.close()
 
+    async def execute(self, query, values=None):
+        self.__last_insert_id__ = None
+        # ensure that database connection is open
+        await self.open()
+        sql, values = self.__compile__(query, values)
+        return await self.__run__(self.__query__, sql, values)
+
+    def __query_columns__(self, sql: str, values=None, typecodes: dict = None, batch_size: int = 1000):
+        cur: sqlite3.Cursor or None = None
+        try:
+            cur = self.__raw_connection__.cursor()
+            self.__execute__(cur, sql, values)
+            if cur.description is None:
+                return {}
+            names = list(map(lambda x: x[0], cur.description))
+            # fetch database records in batches and append them to columns without creating objects
+            return to_columns(names, iter(lambda: cur.fetchmany(batch_size), []), typecodes)
+        finally:
+            if cur is not None:
+                cur.close()
+
+    async def execute_columns(self, query, values=None, typecodes: dict = None) -> dict:
+        """Executes the given query and returns a dictionary of column values by name.
+        Database records are fetched straight into columns, so no object is created for each record.
+
+        Args:
+            query (str | QueryExpression): The query to execute
+            values (list, optional): Query parameters
+            typecodes (dict, optional): A dictionary of typecodes by column name e.g. { 'price': 'd' }
+
+        Returns:
+            dict: A dictionary of column values by name
+        """
+        self.__last_insert_id__ = None
+        # ensure that database connection is open
+        await self.open()
+        sql, values = self.__compile__(query, values)
+        return await self.__run__(self.__query_columns__, sql, values, typecodes)
+
+    async def stream(self, query, values=None, batch_size: int = 100):
+        """Executes the given query and returns an asynchronous iterator of result batches.
+        Each batch is fetched from database when it is requested.
+
+        Args:
+            query (str | QueryExpression): The query to execute
+            values (list, optional): Query parameters
+            batch_size (int, optional): The maximum number of items of each batch
+
+        Returns:
+            AsyncIterator[list]: An asynchronous iterator of lists of items
+        """
+        cur: sqlite3.Cursor or None = None
+        try:
+            # ensure that database connection is open
+            await self.open()
+            cur = self.__raw_connection__.cursor()
+            sql, values = self.__compile__(query, values)
+            await self.__run__(self.__execute__, cur, sql, values)
+            while True:
+                results = await self.__run__(cur.fetchmany, batch_size)
+                if len(results) == 0:
+                    break
+                yield to_objects(cur, results, self.row_factory)
+        finally:
+            if cur is not None:
+                cur.close()
+
     async def execute_in_transaction(self, func: Callable):
         """Begins a transactional operation by executing the given callback
 
@@ -331,14 +442,29 @@ class SqliteAdapter(DataAdapter):
         await self.execute('BEGIN;')
         self.__transaction__ = True
         # execute callable
+        committed = False
         try:
             await func()
             await self.execute('COMMIT;')
+            committed = True
         except Exception as error:
             await self.execute('ROLLBACK;')
             raise error
         finally:
             self.__transaction__ = False
+            self.__end_transaction__(committed)
+
+    def after_transaction(self, func: Callable[[bool], None]):
+        if self.__transaction__ is True:
+            self.__after_transaction__.append(func)
+            return
+        func(True)
+
+    def __end_transaction__(self, committed: bool):
+        callbacks = self.__after_transaction__
+        self.__after_transaction__ = []
+        for callback in callbacks:
+            callback(committed)
 
     async def select_identity(self):
         raise NotImplementedError()
@@ -352,5 +478,8 @@ class SqliteAdapter(DataAdapter):
     def view(self, view: str) -> SqliteView:
         return SqliteView(view, self)
 
+    def planner(self) -> SqliteSchemaPlanner:
+        return SqliteSchemaPlanner(self)
+
     def indexes(self, table: str) -> SqliteTableIndex:
         return SqliteTableIndex(table, self)
@@ -1,4 +1,4 @@
-from pycentroid.query import SqlDialect, SqlFormatter, SqlDialectOptions
+from pycentroid.query import SqlDialect, SqlFormatter, SqlDialectOptions, QUOTE_ESCAPE_TABLE
 
 SqlDialectTypes = [
         ['Boolean', 'INTEGER(0,1)'],
@@ -25,12 +25,11 @@ SqlDialectTypes = [
 
 
 class SqliteDialect(SqlDialect):
+    # field type definitions by type name
+    types = dict(SqlDialectTypes)
+
     def __init__(self):
-        super().__init__(SqlDialectOptions(name_format=r'"\1"', force_alias=True))
-        # set field type definitions
-        self.types = dict()
-        for item in SqlDialectTypes:
-            self.types[item[0]] = item[1]
+        super().__init__(SqlDialectOptions(name_format=r'"\1"', force_alias=True, escape_table=QUOTE_ESCAPE_TABLE))
 
     def __ceil__(self, expr):
         return f'CEIL({self.escape(expr)})'
@@ -85,7 +84,10 @@ class SqliteDialect(SqlDialect):
 
 
 class SqliteFormatter(SqlFormatter):
-    def __init__(self):
-        super().__init__(SqliteDialect())
-    
-    
+    def __init__(self, dialect: SqliteDialect = None):
+        super().__init__(SqliteDialect() if dialect is None else dialect)
+
+
+# a dialect and a formatter which do not hold any state and are shared by all adapters
+SQLITE_DIALECT = SqliteDialect()
+SQLITE_FORMATTER = SqliteFormatter(SQLITE_DIALECT)
@@ -0,0 +1,274 @@
+import re
+import time
+from typing import List
+from pycentroid.common import AnyObject
+from pycentroid.query import DataSchemaPlanner, DataAdapter
+from .dialect import SqliteDialect, SQLITE_DIALECT
+
+
+def to_column(name: str, ordinal: int, type: str, notnull: int, pk: int) -> AnyObject:
+    """Converts a record of PRAGMA table_info to a column
+    """
+    col = AnyObject(name=name, ordinal=ordinal, type=type, nullable=False if notnull == 1 else True, primary=(pk == 1))
+    col.size = None
+    col.scale = None
+    matches = re.match(r'(\w+)\((\d+)\,?(\d+)?\)', col.type)
+    if matches is not None:
+        col.size = int(matches.group(2))
+        if matches.group(3) is not None:
+            col.scale = int(matches.group(3))
+    return col
+
+
+class SqliteSchemaPlanner(DataSchemaPlanner):
+    """Compares the target schema of a set of database tables with an SQLite database and prepares
+    an ordered collection of statements which upgrade the database in one transaction
+    """
+
+    def __init__(self, adapter: DataAdapter):
+        super().__init__(adapter)
+
+    async def inspect(self, tables: List[str] = None, migrations: str = None) -> AnyObject:
+        """Reads tables, columns, indexes, views and table versions of the database in one pass
+
+        Args:
+            tables (List[str], optional): The names of the tables to inspect. If it is empty, all tables are inspected
+            migrations (str, optional): The name of the table which holds the versions of tables, if any
+
+        Returns:
+            AnyObject: An object which contains tables, views and versions
+        """
+        sql = 'SELECT m.type AS type, m.name AS name, m.tbl_name AS tableName, m.sql AS sql, p.cid AS cid, ' \
+              'p.name AS columnName, p.type AS columnType, p."notnull" AS notNullable, p.pk AS pk ' \
+              'FROM sqlite_master AS m LEFT JOIN pragma_table_info(m.name) AS p ON m.type = \'table\' ' \
+              'WHERE m.type IN (\'table\', \'index\', \'view\')'
+        values = []
+        if tables is not None:
+            # the migrations table is also inspected in order to read table versions
+            values = list(dict.fromkeys(tables if migrations is None else list(tables) + [migrations]))
+            sql += f' AND m.tbl_name IN ({",".join("?" * len(values))})'
+        results = await self.__adapter__.execute(sql + ' ORDER BY m.name, p.cid', values)
+        schema = AnyObject(views=set())
+        # a dictionary of tables by name
+        schema.tables = {}
+        # the versions of tables as they have been recorded in migrations table
+        schema.versions = {}
+        indexes = []
+        for result in results:
+            if result.type == 'table':
+                table = schema.tables.get(result.name)
+                if table is None:
+                    table = AnyObject(name=result.name, columns=[], indexes=[])
+                    schema.tables[result.name] = table
+                if result.columnName is not None:
+                    table.columns.append(
+                        to_column(result.columnName, result.cid, result.columnType, result.notNullable, result.pk)
+                    )
+            elif result.type == 'view':
+                schema.views.add(result.name)
+            elif result.sql is not None:
+                # exclude indexes which are created automatically e.g. for unique constraints
+                indexes.append(result)
+        for index in indexes:
+            table = schema.tables.get(index.tableName)
+            if table is not None:
+                table.indexes.append(index.name)
+        if migrations is not None and migrations in schema.tables:
+            table = SQLITE_DIALECT.escape_name(migrations)
+            results = await self.__adapter__.execute(
+                f'SELECT appliesTo, MAX(version) AS version FROM {table} GROUP BY appliesTo')
+            schema.versions = dict(map(lambda x: (x.appliesTo, x.version), results))
+        return schema
+
+    @staticmethod
+    def format_create(table: str, fields: list) -> str:
+        """Formats a CREATE TABLE statement
+
+        Args:
+            table (str): The name of a table
+            fields (list): A collection of columns
+
+        Returns:
+            str: A CREATE TABLE statement
+        """
+        if len(fields) == 0:
+            Exception('Field collection cannot be empty while creating a database table.')
+        dialect = SQLITE_DIALECT
+        sql = 'CREATE TABLE'
+        sql += SqliteDialect.Space
+        sql += dialect.escape_name(table)
+        sql += '('
+        sql += ','.join(map(lambda x: dialect.format_type(name=x.name, type=x.type, nullable=x.nullable, size=x.size,
+                                                          scale=x.scale), fields))
+        sql += ')'
+        return sql
+
+    @staticmethod
+    def index_name(table: str, columns: List[str]) -> str:
+        """Returns the name of an index e.g. INDEX_PRODUCTBASE_CATEGORY
+        """
+        return '_'.join(['INDEX', table] + columns).upper()
+
+    @staticmethod
+    def format_create_index(name: str, table: str, columns: List[str]) -> str:
+        """Formats a CREATE INDEX statement
+
+        Args:
+            name (str): The name of an index
+            table (str): The name of a table
+            columns (List[str]): The names of indexed columns
+
+        Returns:
+            str: A CREATE INDEX statement
+        """
+        dialect = SQLITE_DIALECT
+        sql = 'CREATE INDEX'
+        sql += SqliteDialect.Space
+        sql += dialect.escape_name(name)
+        sql += SqliteDialect.Space
+        sql += 'ON'
+        sql += SqliteDialect.Space
+        sql += dialect.escape_name(table)
+        sql += '('
+        sql += ','.join(map(lambda x: dialect.escape_name(x), columns))
+        sql += ')'
+        return sql
+
+    def plan(self, tables: dict, schema: AnyObject, indexes: dict = None) -> List[str]:
+        """Compares the given tables with a database schema and returns the statements which should be executed
+        in order to upgrade the database
+
+        Args:
+            tables (dict): A dictionary of column collections by table name. Tables are upgraded in the given order
+            schema (AnyObject): The database schema as it is returned by inspect()
+            indexes (dict, optional): A dictionary of index column lists by table name
+                e.g. { 'ProductBase': [['category']] }. Missing indexes are created,
+                while existing indexes are left as they are
+
+        Returns:
+            List[str]: An ordered collection of statements
+        """
+        dialect = SQLITE_DIALECT
+        statements = []
+        # the tables which are going to be copied and lose their indexes
+        copied = set()
+        for name, fields in tables.items():
+            existing_table = schema.tables.get(name)
+            if existing_table is None:
+                statements.append(self.format_create(name, fields))
+                continue
+            table = dialect.escape_name(name)
+            existing_fields = dict(map(lambda x: (x.name, x), existing_table.columns))
+            sqls = []
+            should_copy_table = False
+            for field in fields:
+                existing_field = existing_fields.get(field.name)
+                if existing_field is None:
+                    new_field_type = dialect.format_type(name=field.name, type=field.type, nullable=field.nullable,
+                                                         size=field.size, scale=field.scale)
+                    # add column
+                    sqls.append(f'ALTER TABLE {table} ADD COLUMN {new_field_type}')
+                    continue
+                if existing_field.primary:
+                    continue
+                existing_field_type = dialect.escape_name(existing_field.name)
+                existing_field_type += SqliteDialect.Space
+                existing_field_type += existing_field.type
+                existing_field_type += SqliteDialect.Space
+                existing_field_type += 'NULL' if existing_field.nullable else 'NOT NULL'
+                new_field_type = dialect.format_type(name=field.name, type=field.type, nullable=field.nullable,
+                                                     size=field.size, scale=field.scale)
+                if new_field_type != existing_field_type:
+                    # important note: ALTER COLUMN is not supported by SQLite
+                    # so, we should try table copy operation
+                    should_copy_table = True
+                    break
+            if should_copy_table is False:
+                statements.extend(sqls)
+                continue
+            # drop indexes which are going to be created again
+            for index in existing_table.indexes:
+                statements.append(f'DROP INDEX {dialect.escape_name(index)}')
+            copied.add(name)
+            # rename table (with a random name)
+            rename = dialect.escape_name('__' + name + '_' + str(int(time.time())) + '__')
+            statements.append(f'ALTER TABLE {table} RENAME TO {rename}')
+            # create new table
+            statements.append(self.format_create(name, fields))
+            # copy the columns which exist also in the new table
+            insert_fields = ','.join(
+                map(lambda x: dialect.escape_name(x.name), filter(lambda x: x.name in existing_fields, fields))
+            )
+            statements.append(f'INSERT INTO {table} ({insert_fields}) SELECT {insert_fields} FROM {rename}')
+            # important note: the renamed table is not being dropped for security reasons
+            # this cleanup operation may be done by using SQLite data tools
+        for name, items in (indexes or {}).items():
+            existing_table = schema.tables.get(name)
+            if existing_table is None and name not in tables:
+                # table does not exist e.g. a junction table which has not been created yet
+                continue
+            existing_indexes = set()
+            if existing_table is not None and name not in copied:
+                existing_indexes = set(map(lambda x: x.casefold(), existing_table.indexes))
+            for columns in items:
+                index = self.index_name(name, columns)
+                if index.casefold() in existing_indexes:
+                    continue
+                existing_indexes.add(index.casefold())
+                statements.append(self.format_create_index(index, name, columns))
+        return statements
+
+    async def execute(self, statements: List[str]):
+        """Executes the given statements in one transaction.
+        Foreign key constraints are disabled, or deferred if a transaction is already in progress,
+        and renaming a table does not rewrite the references of views and other tables to it.
+
+        Args:
+            statements (List[str]): An ordered collection of statements
+        """
+        if len(statements) == 0:
+            return
+        adapter = self.__adapter__
+        await adapter.open()
+        transaction = adapter.__transaction__
+        foreign_keys = None
+        if transaction is False:
+            # foreign_keys pragma is a no-op inside a transaction
+            results = await adapter.execute('PRAGMA foreign_keys')
+            foreign_keys = results[0].foreign_keys
+            await adapter.execute('PRAGMA foreign_keys = OFF')
+        results = await adapter.execute('PRAGMA legacy_alter_table')
+        legacy_alter_table = results[0].legacy_alter_table
+        await adapter.execute('PRAGMA legacy_alter_table = ON')
+
+        async def execute():
+            if transaction is True:
+                # foreign key constraints are checked when the transaction is committed
+                await adapter.execute('PRAGMA defer_foreign_keys = ON')
+            for statement in statements:
+                await adapter.execute(statement)
+
+        try:
+            await adapter.execute_in_transaction(execute)
+        finally:
+            await adapter.execute(f'PRAGMA legacy_alter_table = {legacy_alter_table}')
+            if foreign_keys is not None:
+                await adapter.execute(f'PRAGMA foreign_keys = {foreign_keys}')
+
+    async def apply(self, tables: dict, dry_run: bool = False, indexes: dict = None) -> List[str]:
+        """Upgrades the given tables in one transaction
+
+        Args:
+            tables (dict): A dictionary of column collections by table name
+            dry_run (bool, optional): If it is true, statements are returned but they are not executed
+            indexes (dict, optional): A dictionary of index column lists by table name
+
+        Returns:
+            List[str]: An ordered collection of statements
+        """
+        # inspect only the tables which are going to be upgraded
+        schema = await self.inspect(list(tables) + list(indexes or {}))
+        statements = self.plan(tables, schema, indexes)
+        if dry_run is False:
+            await self.execute(statements)
+        return statements
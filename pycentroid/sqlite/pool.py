@@ -0,0 +1,156 @@
+import asyncio
+import sqlite3
+import time
+import logging
+from collections import deque
+from typing import Callable
+
+
+class SqlitePool:
+    """A process-wide pool of sqlite3 connections which are shared by data adapters of the same name and database
+    """
+
+    # a collection of connection pools keyed by adapter name, database and connection options
+    __pools__: dict = {}
+
+    def __init__(self, factory: Callable[[], sqlite3.Connection], min_size: int = 0, max_size: int = 25,
+                 idle_timeout: float = 30):
+        """
+        Args:
+            factory (Callable): A callable which creates a new physical connection
+            min_size (int, optional): The number of connections which are kept open even if they are idle
+            max_size (int, optional): The maximum number of physical connections
+            idle_timeout (float, optional): The number of seconds after which an idle connection is being closed
+        """
+        self.factory = factory
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        # the number of physical connections
+        self.size = 0
+        # a stack of idle connections and the time they have been released
+        self.__idle__ = deque()
+        # a queue of coroutines which wait for a connection
+        self.__waiting__ = deque()
+
+    @staticmethod
+    def get(key: tuple, factory: Callable[[], sqlite3.Connection], options=None):
+        """Returns the connection pool of the given key or creates a new one
+
+        Args:
+            key (tuple): A key which identifies the pool e.g. a tuple of an adapter name, an absolute database path
+                and the options of its connections
+            factory (Callable): A callable which creates a new physical connection
+            options (dict, optional): Pool options e.g. { 'min': 0, 'max': 25, 'idleTimeout': 30 }
+
+        Returns:
+            SqlitePool: The connection pool
+        """
+        pool = SqlitePool.__pools__.get(key)
+        if pool is None:
+            options = options or {}
+            pool = SqlitePool(factory,
+                              min_size=options.get('min', 0),
+                              max_size=options.get('max', 25),
+                              idle_timeout=options.get('idleTimeout', 30))
+            # create the minimum number of connections
+            while pool.size < pool.min_size:
+                pool.__idle__.append((pool.factory(), time.monotonic()))
+                pool.size += 1
+            SqlitePool.__pools__[key] = pool
+        return pool
+
+    @property
+    def idle(self) -> int:
+        return len(self.__idle__)
+
+    # noinspection PyMethodMayBeStatic
+    def validate(self, connection: sqlite3.Connection) -> bool:
+        """Validates that the given connection is still usable
+        """
+        try:
+            connection.execute('SELECT 1').fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def dispose(self, connection: sqlite3.Connection):
+        self.size -= 1
+        try:
+            connection.close()
+        except sqlite3.Error as error:
+            logging.warning('An error occurred while closing a pooled database connection.')
+            logging.warning(error)
+
+    def trim(self):
+        """Closes connections which have been idle for more than the idle timeout
+        """
+        now = time.monotonic()
+        # the least recently used connections are at the beginning of the stack
+        while len(self.__idle__) > 0 and self.size > self.min_size:
+            connection, released = self.__idle__[0]
+            if now - released < self.idle_timeout:
+                break
+            self.__idle__.popleft()
+            self.dispose(connection)
+
+    async def acquire(self) -> sqlite3.Connection:
+        """Returns an idle connection or creates a new one. If the pool has reached its maximum size,
+        it waits for a connection to be released.
+        """
+        self.trim()
+        while len(self.__idle__) > 0:
+            connection, _ = self.__idle__.pop()
+            if self.validate(connection):
+                return connection
+            self.dispose(connection)
+        if self.size < self.max_size:
+            connection = self.factory()
+            self.size += 1
+            return connection
+        waiter = asyncio.get_running_loop().create_future()
+        self.__waiting__.append(waiter)
+        try:
+            return await waiter
+        except asyncio.CancelledError:
+            # a connection may have been already passed to this coroutine
+            if waiter.done() and not waiter.cancelled():
+                self.release(waiter.result())
+            raise
+
+    def release(self, connection: sqlite3.Connection):
+        """Returns the given connection to the pool
+
+        Args:
+            connection (sqlite3.Connection): A connection which has been acquired from this pool
+        """
+        try:
+            # discard any uncommitted changes
+            if connection.in_transaction:
+                connection.rollback()
+        except sqlite3.Error:
+            self.dispose(connection)
+            return
+        # pass connection to a waiting coroutine, if any
+        while len(self.__waiting__) > 0:
+            waiter: asyncio.Future = self.__waiting__.popleft()
+            if not waiter.done() and not waiter.get_loop().is_closed():
+                waiter.set_result(connection)
+                return
+        self.__idle__.append((connection, time.monotonic()))
+        self.trim()
+
+    def drain(self):
+        """Closes all idle connections of this pool
+        """
+        while len(self.__idle__) > 0:
+            connection, _ = self.__idle__.popleft()
+            self.dispose(connection)
+
+    @staticmethod
+    def drain_all():
+        """Closes the idle connections of all pools and removes them from the collection of pools
+        """
+        for pool in SqlitePool.__pools__.values():
+            pool.drain()
+        SqlitePool.__pools__.clear()
@@ -0,0 +1,63 @@
+import keyword
+from typing import Tuple
+
+
+class SqliteRow:
+    """A lightweight database record which is created by a row class with a generated constructor.
+    Columns are assigned in the same order for every instance of a row class, so instances share dictionary keys
+    and use less memory than objects which are built attribute by attribute.
+    Rows are mutable and they may get more attributes e.g. while expanding associations.
+    """
+
+    __columns__: Tuple[str] = ()
+
+    def __repr__(self):
+        items = ', '.join(map(lambda x: f'{x[0]}={x[1]!r}', self.__dict__.items()))
+        return f'{self.__class__.__name__}({items})'
+
+    def __str__(self):
+        return self.__dict__.__str__()
+
+    def __eq__(self, other):
+        if not hasattr(other, '__dict__'):
+            return NotImplemented
+        return self.__dict__ == other.__dict__
+
+
+# a process-wide collection of row classes by column names
+__row_classes__ = {}
+# the maximum number of row classes which are kept in memory
+MAX_ROW_CLASSES = 256
+
+
+def row_class(columns: Tuple[str]) -> type:
+    """Returns a row class for the given column names
+
+    Args:
+        columns (Tuple[str]): The column names of a result set
+
+    Returns:
+        type: A subclass of SqliteRow whose constructor accepts column values in order
+    """
+    cls = __row_classes__.get(columns)
+    if cls is not None:
+        return cls
+    args = ','.join(map(lambda x: f'_{x}', range(len(columns))))
+    lines = [f'def __init__(self{"," if len(columns) > 0 else ""}{args}):']
+    for index, name in enumerate(columns):
+        if name.isidentifier() and not keyword.iskeyword(name):
+            lines.append(f'    self.{name} = _{index}')
+        else:
+            lines.append(f'    setattr(self, {name!r}, _{index})')
+    if len(columns) == 0:
+        lines.append('    pass')
+    namespace = {}
+    exec('\n'.join(lines), namespace)
+    cls = type('SqliteRow', (SqliteRow,), {
+        '__init__': namespace['__init__'],
+        '__columns__': columns
+    })
+    if len(__row_classes__) >= MAX_ROW_CLASSES:
+        __row_classes__.clear()
+    __row_classes__[columns] = cls
+    return cls
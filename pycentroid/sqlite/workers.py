@@ -0,0 +1,60 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+
+class SqliteWorkers:
+    """A process-wide pool of worker threads which execute blocking sqlite3 calls out of the event loop
+    """
+
+    # a collection of thread pools keyed by adapter name
+    __workers__: dict = {}
+
+    def __init__(self, name: str, size: int = 4):
+        """
+        Args:
+            name (str): The name of the data adapter which uses these workers
+            size (int, optional): The maximum number of worker threads
+        """
+        self.size = size
+        self.__executor__ = ThreadPoolExecutor(max_workers=size, thread_name_prefix=f'sqlite-{name}')
+
+    @staticmethod
+    def get(name: str, size: int = 4):
+        """Returns the worker threads of the given name or creates new ones
+
+        Args:
+            name (str): The name of the data adapter which uses these workers
+            size (int, optional): The maximum number of worker threads
+
+        Returns:
+            SqliteWorkers: The worker threads
+        """
+        workers = SqliteWorkers.__workers__.get(name)
+        if workers is None:
+            workers = SqliteWorkers(name, size)
+            SqliteWorkers.__workers__[name] = workers
+        return workers
+
+    async def run(self, func: Callable, *args):
+        """Executes the given callable in a worker thread and waits for its result
+
+        Args:
+            func (Callable): A blocking callable
+            *args: The arguments of the callable
+
+        Returns:
+            The result of the callable
+        """
+        return await asyncio.get_running_loop().run_in_executor(self.__executor__, func, *args)
+
+    def shutdown(self, wait: bool = True):
+        self.__executor__.shutdown(wait=wait)
+
+    @staticmethod
+    def shutdown_all():
+        """Stops the worker threads of all data adapters
+        """
+        for workers in SqliteWorkers.__workers__.values():
+            workers.shutdown()
+        SqliteWorkers.__workers__.clear()
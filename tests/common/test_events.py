@@ -1,6 +1,6 @@
 # noinspection PyUnresolvedReferences
 import time
-from pycentroid.common import SyncSeriesEventEmitter, AsyncSeriesEventEmitter, AnyDict
+from pycentroid.common import SyncSeriesEventEmitter, AsyncSeriesEventEmitter, EventEmitterProperty, AnyDict
 
 
 def next_handler(event):
@@ -81,3 +81,67 @@ async def test_use_async_subscribe_once():
     await series.emit(event)
     assert event.total == 103
     assert len(series.__handlers__) == 2
+
+
+def test_create_emitter_on_first_access():
+
+    class Target:
+        changed = EventEmitterProperty(SyncSeriesEventEmitter)
+
+    target = Target()
+    assert 'changed' not in target.__dict__
+    event = AnyDict(total=100)
+    target.changed.emit(event)
+    assert event.total == 100
+    emitter = target.changed
+    assert target.changed is emitter
+    target.changed.subscribe(next_handler)
+    target.changed.emit(event)
+    assert event.total == 101
+    # every instance has its own emitter
+    assert len(Target().changed.__handlers__) == 0
+
+
+def test_unsubscribe_while_emitting():
+    event_series = SyncSeriesEventEmitter()
+    subscriptions = []
+
+    def unsubscribe_handler(event):
+        event.total += 1
+        subscriptions[1].unsubscribe()
+
+    subscriptions.append(event_series.subscribe(unsubscribe_handler))
+    subscriptions.append(event_series.subscribe(next_handler))
+    event = AnyDict(total=100)
+    # handlers which are removed while emitting an event are still executed once
+    event_series.emit(event)
+    assert event.total == 102
+    event_series.emit(event)
+    assert event.total == 103
+    # unsubscribe by handler
+    event_series.unsubscribe(unsubscribe_handler)
+    assert len(event_series.__handlers__) == 0
+    event_series.emit(event)
+    assert event.total == 103
+
+
+def test_unsubscribe_by_handler():
+    event_series = SyncSeriesEventEmitter()
+    event_series.subscribe(next_handler)
+    event_series.subscribe_once(next_handler)
+    event_series.subscribe(once_handler)
+    # the first subscription of a handler is removed
+    event_series.unsubscribe(next_handler)
+    assert len(event_series.__handlers__) == 2
+    event = AnyDict(total=100)
+    event_series.emit(event)
+    event_series.emit(event)
+    assert event.total == 103
+    event_series.unsubscribe(next_handler)
+    event_series.unsubscribe(once_handler)
+    assert len(event_series.__handlers__) == 0
+    assert len(event_series.__callables__) == 0
+    # unsubscribing an unknown handler does nothing
+    event_series.unsubscribe(next_handler)
+    event_series.emit(event)
+    assert event.total == 103
@@ -0,0 +1,69 @@
+from pycentroid.data.application import DataApplication
+from pycentroid.data.loaders import SchemaLoaderStrategy
+from pycentroid.data.registry import DataModelRegistry
+from pycentroid.data.bundle import compile_bundle, write_bundle
+from os.path import abspath, join, dirname, getmtime
+from os import utime
+import json
+from shutil import copytree
+
+APP_PATH = abspath(join(dirname(__file__), '..'))
+
+
+def test_compile_bundle():
+    app = DataApplication(cwd=APP_PATH)
+    bundle = compile_bundle(app.create_context())
+    assert 'Product' in bundle['models']
+    product = bundle['models']['Product']
+    assert product['superTypes'] == ['Thing']
+    assert 'Thing' in product['depends']
+    assert next(filter(lambda x: x['name'] == 'name', product['attributes']))['model'] == 'Thing'
+    order = bundle['models']['Order']
+    assert order['mappings']['customer']['parentModel'] == 'Person'
+    # plural flags of attributes
+    person = bundle['models']['Person']
+    assert person['plurals']['orders'] is True
+    assert person['plurals']['jobTitle'] is False
+
+
+async def test_load_bundle(tmp_path):
+    copytree(join(APP_PATH, 'config'), tmp_path / 'config')
+    app = DataApplication(cwd=str(tmp_path))
+    path = write_bundle(app.create_context())
+    assert path == str(tmp_path / 'config' / 'models.bundle.json')
+    # load bundle while starting application
+    app = DataApplication(cwd=str(tmp_path))
+    registry: DataModelRegistry = app.configuration.getstrategy(DataModelRegistry)
+    assert 'Product' in registry
+    loader: SchemaLoaderStrategy = app.configuration.getstrategy(SchemaLoaderStrategy)
+    context = app.create_context()
+    model = context.model('Product')
+    assert model.key().type == 'Integer'
+    assert model.get_super_types() == ['Thing']
+    # schema files have not been read
+    assert loader.__items__ is None
+    expected = DataApplication(cwd=APP_PATH).create_context().model('Product')
+    assert model.attributes == expected.attributes
+    person = context.model('Person')
+    assert person.infermapping('orders') == expected.context.model('Person').infermapping('orders')
+    assert person.definition.plurals == expected.context.model('Person').definition.plurals
+
+
+async def test_ignore_stale_bundle(tmp_path):
+    copytree(join(APP_PATH, 'config'), tmp_path / 'config')
+    app = DataApplication(cwd=str(tmp_path))
+    write_bundle(app.create_context())
+    # modify a schema file after writing bundle
+    path = tmp_path / 'config' / 'models' / 'Product.json'
+    with open(path, 'r') as file:
+        source = json.load(file)
+    source['description'] = 'A modified product model'
+    mtime = getmtime(path)
+    with open(path, 'w') as file:
+        json.dump(source, file)
+    utime(path, (mtime + 10, mtime + 10))
+    app = DataApplication(cwd=str(tmp_path))
+    registry: DataModelRegistry = app.configuration.getstrategy(DataModelRegistry)
+    assert 'Product' not in registry
+    model = app.create_context().model('Product')
+    assert model.properties.description == 'A modified product model'
@@ -0,0 +1,92 @@
+import pytest
+from pycentroid.common import AnyObject
+from pycentroid.data.application import DataApplication
+from pycentroid.data.context import DataContext
+from pycentroid.data.queryable import DataQueryable
+from pycentroid.data.cache import DataResultCache
+from pycentroid.sqlite import SqliteAdapter
+from os.path import abspath, join, dirname
+from shutil import copyfile
+
+APP_PATH = abspath(join(dirname(__file__), '..'))
+
+
+@pytest.fixture()
+def context(tmp_path) -> DataContext:
+    app = DataApplication(cwd=APP_PATH)
+    context = app.create_context()
+    # use a copy of test database
+    copyfile(join(APP_PATH, 'db', 'local.db'), tmp_path / 'local.db')
+    context.__db__ = SqliteAdapter(AnyObject(database=str(tmp_path / 'local.db')))
+    DataQueryable.__results__.clear()
+    return context
+
+
+def get_laptops(context: DataContext) -> DataQueryable:
+    return context.model('Product').where(
+        lambda x: x.category == 'Laptops'
+    ).cache(60)
+
+
+async def test_cache(context):
+    cache = DataQueryable.__results__
+    items = await get_laptops(context).get_items()
+    assert cache.misses == 1
+    results = await get_laptops(context).get_items()
+    assert cache.hits == 1
+    # cached items are copied
+    assert results == items
+    assert results[0] is not items[0]
+    # a query without cache
+    await context.model('Product').where(
+        lambda x: x.category == 'Laptops'
+    ).get_items()
+    assert cache.hits == 1 and cache.misses == 1
+    await context.finalize()
+
+
+async def test_cache_invalidation(context):
+    cache = DataQueryable.__results__
+    items = await get_laptops(context).get_items()
+    things = await context.model('Thing').as_queryable().cache(60).get_items()
+    assert len(cache) == 2
+    # insert an item of a derived model
+    await context.model('Product').insert(
+        AnyObject(name='Lenovo Yoga Slim 7', model='YOGA7SLIM', category='Laptops', price=999)
+    )
+    assert len(cache) == 0
+    results = await get_laptops(context).get_items()
+    assert len(results) == len(items) + 1
+    results = await context.model('Thing').as_queryable().cache(60).get_items()
+    assert len(results) == len(things) + 1
+    item = next(filter(lambda x: x.name == 'Lenovo Yoga Slim 7', results))
+    # remove item
+    await context.model('Product').remove(item)
+    results = await get_laptops(context).get_items()
+    assert len(results) == len(items)
+    await context.finalize()
+
+
+def test_cache_memory():
+    cache = DataResultCache(max_memory=4096)
+    items = [AnyObject(id=i, name=f'Item {i}') for i in range(10)]
+    cache.set('a', items, tags=['Product'])
+    cache.set('b', items, tags=['Thing'])
+    assert cache.memory <= cache.max_memory
+    # the least recently used results are discarded
+    assert cache.get('a') is None
+    assert cache.get('b') == items
+    cache.invalidate('Thing')
+    assert len(cache) == 0 and cache.memory == 0
+
+
+async def test_cache_get_list(context):
+    cache = DataQueryable.__results__
+    result = await get_laptops(context).take(5).get_list()
+    assert cache.misses == 1
+    cached = await get_laptops(context).take(5).get_list()
+    assert cache.hits == 1
+    assert cached.total == result.total
+    assert list(map(lambda x: x.id, cached.value)) == list(map(lambda x: x.id, result.value))
+    assert all(map(lambda x: not hasattr(x, '__total__'), cached.value))
+    await context.finalize()
@@ -23,3 +23,12 @@ def test_get_model(app):
     assert model is not None
     assert model.properties.name == 'Product'
     context.finalize()
+
+
+async def test_finalize_context(app):
+    context = app.create_context()
+    await context.model('Product').as_queryable().count()
+    assert context.db.pool is None
+    await context.finalize()
+    # connection has been closed
+    assert context.db.__raw_connection__ is None
@@ -27,3 +27,57 @@ async def test_insert_one(context):
 
     await TestUtils(context.db).execute_in_transaction(execute)
     await context.finalize()
+
+
+async def test_insert_many(context):
+
+    async def execute():
+        new_items = [
+            AnyObject(name=f'Bulk Laptop Gen {i}', model=f'YOGA7{i}', category='Laptops', price=900 + i)
+            for i in range(1, 21)
+        ]
+        # an item with a different column set
+        new_items.append(AnyObject(name='Bulk Laptop Slim', model=None))
+        await context.model('Product').insert(new_items)
+        for item in new_items:
+            assert item.id is not None
+        # identifiers have been written back in order
+        ids = list(map(lambda x: x.id, new_items))
+        assert ids == sorted(ids)
+        results = await context.model('Product').where(
+            lambda x: x.name.startswith('Bulk Laptop') is True
+        ).get_items()
+        assert len(results) == len(new_items)
+        for item in new_items:
+            result = next(filter(lambda x: x.id == item.id, results))
+            assert result.name == item.name
+            assert result.model == item.model
+
+    await TestUtils(context.db).execute_in_transaction(execute)
+    await context.finalize()
+
+
+async def test_insert_many_with_explicit_keys(context):
+
+    async def execute():
+        new_items = [
+            AnyObject(id=90010, name='Explicit Laptop 1', model='EXPL1'),
+            AnyObject(id=90005, name='Explicit Laptop 2', model='EXPL2'),
+            # an item with a generated key is inserted by another statement
+            AnyObject(name='Explicit Laptop 3', model='EXPL3')
+        ]
+        await context.model('Product').insert(new_items)
+        assert new_items[0].id == 90010
+        assert new_items[1].id == 90005
+        assert new_items[2].id is not None
+        # base and derived tables have the same keys
+        for item in new_items:
+            results = await context.db.execute(f'SELECT model FROM ProductBase WHERE id = {item.id}')
+            assert len(results) == 1
+            assert results[0].model == item.model
+            results = await context.db.execute(f'SELECT name FROM ThingBase WHERE id = {item.id}')
+            assert len(results) == 1
+            assert results[0].name == item.name
+
+    await TestUtils(context.db).execute_in_transaction(execute)
+    await context.finalize()
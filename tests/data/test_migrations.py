@@ -0,0 +1,121 @@
+import asyncio
+import pytest
+from pycentroid.common import AnyObject, DataError
+from pycentroid.data.application import DataApplication
+from pycentroid.data.context import DataContext
+from pycentroid.data.migrations import DataModelMigrations
+from pycentroid.data.upgrade import DataModelUpgrade
+from pycentroid.sqlite import SqliteAdapter
+from pycentroid.query import TestUtils
+from os.path import abspath, join, dirname
+from shutil import copyfile
+
+APP_PATH = abspath(join(dirname(__file__), '..'))
+
+
+@pytest.fixture()
+def context(tmp_path) -> DataContext:
+    app = DataApplication(cwd=APP_PATH)
+    context = app.create_context()
+    # use a copy of test database
+    copyfile(join(APP_PATH, 'db', 'local.db'), tmp_path / 'local.db')
+    context.__db__ = SqliteAdapter(AnyObject(database=str(tmp_path / 'local.db')))
+    return context
+
+
+async def test_migrate_once(context):
+    DataModelMigrations.reset()
+    model = context.model('OrderStatusType')
+    assert model.upgraded is False
+    await model.migrate()
+    assert model.upgraded is True
+    assert DataModelMigrations.misses == 1
+    # next queries do not check database
+    hits = DataModelMigrations.hits
+    await model.as_queryable().get_items()
+    await model.migrate()
+    assert DataModelMigrations.misses == 1
+    assert DataModelMigrations.hits > hits
+    await context.finalize()
+
+
+async def test_migrate_all(context):
+    DataModelMigrations.reset()
+    await DataModelMigrations.migrate(context, ['OrderStatusType', 'Thing'])
+    assert DataModelMigrations.misses == 2
+    assert context.model('OrderStatusType').upgraded is True
+    assert context.model('Thing').upgraded is True
+    await context.finalize()
+
+
+async def test_migrate_dry_run(context):
+    DataModelMigrations.reset()
+    # remove a column and the version of a table from the copy of test database
+    await context.db.execute('DROP VIEW "OrderStatusTypeData"')
+    await context.db.execute('ALTER TABLE "OrderStatusTypeBase" DROP COLUMN "alternateName"')
+    await context.db.execute('DELETE FROM migrations WHERE appliesTo=\'OrderStatusTypeBase\'')
+    statements = await DataModelMigrations.migrate(context, ['OrderStatusType'], dry_run=True)
+    assert len(statements) > 0
+    assert context.model('OrderStatusType').upgraded is False
+    columns = await context.db.table('OrderStatusTypeBase').columns()
+    assert next(filter(lambda x: x.name == 'alternateName', columns), None) is None
+    await context.finalize()
+
+
+async def test_migrate_with_rollback(context):
+    DataModelMigrations.reset()
+    model = context.model('OrderStatusType')
+
+    async def execute():
+        await model.migrate()
+        assert model.upgraded is True
+
+    await TestUtils(context.db).execute_in_transaction(execute)
+    # migration state is not kept after rollback
+    assert model.upgraded is False
+    await model.migrate()
+    assert model.upgraded is True
+    assert DataModelMigrations.misses == 2
+    await context.finalize()
+
+
+async def test_migrate_indexes(context):
+    DataModelMigrations.reset()
+    indexes = DataModelUpgrade.indexes(context.model('Product'))
+    # foreign keys and the primary key of a derived model
+    assert ['isRelatedTo'] in indexes['ProductBase']
+    assert ['id'] in indexes['ProductBase']
+    # junction tables
+    indexes = DataModelUpgrade.indexes(context.model('AuthClient'))
+    assert indexes['AuthClientScopes'] == [['client'], ['scope']]
+
+    async def execute():
+        await context.db.execute('DROP INDEX "INDEX_PRODUCTBASE_ISRELATEDTO"')
+        await context.db.execute('DELETE FROM migrations WHERE appliesTo=\'ProductBase\'')
+
+    await context.db.execute_in_transaction(execute)
+    await DataModelMigrations.migrate(context, ['Product'])
+    exists = await context.db.table('ProductBase').indexes().exists('INDEX_PRODUCTBASE_ISRELATEDTO')
+    assert exists
+    await context.finalize()
+
+
+def test_release_migration_lock():
+    key = ('test_release_migration_lock',)
+
+    async def check(fail: bool):
+        async with DataModelMigrations.lock(key):
+            await asyncio.sleep(0)
+            if fail:
+                raise DataError('Upgrade failed')
+
+    async def run():
+        results = await asyncio.gather(check(True), check(False), return_exceptions=True)
+        assert isinstance(results[0], DataError)
+        assert results[1] is None
+        # locks are removed even if a check fails
+        assert DataModelMigrations.__locks__[asyncio.get_running_loop()] == {}
+
+    # each event loop uses its own locks
+    asyncio.run(run())
+    asyncio.run(run())
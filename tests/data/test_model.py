@@ -3,6 +3,7 @@ from pycentroid.data.loaders import SchemaLoaderStrategy
 from pycentroid.data.application import DataApplication
 from pycentroid.data.types import DataModelProperties
 from pycentroid.data.model import DataModel
+from pycentroid.data.registry import DataModelRegistry
 from pycentroid.data.context import DataContext
 from os.path import abspath, join, dirname
 from pycentroid.query import TestUtils
@@ -94,3 +95,37 @@ def test_many_to_many(context):
     mapping = context.model('AuthClient').infermapping('scopes')
     assert mapping is not None
     assert mapping.associationType == 'junction'
+
+
+def test_use_model_registry(context):
+    model: DataModel = context.model('Product')
+    # data models are created once per data context
+    assert context.model('Product') is model
+    # and their attributes are shared across data contexts
+    other_context = context.application.create_context()
+    assert other_context.model('Product') is not model
+    assert other_context.model('Product').attributes is model.attributes
+    # the auto increment key of base model remains unchanged
+    assert model.key().type == 'Integer'
+    assert context.model('Thing').key().type == 'Counter'
+    registry: DataModelRegistry = context.application.configuration.getstrategy(DataModelRegistry)
+    assert 'Product' in registry
+    # invalidate base model and its dependents
+    attributes = model.attributes
+    registry.invalidate('Thing')
+    assert 'Thing' not in registry
+    assert 'Product' not in registry
+    assert model.attributes is not attributes
+    # association mappings depend on associated models
+    mapping = context.model('Order').infermapping('customer')
+    assert mapping.parentModel == 'Person'
+    registry.invalidate('Person')
+    assert 'Order' not in registry
+
+
+def test_silent_model(context):
+    model: DataModel = context.model('Product')
+    silent_model = model.silent()
+    assert silent_model.__silent__ is True
+    assert model.__silent__ is False
+    assert context.model('Product') is model
@@ -2,8 +2,15 @@ import pytest
 from os.path import abspath, join, dirname
 from pycentroid.data.application import DataApplication
 from pycentroid.data.context import DataContext
+from pycentroid.data.queryable import DataQueryable
+from pycentroid.common import AnyObject, DataError
+from pycentroid.query import QueryField
+from pycentroid.sqlite import SqliteAdapter, SqliteRow
 from types import SimpleNamespace
+from array import array
 import logging
+import json
+import base64
 from os import getcwd
 
 APP_PATH = abspath(join(dirname(__file__), '..'))
@@ -110,3 +117,210 @@ async def test_expand_many_to_many_parent_objects(context: DataContext):
     assert len(results) > 0
     for result in results:
         assert isinstance(result.groups, list)
+
+
+async def test_expand_with_row_factory(context: DataContext):
+    context.__db__ = SqliteAdapter(AnyObject(database=context.db.options.database, rowFactory='row'))
+    results = await context.model('Person').where(
+        lambda x: x.jobTitle == 'Civil Engineer'
+    ).expand(
+        lambda x: (x.orders,)
+        ).take(10).get_items()
+    assert len(results) > 0
+    for result in results:
+        assert isinstance(result, SqliteRow)
+        assert isinstance(result.orders, list)
+        for order in result.orders:
+            assert order.customer == result.id
+
+
+async def test_stream(context: DataContext):
+    count = await context.model('Product').as_queryable().count()
+    items = []
+    async for item in context.model('Product').as_queryable().stream(batch_size=10):
+        items.append(item)
+    assert len(items) == count
+    # use queryable as an asynchronous iterator
+    items = []
+    async for item in context.model('Product').where(
+        lambda x: x.category == 'Laptops'
+    ):
+        assert item.category == 'Laptops'
+        items.append(item)
+    assert len(items) > 0
+
+
+async def test_stream_with_expand(context: DataContext):
+    query = context.model('Person').where(
+        lambda x: x.jobTitle == 'Civil Engineer'
+    ).expand(
+        lambda x: (x.orders,)
+        )
+    items = []
+    async for item in query.stream(batch_size=5):
+        assert isinstance(item.orders, list)
+        for order in item.orders:
+            assert order.customer == item.id
+        items.append(item)
+    assert len(items) > 0
+
+
+async def test_expand_parent_objects_in_batch(context: DataContext):
+    orders = await context.model('Order').as_queryable().select(
+        lambda x: (x.id, x.customer,)
+    ).order_by(
+        lambda x: (x.id,)
+    ).take(500).get_items()
+    results = await context.model('Order').as_queryable().expand(
+        lambda x: (x.customer,)
+    ).order_by(
+        lambda x: (x.id,)
+    ).take(500).get_items()
+    assert len(results) == len(orders)
+    customers = dict(map(lambda x: (x.id, x.customer), orders))
+    for result in results:
+        assert result.customer is not None
+        assert result.customer.id == customers[result.id]
+
+
+async def test_after(context: DataContext):
+    items = await context.model('Product').as_queryable().select(
+        lambda x: (x.id, x.name, x.category,)
+    ).order_by('category').then_by('id').get_items()
+    # get pages by seeking the last item of the previous page
+    results = []
+    q = context.model('Product').as_queryable().select(
+        lambda x: (x.id, x.name, x.category,)
+    ).order_by('category').take(25).after()
+    page = await q.get_items()
+    while len(page) > 0:
+        results.extend(page)
+        token = q.token(page[-1])
+        q = context.model('Product').as_queryable().select(
+            lambda x: (x.id, x.name, x.category,)
+        ).order_by('category').take(25).after(token)
+        page = await q.get_items()
+    assert list(map(lambda x: x.id, results)) == list(map(lambda x: x.id, items))
+    # and use mixed directions
+    page = await context.model('Product').as_queryable().select(
+        lambda x: (x.id, x.name, x.category,)
+    ).order_by_descending('category').then_by('id').take(5).after(items[-1]).get_items()
+    assert len(page) == 5
+    assert all(map(lambda x: x.category < items[-1].category, page))
+
+
+def test_token_of_joined_attributes(context: DataContext):
+    q = context.model('Order').as_queryable().select(
+        'id', QueryField('name').from_collection('orderedItem').asattr('productName')
+    )
+    q.__order_by__ = [{'$expr': '$orderedItem.name', 'direction': 1}]
+    # the value of a joined attribute is read from its alias
+    token = q.token(AnyObject(id=5, name='Order 5', productName='Apple MacBook Air'))
+    assert json.loads(base64.urlsafe_b64decode(token.encode())) == ['Apple MacBook Air', 5]
+    q = context.model('Order').as_queryable().select('id', 'name')
+    q.__order_by__ = [{'$expr': '$orderedItem.name', 'direction': 1}]
+    with pytest.raises(DataError) as error:
+        q.token(AnyObject(id=5, name='Order 5'))
+    assert error.value.code == 'ERR_SEEK'
+
+
+async def test_get_list(context: DataContext):
+    total = await context.model('Product').as_queryable().count()
+    q = context.model('Product').as_queryable().select(
+        lambda x: (x.id, x.name, x.category,)
+    ).order_by('id').take(10).skip(10)
+    result = await q.get_list()
+    assert result.total == total
+    assert result.skip == 10
+    assert len(result.value) == 10
+    assert not hasattr(result.value[0], '__total__')
+    # query has not been changed
+    items = await q.get_items()
+    assert list(map(lambda x: x.id, items)) == list(map(lambda x: x.id, result.value))
+    # a page after the last item is counted by another statement
+    result = await context.model('Product').as_queryable().take(10).skip(total).get_list()
+    assert result.total == total
+    assert len(result.value) == 0
+
+
+async def test_get_list_with_cached_count(context: DataContext):
+    context.db.window_functions = False
+    context.application.configuration.set('settings/query/countMaxAge', 60)
+    result = await context.model('Order').where(
+        lambda x: x.orderStatus.alternateName == 'OrderProcessing'
+    ).expand(
+        lambda x: (x.customer,)
+        ).take(5).get_list()
+    assert result.total > 5
+    assert len(result.value) == 5
+    for item in result.value:
+        assert item.customer.id is not None
+    # count is returned from cache
+    cached = await context.model('Order').where(
+        lambda x: x.orderStatus.alternateName == 'OrderProcessing'
+    ).take(5).skip(5).get_list()
+    assert cached.total == result.total
+    assert len(DataQueryable.__counts__) > 0
+
+
+async def test_get_list_with_groups(context: DataContext):
+    items = await context.model('Product').as_queryable().select(
+        'category', QueryField('id').count().asattr('total')
+    ).group_by('category').get_items()
+    for window_functions in [True, False]:
+        context.db.window_functions = window_functions
+        result = await context.model('Product').as_queryable().select(
+            'category', QueryField('id').count().asattr('total')
+        ).group_by('category').take(2).get_list()
+        # groups are counted instead of items
+        assert result.total == len(items)
+        assert len(result.value) == 2
+
+
+async def test_get_columns(context: DataContext):
+    columns = await context.model('Product').where(
+        lambda x: x.category == 'Laptops'
+    ).select(
+        'id', 'name', 'price', 'model', QueryField('price').average().asattr('averagePrice')
+    ).group_by(
+        'id', 'name', 'price', 'model'
+    ).get_columns()
+    items = await context.model('Product').where(
+        lambda x: x.category == 'Laptops'
+    ).select('id', 'name', 'price', 'model').get_items()
+    assert len(columns['id']) == len(items)
+    assert list(columns['id']) == list(map(lambda x: x.id, items))
+    assert list(columns['name']) == list(map(lambda x: x.name, items))
+    assert list(columns['price']) == list(map(lambda x: x.price, items))
+    assert list(columns['averagePrice']) == list(map(lambda x: float(x.price), items))
+    if isinstance(columns['id'], array):
+        # numeric columns are compact arrays if numpy is not available
+        assert columns['id'].typecode == 'q'
+        assert columns['price'].typecode == 'd'
+        assert isinstance(columns['name'], list)
+
+
+async def test_clone(context: DataContext):
+    q = context.model('Order').as_queryable().select(
+        lambda x: (x.id, x.orderDate,)
+    ).where(
+        lambda x: x.orderedItem.category == 'Desktops'
+    ).order_by('id')
+    lookup = q.__lookup__
+    total = await q.count()
+    # count does not change query
+    assert q.__limit__ == 0
+    assert 'length' not in q.__select__
+    # derive pages from the same query
+    pages = []
+    for skip in range(0, total, 10):
+        pages.extend(await q.clone().take(10).skip(skip).get_items())
+    items = await q.get_items()
+    assert list(map(lambda x: x.id, pages)) == list(map(lambda x: x.id, items))
+    # a clone resolves its own joins
+    clone = q.clone().where(
+        lambda x: x.customer.familyName == 'Doe'
+    )
+    assert len(clone.__lookup__) > len(lookup)
+    assert q.__lookup__ is lookup
+    await clone.get_items()
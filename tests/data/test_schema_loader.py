@@ -1,6 +1,10 @@
 from pycentroid.data.application import DataApplication
 from pycentroid.data.loaders import SchemaLoaderStrategy, FileSchemaLoaderStrategy, DefaultSchemaLoaderStrategy
+from pycentroid.data.types import DataModelProperties
 from os.path import abspath, join, dirname
+from os import utime
+from shutil import copyfile
+import json
 
 APP_PATH = abspath(join(dirname(__file__), '..'))
 
@@ -51,3 +55,51 @@ def test_use_loaders():
     assert len(loader.loaders) > 0
     model = loader.get('TestAction')
     assert model is not None
+
+
+def test_use_cache():
+    app = DataApplication(cwd=APP_PATH)
+    loader = FileSchemaLoaderStrategy(app.configuration)
+    model = loader.get('Action')
+    assert model is not None
+    # search is case-insensitive and uses parsed models
+    assert loader.__find__('action') is loader.__find__('ACTION')
+    assert loader.get('action') == model
+    assert 'Action' in loader.list()
+
+
+def test_get_copy():
+    app = DataApplication(cwd=APP_PATH)
+    loader = FileSchemaLoaderStrategy(app.configuration)
+    model = loader.get('Action')
+    title = model.title
+    model.title = 'Modified Action'
+    model.fields.append({'name': 'modifiedField', 'type': 'Text'})
+    # changes do not leak into the models of the loader
+    model = loader.get('Action')
+    assert model.title == title
+    assert next(filter(lambda x: x['name'] == 'modifiedField', model.fields), None) is None
+    assert isinstance(model, DataModelProperties)
+
+
+def test_use_revalidate(tmp_path):
+    app = DataApplication(cwd=APP_PATH)
+    app.configuration.set('settings/schema/revalidate', True)
+    loader = FileSchemaLoaderStrategy(app.configuration)
+    loader.path = str(tmp_path)
+    copyfile(join(dirname(__file__), 'models', 'TestAction.json'), tmp_path / 'TestAction.json')
+    model = loader.get('TestAction')
+    assert model is not None
+    assert loader.__find__('TestAction') is loader.__find__('TestAction')
+    # change schema file
+    path = tmp_path / 'TestAction.json'
+    schema = json.loads(path.read_text())
+    schema['version'] = '9.9.9'
+    path.write_text(json.dumps(schema))
+    stat = path.stat()
+    utime(path, (stat.st_atime, stat.st_mtime + 10))
+    model = loader.get('TestAction')
+    assert model.version == '9.9.9'
+    # new schema files are found
+    (tmp_path / 'OtherAction.json').write_text(json.dumps(dict(schema, name='OtherAction')))
+    assert loader.get('OtherAction') is not None
@@ -1,4 +1,4 @@
-from pycentroid.query import ClosureParser, select
+from pycentroid.query import ClosureParser, select, closure_parser
 from dill.source import getsource
 import ast
 import re
@@ -238,3 +238,56 @@ def test_parse_sequence():
         'familyName': 1,
         'address.streetAddress': 1
     }
+
+
+def test_parse_cached_closure():
+
+    def parse(category: str):
+        result = ClosureParser().parse_filter(lambda x, category: x.category == category, {
+            'category': category
+        })
+        return result
+
+    assert parse('Laptops') == {'$eq': ['$category', 'Laptops']}
+    hits = ClosureParser.__expressions__.hits
+    misses = closure_parser.__closures__.misses
+    # the parsed expression of the closure is cached and new params are bound to it
+    assert parse('Desktops') == {'$eq': ['$category', 'Desktops']}
+    assert ClosureParser.__expressions__.hits == hits + 1
+    assert closure_parser.__closures__.misses == misses
+
+
+def test_parse_cached_closure_with_events():
+    members = []
+
+    def parse(prefix: str, price: float):
+        parser = ClosureParser()
+        parser.resolving_member.subscribe(lambda event: members.append(event.member))
+        result = parser.parse_filter(lambda x, prefix, price: x.name.startswith(prefix) and x.price > price, {
+            'prefix': prefix,
+            'price': price
+        })
+        return result
+
+    # a method which formats a param is parsed every time
+    assert parse('Apple', 500) == {'$and': [
+        {'$eq': [{'$regexMatch': {'input': '$name', 'regex': '^Apple'}}, 1]}, {'$gt': ['$price', 500]}
+    ]}
+    assert parse('Dell', 800) == {'$and': [
+        {'$eq': [{'$regexMatch': {'input': '$name', 'regex': '^Dell'}}, 1]}, {'$gt': ['$price', 800]}
+    ]}
+    assert members == ['$name', '$price', '$name', '$price']
+
+    def parse_cached(price: float):
+        parser = ClosureParser()
+        parser.resolving_member.subscribe(lambda event: members.append(event.member))
+        result = parser.parse_filter(lambda x, price: x.price > price and x.category == 'Laptops', {
+            'price': price
+        })
+        return result
+
+    members.clear()
+    assert parse_cached(500) == {'$and': [{'$gt': ['$price', 500]}, {'$eq': ['$category', 'Laptops']}]}
+    # member events are emitted also for a cached expression
+    assert parse_cached(800) == {'$and': [{'$gt': ['$price', 800]}, {'$eq': ['$category', 'Laptops']}]}
+    assert members == ['$price', '$category', '$price', '$category']
@@ -18,3 +18,18 @@ def test_object_name_escape():
     assert ObjectNameValidator().escape('Table1.field1', r'[\1]') == '[Table1].[field1]'
     with pytest.raises(InvalidObjectNameError):
         ObjectNameValidator().escape('Tab le1.field1')
+
+
+def test_escape_cached():
+    validator = ObjectNameValidator()
+    validator.escape('Table1.field2', r'"\1"')
+    hits = ObjectNameValidator.__escaped__.hits
+    assert ObjectNameValidator().escape('Table1.field2', r'"\1"') == '"Table1"."field2"'
+    assert ObjectNameValidator.__escaped__.hits == hits + 1
+    # the same name is escaped by format
+    assert validator.escape('Table1.field2', r'[\1]') == '[Table1].[field2]'
+    # invalid names are not cached
+    with pytest.raises(InvalidObjectNameError):
+        validator.escape('Table 1.field2')
+    with pytest.raises(InvalidObjectNameError):
+        validator.escape('Table 1.field2')
@@ -181,3 +181,63 @@ def test_parse_startswith():
             True
         ]
     }
+
+
+def test_parse_template():
+    parser = OpenDataParser()
+    expr = parser.parse('category eq \'Laptops\' and price gt 500')
+    assert expr == {
+        '$and': [
+            {'$eq': ['$category', 'Laptops']},
+            {'$gt': ['$price', 500]},
+        ]
+    }
+    # a source with other literals uses the tokens of the same template
+    misses = OpenDataParser.__tokens__.misses
+    expr = parser.parse('category eq \'Desktops\' and price gt 750.5')
+    assert expr == {
+        '$and': [
+            {'$eq': ['$category', 'Desktops']},
+            {'$gt': ['$price', 750.5]},
+        ]
+    }
+    tokens = parser.tokens
+    parser.source = 'category eq \'Desktops\' and price gt 750.5'
+    assert [token.source for token in parser.__to_list__()] == [token.source for token in tokens]
+    # template has been already tokenized, so only the new literals have been tokenized
+    assert OpenDataParser.__tokens__.misses == misses + 3
+    # prefixed strings are not replaced
+    expr = parser.parse('dateReleased gt datetime\'2020-01-01T00:00:00Z\' and year(dateReleased) eq 2020')
+    assert expr['$and'][1] == {'$eq': [{'$year': ['$dateReleased']}, 2020]}
+
+
+def test_parse_with_resolving_member():
+    expr = OpenDataParser().parse('category eq \'Laptops\'')
+    parser = OpenDataParser()
+
+    def resolve_member(event):
+        event.member = '$product.' + event.member[1:]
+
+    parser.resolving_member.subscribe(resolve_member)
+    # a parsed expression is not shared with a parser which resolves members
+    assert parser.parse('category eq \'Laptops\'') == {'$eq': ['$product.category', 'Laptops']}
+    assert OpenDataParser().parse('category eq \'Laptops\'') == expr
+    # cached expressions are copied
+    expr['$eq'][1] = 'Desktops'
+    assert OpenDataParser().parse('category eq \'Laptops\'') == {'$eq': ['$category', 'Laptops']}
+
+
+def test_parse_with_resolving_method():
+    expr = OpenDataParser().parse('tolower(category) eq \'laptops\'')
+    parser = OpenDataParser()
+    assert parser.__cacheable__() is True
+
+    def resolve_method(event):
+        if event.method == '$toLower':
+            event.method = '$toUpper'
+
+    parser.resolving_method.subscribe(resolve_method)
+    assert parser.__cacheable__() is False
+    # a parsed expression is not shared with a parser which resolves methods
+    assert parser.parse('tolower(category) eq \'laptops\'') != expr
+    assert OpenDataParser().parse('tolower(category) eq \'laptops\'') == expr
@@ -181,3 +181,32 @@ def test_join_expression():
         )
     sql = SqlFormatter().format(q)
     assert sql == 'SELECT Order.id,Order.customer FROM Order INNER JOIN (SELECT id FROM Person LIMIT 10) customer ON (Order.customer=customer.id)'  # noqa:E501
+
+
+def test_clone():
+    q = QueryExpression(QueryEntity('Order')).select(
+        lambda x: (x.id, x.customer,)
+    ).where('orderStatus').equal(1).order_by('id')
+    q.join(QueryEntity('Person')).on(
+        QueryExpression().where(QueryField('customer').from_collection('Order')).equal(
+            QueryField('id').from_collection('Person')
+        )
+    )
+    sql = SqlFormatter().format(q)
+    clone = q.clone()
+    # expressions are shared
+    assert clone.__where__ is q.__where__
+    assert clone.__lookup__ is q.__lookup__
+    assert clone.__order_by__ is q.__order_by__
+    # and lists are copied before changing them
+    clone.then_by('orderDate').where('customer').equal(100).left_join('Product', 'orderedItem', 'id')
+    assert clone.__order_by__ is not q.__order_by__
+    assert len(clone.__lookup__) == 2
+    assert len(q.__lookup__) == 1
+    assert len(q.__order_by__) == 1
+    assert SqlFormatter().format(q) == sql
+    # the original query does not change a clone
+    other = q.clone()
+    q.then_by('customer')
+    assert len(other.__order_by__) == 1
+    assert len(q.__order_by__) == 2
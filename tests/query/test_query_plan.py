@@ -0,0 +1,90 @@
+from pycentroid.query import QueryExpression, QueryEntity, QueryField, QueryPlanCache, SqlFormatter
+from pycentroid.sqlite import SqliteFormatter
+
+
+def get_products(category: str, price: float):
+    return QueryExpression('ProductData').select(
+        lambda x: (x.id, x.name, x.category, x.price,)
+    ).where(
+        lambda x: x.category == category and x.price > price, category=category, price=price
+    ).order_by(
+        lambda x: (x.price,)
+    ).take(25)
+
+
+def test_use_plan_cache():
+    plans = QueryPlanCache()
+    sql, values = plans.format(SqlFormatter(), get_products('Laptops', 500))
+    assert plans.misses == 1
+    assert values == ['Laptops', 500, 25]
+    expected_values = []
+    assert sql == SqlFormatter().format(get_products('Laptops', 500), expected_values)
+    assert values == expected_values
+    # a query of the same shape uses the same plan
+    sql2, values = plans.format(SqlFormatter(), get_products('Desktops', 1000))
+    assert plans.hits == 1
+    assert sql2 == sql
+    assert values == ['Desktops', 1000, 25]
+    # null values change the shape of a query
+    sql3, values = plans.format(SqlFormatter(), get_products(None, 1000))
+    assert plans.misses == 2
+    assert sql3 != sql
+    assert values == [1000, 25]
+
+
+def test_use_plan_cache_with_paging():
+    plans = QueryPlanCache()
+    for skip in [0, 25, 50]:
+        query = get_products('Laptops', 500).skip(skip)
+        expected_values = []
+        expected_sql = SqlFormatter().format(query, expected_values)
+        sql, values = plans.format(SqlFormatter(), query)
+        assert sql == expected_sql
+        assert values == expected_values
+    assert sql.endswith('LIMIT ? OFFSET ?')
+    assert values == ['Laptops', 500, 25, 50]
+    # the first page does not have an offset
+    assert plans.misses == 2
+    assert plans.hits == 1
+
+
+def test_use_plan_cache_with_join():
+    plans = QueryPlanCache()
+
+    def get_orders(status: str):
+        orders = QueryExpression('OrderData').select(
+            lambda x: (x.id, x.customer,)
+        ).where(
+            lambda x: x.orderStatus == status, status=status
+        )
+        return QueryExpression(QueryEntity('PersonData')).join(orders, 'q0').on(
+            QueryExpression().where(
+                QueryField('id')
+            ).equal(
+                QueryField('customer').from_collection('q0')
+            )
+        ).where(
+            lambda x: x.givenName.startswith('J') is True
+        )
+
+    for status in [1, 2, 3]:
+        expected_values = []
+        expected_sql = SqliteFormatter().format(get_orders(status), expected_values)
+        sql, values = plans.format(SqliteFormatter(), get_orders(status))
+        assert sql == expected_sql
+        assert values == expected_values
+    assert plans.misses == 1
+    assert plans.hits == 2
+
+
+def test_use_plan_cache_with_insert():
+    plans = QueryPlanCache()
+    for name in ['Lenovo Yoga 2', 'Lenovo Yoga 3']:
+        query = QueryExpression().insert({
+            'name': name,
+            'model': None
+        }).into('ProductBase')
+        sql, values = plans.format(SqlFormatter(), query)
+        assert sql == 'INSERT INTO ProductBase(name,model) VALUES (?,NULL)'
+        assert values == [name]
+    assert plans.hits == 1
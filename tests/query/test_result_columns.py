@@ -0,0 +1,57 @@
+import math
+import pytest
+from array import array
+from pycentroid.query import ColumnBuffer, to_columns
+from pycentroid.query import result_columns
+
+
+def test_to_columns():
+    numpy = result_columns.numpy
+    result_columns.numpy = None
+    try:
+        columns = to_columns(['id', 'name', 'price', 'active'], [
+            [(1, 'Apple', 1.5, True), (2, 'Samsung', 2.5, False)],
+            [(3, 'Lenovo', 3.5, True)]
+        ], {'active': 'b'})
+    finally:
+        result_columns.numpy = numpy
+    assert columns['id'] == array('q', [1, 2, 3])
+    assert columns['name'] == ['Apple', 'Samsung', 'Lenovo']
+    assert columns['price'] == array('d', [1.5, 2.5, 3.5])
+    assert columns['active'] == array('b', [1, 0, 1])
+
+
+def test_column_buffer_with_nulls():
+    numpy = result_columns.numpy
+    result_columns.numpy = None
+    try:
+        buffer = ColumnBuffer('quantity')
+        buffer.extend((None, None))
+        buffer.extend((1, 2))
+        # an integer column with null values is converted to a float column
+        values = buffer.value()
+        assert values.typecode == 'd'
+        assert math.isnan(values[0]) and math.isnan(values[1])
+        assert values[2:] == array('d', [1, 2])
+        # a numeric column with values of other types is converted to a list
+        buffer = ColumnBuffer('price', 'd')
+        buffer.extend((1.5, 2))
+        buffer.extend(('n/a',))
+        assert buffer.value() == [1.5, 2, 'n/a']
+    finally:
+        result_columns.numpy = numpy
+
+
+def test_to_numpy_columns():
+    numpy = pytest.importorskip('numpy')
+    columns = to_columns(['id', 'price', 'active'], [
+        [(1, 1.5, True), (2, 2.5, False)]
+    ], {'active': 'b'})
+    assert columns['id'].dtype == numpy.dtype('int64')
+    # columns are writable
+    columns['id'][0] = 10
+    columns['price'][0] = 10.5
+    columns['active'][1] = True
+    assert columns['id'].tolist() == [10, 2]
+    assert columns['price'].tolist() == [10.5, 2.5]
+    assert columns['active'].tolist() == [True, True]
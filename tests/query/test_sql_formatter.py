@@ -1,4 +1,5 @@
 from math import floor
+from concurrent.futures import ThreadPoolExecutor
 from pycentroid.query import SqlFormatter, QueryExpression, QueryEntity, QueryField, select
 from pycentroid.common import year, month
 
@@ -80,6 +81,20 @@ def test_format_insert():
     assert sql == 'INSERT INTO ProductData(name) VALUES (\'Lenovo Yoga 2\')'
 
 
+def test_format_insert_many():
+    products = QueryEntity('ProductData')
+    query = QueryExpression().insert([
+        {'name': 'Lenovo Yoga 2', 'model': 'YOGA2'},
+        {'name': 'Lenovo Yoga 3', 'model': None}
+    ]).into(products)
+    sql = SqlFormatter().format(query)
+    assert sql == 'INSERT INTO ProductData(name,model) VALUES (\'Lenovo Yoga 2\',\'YOGA2\'),(\'Lenovo Yoga 3\',NULL)'
+    values = []
+    sql = SqlFormatter().format(query, values)
+    assert sql == 'INSERT INTO ProductData(name,model) VALUES (?,?),(?,NULL)'
+    assert values == ['Lenovo Yoga 2', 'YOGA2', 'Lenovo Yoga 3']
+
+
 def test_format_join():
     query = QueryExpression('OrderData').select(
         'id', 'customer', 'orderDate', 'orderedItem'
@@ -113,7 +128,18 @@ def test_format_limit_select():
     query = QueryExpression().select('id', 'name', 'category', 'releaseDate', 'price') \
         .from_collection('ProductData').take(5).skip(5).order_by('name').then_by('category')
     sql = SqlFormatter().format_limit_select(query)
-    assert sql == 'SELECT id,name,category,releaseDate,price FROM ProductData ORDER BY name ASC,category ASC LIMIT 5,5'  # noqa:E501
+    assert sql == 'SELECT id,name,category,releaseDate,price FROM ProductData ORDER BY name ASC,category ASC LIMIT 5 OFFSET 5'  # noqa:E501
+
+
+def test_format_seek():
+    query = QueryExpression().select('id', 'name').from_collection('ProductData') \
+        .order_by('name').then_by('id').take(5).seek(['Product 1', 50])
+    sql = SqlFormatter().format(query)
+    assert sql == 'SELECT id,name FROM ProductData WHERE ((name,id)>(\'Product 1\',50)) ORDER BY name ASC,id ASC LIMIT 5'  # noqa:E501
+    query = QueryExpression().select('id', 'name').from_collection('ProductData') \
+        .order_by_descending('name').then_by('id').take(5).seek(['Product 1', 50])
+    sql = SqlFormatter().format(query)
+    assert sql == 'SELECT id,name FROM ProductData WHERE ((name<\'Product 1\') OR ((name=\'Product 1\') AND (id>50))) ORDER BY name DESC,id ASC LIMIT 5'  # noqa:E501
 
 
 def test_format_group_by():
@@ -211,3 +237,79 @@ def test_if_expr():
     )
     sql = SqlFormatter().format(query)
     assert sql == 'SELECT id,name,(CASE (price>800) WHEN 1 THEN \'expensive\' ELSE \'normal\' END) AS priceStatus FROM ProductData'  # noqa:E501
+
+
+def test_format_with_values():
+    query = QueryExpression('ProductData').select(
+        lambda x: (x.id, x.name,)
+    ).where(
+        lambda x: x.category == 'Laptops' and round(x.price, 2) > 500
+    )
+    values = []
+    sql = SqlFormatter().format(query, values)
+    assert sql == 'SELECT id,name FROM ProductData WHERE ((category=?) AND (ROUND(price,?)>?))'
+    assert values == ['Laptops', 2, 500]
+    query = QueryExpression().update('Product').set(
+        {'name': 'Macbook Pro 13.3', 'description': None}
+    ).where(
+        lambda x: x.id == 121
+    )
+    values = []
+    sql = SqlFormatter().format(query, values)
+    assert sql == 'UPDATE Product SET name=?,description=NULL WHERE (id=?)'
+    assert values == ['Macbook Pro 13.3', 121]
+
+
+def test_format_in_list():
+    query = QueryExpression(QueryEntity('ProductData')).select('id', 'name').where('category').in_list(
+        ['Laptops', 'Desktops']
+    )
+    sql = SqlFormatter().format(query)
+    assert sql == 'SELECT id,name FROM ProductData WHERE (category IN (\'Laptops\',\'Desktops\'))'
+    values = []
+    sql = SqlFormatter().format(query, values)
+    assert sql.endswith('WHERE (category IN (?,?))')
+    assert values == ['Laptops', 'Desktops']
+
+
+def test_format_join_with_values():
+    customers = QueryExpression(QueryEntity('Person'), alias='customer').select(
+        'id', 'familyName'
+    ).where('familyName').equal('Doe')
+    query = QueryExpression(QueryEntity('Order')).select(
+        lambda x: (x.id, x.customer,)
+    ).join(customers).on(
+        lambda x, customer: x.customer == customer.id
+    ).where('orderStatus').equal(1)
+    values = []
+    sql = SqlFormatter().format(query, values)
+    assert sql == 'SELECT Order.id,Order.customer FROM Order INNER JOIN (SELECT id,familyName FROM Person WHERE (familyName=?)) customer ON (Order.customer=customer.id) WHERE (Order.orderStatus=?)'  # noqa:E501
+    assert values == ['Doe', 1]
+
+
+def test_format_with_shared_formatter():
+    formatter = SqlFormatter()
+
+    def format_query(index: int):
+        query = QueryExpression('OrderData').select(
+            'id', 'orderedItem'
+        ).where('customer').equal(index)
+        if index % 2 == 0:
+            # a query with joins qualifies its fields
+            query.join(collection='ProductData').on(
+                QueryExpression().where('orderedItem').equal(QueryField('id').from_collection('ProductData'))
+            )
+        values = []
+        return formatter.format(query, values), values
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(format_query, range(200)))
+    for index, (sql, values) in enumerate(results):
+        if index % 2 == 0:
+            assert sql.startswith('SELECT OrderData.id,OrderData.orderedItem FROM OrderData INNER JOIN')
+        else:
+            assert sql == 'SELECT id,orderedItem FROM OrderData WHERE (customer=?)'
+        assert values == [index]
+    # the state of formatting is not kept
+    assert formatter.__dialect__.state.values is None
+    assert formatter.__dialect__.state.collection is None
@@ -0,0 +1,40 @@
+import random
+import sqlite3
+from datetime import datetime
+from pycentroid.query import SqlUtils, BACKSLASH_ESCAPE_TABLE, QUOTE_ESCAPE_TABLE
+from pycentroid.sqlite import SqliteDialect
+
+CHARACTERS = 'abc xyz\'"\\%_;-\n\r\t\b\x1a\0αβγ'
+
+
+def random_strings(size: int, seed: int = 1):
+    generator = random.Random(seed)
+    for _ in range(size):
+        yield ''.join(generator.choice(CHARACTERS) for _ in range(generator.randint(0, 16)))
+
+
+def test_escape():
+    assert SqlUtils.escape(None) == 'NULL'
+    assert SqlUtils.escape(True) == 'true'
+    assert SqlUtils.escape(10) == '10'
+    assert SqlUtils.escape(1.5) == '1.5'
+    assert SqlUtils.escape(datetime(2020, 1, 1, 10, 30)) == '2020-01-01 10:30:00'
+    assert SqlUtils.escape('Lenovo') == '\'Lenovo\''
+    # inserted backslashes are not escaped again
+    assert SqlUtils.escape('it\'s') == '\'it\\\'s\''
+    assert SqlUtils.escape_string('a\\b\n', BACKSLASH_ESCAPE_TABLE) == 'a\\\\b\\n'
+    assert SqlUtils.escape('it\'s', escape_table=QUOTE_ESCAPE_TABLE) == '\'it\'\'s\''
+    assert SqlUtils.escape('a\\b', escape_table=QUOTE_ESCAPE_TABLE) == '\'a\\b\''
+
+
+def test_escape_with_sqlite():
+    dialect = SqliteDialect()
+    connection = sqlite3.connect(':memory:')
+    try:
+        for value in random_strings(2000):
+            # an escaped string is evaluated to the original value
+            literal = dialect.escape_constant(value)
+            result = connection.execute(f'SELECT {literal}').fetchone()[0]
+            assert result == value
+    finally:
+        connection.close()
@@ -1,6 +1,7 @@
+import asyncio
 from pycentroid.common import AnyObject
 from pycentroid.query import DataColumn, QueryEntity, QueryExpression, select, TestUtils
-from pycentroid.sqlite import SqliteAdapter, SqliteFormatter
+from pycentroid.sqlite import SqliteAdapter, SqliteFormatter, SqliteWorkers, SqliteRow
 from os.path import abspath, join, dirname
 
 connection_options = AnyObject(database=abspath(join(dirname(__file__), '../db/local.db')))
@@ -157,3 +158,79 @@ async def test_sqlite_regex():
     assert len(items) > 0
     for item in items:
         assert item.name.__contains__('Apple')
+
+
+async def test_execute_with_values():
+    db = SqliteAdapter(connection_options)
+    items = await db.execute('SELECT id, name FROM ProductData WHERE category=? AND price>?', ['Laptops', 500])
+    assert len(items) > 0
+    # noinspection PyPep8Naming
+    Products = QueryEntity('ProductData')
+    results = await db.execute(
+        QueryExpression(Products).select(
+            lambda x: (x.id, x.name,)
+        ).where(
+            lambda x: x.category == 'Laptops' and x.price > 500
+        )
+    )
+    assert len(results) == len(items)
+    # string values are passed as parameters so quotes do not need escaping
+    items = await db.execute(
+        QueryExpression(Products).where(lambda x: x.name == 'Apple\'s "MacBook"')
+    )
+    assert len(items) == 0
+    await db.close()
+
+
+async def test_stream():
+    db = SqliteAdapter(connection_options)
+    items = await db.execute('SELECT id FROM ProductData')
+    batches = []
+    async for batch in db.stream('SELECT id FROM ProductData', batch_size=10):
+        assert len(batch) <= 10
+        batches.append(batch)
+    assert len(batches) == (len(items) + 9) // 10
+    assert sum(map(len, batches)) == len(items)
+    await db.close()
+
+
+async def test_execute_in_workers():
+    options = AnyObject(database=connection_options.database, workers=2)
+    databases = [SqliteAdapter(options) for _ in range(4)]
+    results = await asyncio.gather(*[
+        db.execute('SELECT COUNT(*) AS total FROM ProductData WHERE category=?', ['Laptops']) for db in databases
+    ])
+    for items in results:
+        assert items[0].total == results[0][0].total
+    db = databases[0]
+    assert db.workers is SqliteWorkers.get(connection_options.database)
+
+    async def insert_product():
+        await db.execute('CREATE TEMP TABLE ProductNames (name TEXT)')
+        await db.execute('INSERT INTO ProductNames (name) VALUES (?)', ['Lenovo Yoga'])
+        assert await db.last_identity() == 1
+
+    await db.execute_in_transaction(insert_product)
+    batches = [batch async for batch in db.stream('SELECT name FROM ProductNames')]
+    assert batches[0][0].name == 'Lenovo Yoga'
+    for db in databases:
+        await db.close()
+    SqliteWorkers.shutdown_all()
+
+
+async def test_row_factory():
+    db = SqliteAdapter(AnyObject(database=connection_options.database, rowFactory='row'))
+    assert db.row_factory == 'row'
+    items = await db.execute('SELECT id, name, price FROM ProductData WHERE category=? ORDER BY id', ['Laptops'])
+    assert len(items) > 0
+    item = items[0]
+    assert isinstance(item, SqliteRow)
+    assert item.__columns__ == ('id', 'name', 'price')
+    assert type(item) is type(items[1])
+    assert vars(item) == {'id': item.id, 'name': item.name, 'price': item.price}
+    # rows are mutable
+    item.category = 'Laptops'
+    assert item.category == 'Laptops'
+    batches = [batch async for batch in db.stream('SELECT id, name FROM ProductData WHERE category=?', ['Laptops'])]
+    assert isinstance(batches[0][0], SqliteRow)
+    await db.close()
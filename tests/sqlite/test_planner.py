@@ -0,0 +1,138 @@
+from pycentroid.common import AnyObject
+from pycentroid.query import DataColumn, TestUtils
+from pycentroid.sqlite import SqliteAdapter
+from os.path import abspath, join, dirname
+
+connection_options = AnyObject(database=abspath(join(dirname(__file__), '../db/local.db')))
+
+
+async def test_inspect():
+    db = SqliteAdapter(connection_options)
+    schema = await db.planner().inspect(migrations='migrations')
+    assert 'ThingBase' in schema.tables
+    assert 'ThingData' in schema.views
+    column = next(filter(lambda x: x.name == 'id', schema.tables['ThingBase'].columns), None)
+    assert column is not None
+    assert column.primary is True
+    assert schema.versions.get('ThingBase') is not None
+    await db.close()
+
+
+async def test_inspect_tables():
+    db = SqliteAdapter(connection_options)
+    schema = await db.planner().inspect(['ThingBase'], migrations='migrations')
+    assert list(schema.tables) == ['ThingBase', 'migrations']
+    assert len(schema.views) == 0
+    assert len(schema.tables['ThingBase'].columns) > 0
+    assert schema.versions.get('ThingBase') is not None
+    schema = await db.planner().inspect(['ThingBase'])
+    assert list(schema.tables) == ['ThingBase']
+    assert schema.versions == {}
+    await db.close()
+
+
+async def test_plan():
+    db = SqliteAdapter(connection_options)
+
+    async def execute():
+        await db.table('Table1').create([
+            DataColumn(name='id', type='Counter'),
+            DataColumn(name='name', type='Text', nullable=False, size=255)
+        ])
+        planner = db.planner()
+        statements = await planner.apply({
+            'Table1': [
+                DataColumn(name='id', type='Counter'),
+                DataColumn(name='name', type='Text', nullable=False, size=255),
+                DataColumn(name='description', type='Text', size=512)
+            ],
+            'Table2': [
+                DataColumn(name='id', type='Counter')
+            ]
+        }, dry_run=True)
+        assert statements == [
+            'ALTER TABLE "Table1" ADD COLUMN "description" TEXT(512) NULL',
+            'CREATE TABLE "Table2"("id" INTEGER PRIMARY KEY AUTOINCREMENT NULL)'
+        ]
+        # dry run does not change database
+        exists = await db.table('Table2').exists()
+        assert exists is False
+
+    await TestUtils(db).execute_in_transaction(execute)
+    await db.close()
+
+
+async def test_apply_with_views(tmp_path):
+    db = SqliteAdapter(AnyObject(database=str(tmp_path / 'local.db')))
+    await db.table('Table1').create([
+        DataColumn(name='id', type='Counter'),
+        DataColumn(name='name', type='Text', nullable=False, size=255)
+    ])
+    await db.execute('CREATE VIEW "Table1Data" AS SELECT * FROM "Table1"')
+
+    async def insert():
+        await db.execute('INSERT INTO "Table1" ("name") VALUES (\'Item 1\')')
+
+    await db.execute_in_transaction(insert)
+    statements = await db.planner().apply({
+        'Table1': [
+            DataColumn(name='id', type='Counter'),
+            DataColumn(name='name', type='Text', nullable=False, size=512)
+        ]
+    })
+    assert len(statements) > 0
+    columns = await db.table('Table1').columns()
+    column = next(filter(lambda x: x.name == 'name', columns), None)
+    assert column.size == 512
+    # views still refer to the upgraded table
+    results = await db.execute('SELECT name FROM "Table1Data"')
+    assert len(results) == 1
+    assert results[0].name == 'Item 1'
+    # and foreign_keys pragma is restored
+    results = await db.execute('PRAGMA foreign_keys')
+    assert results[0].foreign_keys == 0
+    await db.close()
+
+
+async def test_plan_indexes():
+    db = SqliteAdapter(connection_options)
+
+    async def execute():
+        fields = [
+            DataColumn(name='id', type='Counter'),
+            DataColumn(name='name', type='Text', nullable=False, size=255)
+        ]
+        await db.table('Table1').create(fields)
+        planner = db.planner()
+        statements = await planner.apply({
+            'Table1': fields
+        }, indexes={
+            'Table1': [['name']],
+            'Table2': [['id']]
+        })
+        assert statements == [
+            'CREATE INDEX "INDEX_TABLE1_NAME" ON "Table1"("name")'
+        ]
+        exists = await db.table('Table1').indexes().exists('INDEX_TABLE1_NAME')
+        assert exists
+        # existing indexes are not created again
+        statements = await planner.apply({
+            'Table1': fields
+        }, indexes={
+            'Table1': [['name']]
+        })
+        assert len(statements) == 0
+        # indexes are created again after copying a table
+        fields[1] = DataColumn(name='name', type='Text', nullable=False, size=512)
+        statements = await planner.apply({
+            'Table1': fields
+        }, indexes={
+            'Table1': [['name']]
+        })
+        assert statements[0] == 'DROP INDEX "INDEX_TABLE1_NAME"'
+        assert statements[-1] == 'CREATE INDEX "INDEX_TABLE1_NAME" ON "Table1"("name")'
+        exists = await db.table('Table1').indexes().exists('INDEX_TABLE1_NAME')
+        assert exists
+
+    await TestUtils(db).execute_in_transaction(execute)
+    await db.close()
@@ -0,0 +1,104 @@
+import asyncio
+from pycentroid.common import AnyObject
+from pycentroid.sqlite import SqliteAdapter, SqlitePool
+from pycentroid.data.application import DataApplication
+from os.path import abspath, join, dirname
+
+connection_options = AnyObject(database=abspath(join(dirname(__file__), '../db/local.db')), pool={
+    'max': 2
+})
+
+
+async def test_use_pool():
+    db = SqliteAdapter(connection_options)
+    db.name = 'test_use_pool'
+    await db.open()
+    connection = db.__raw_connection__
+    assert db.pool.size == 1
+    await db.close()
+    assert db.pool.idle == 1
+    # use the same physical connection
+    db = SqliteAdapter(connection_options)
+    db.name = 'test_use_pool'
+    items = await db.execute('SELECT COUNT(*) AS total FROM ProductData')
+    assert items[0].total > 0
+    assert db.__raw_connection__ is connection
+    # regular expression functions are still registered
+    items = await db.execute('SELECT REGEXP_LIKE(\'Apple\', \'^A\', \'m\') AS result')
+    assert items[0].result == 1
+    await db.close()
+    assert db.pool.size == 1
+    SqlitePool.drain_all()
+
+
+async def test_wait_for_connection():
+    adapters = []
+    for i in range(3):
+        db = SqliteAdapter(connection_options)
+        db.name = 'test_wait_for_connection'
+        adapters.append(db)
+    await adapters[0].open()
+    await adapters[1].open()
+    pool = adapters[0].pool
+    assert pool.size == 2
+    # the third adapter waits until a connection is released
+    task = asyncio.ensure_future(adapters[2].open())
+    await asyncio.sleep(0)
+    assert task.done() is False
+    await adapters[0].close()
+    await task
+    assert pool.size == 2
+    assert adapters[2].__raw_connection__ is not None
+    for db in adapters:
+        await db.close()
+    assert pool.idle == 2
+    SqlitePool.drain_all()
+
+
+async def test_rollback_on_release():
+    db = SqliteAdapter(connection_options)
+    db.name = 'test_rollback_on_release'
+    await db.execute('BEGIN;')
+    await db.execute('CREATE TABLE Table1 (id INTEGER)')
+    await db.close()
+    db = SqliteAdapter(connection_options)
+    db.name = 'test_rollback_on_release'
+    exists = await db.table('Table1').exists()
+    assert exists is False
+    await db.close()
+    SqlitePool.drain_all()
+
+
+async def test_pool_per_database(tmp_path):
+    db = SqliteAdapter(connection_options)
+    db.name = 'test'
+    other = SqliteAdapter(AnyObject(database=str(tmp_path / 'other.db'), pool={
+        'max': 2
+    }))
+    other.name = 'test'
+    # adapters of the same name which use different databases do not share connections
+    assert db.pool is not other.pool
+    await other.execute('CREATE TABLE Table1 (id INTEGER)')
+    exists = await db.table('Table1').exists()
+    assert exists is False
+    items = await db.execute('SELECT COUNT(*) AS total FROM ProductData')
+    assert items[0].total > 0
+    exists = await other.table('ProductData').exists()
+    assert exists is False
+    await db.close()
+    await other.close()
+    SqlitePool.drain_all()
+
+
+async def test_finalize_context():
+    app = DataApplication(cwd=abspath(join(dirname(__file__), '..')))
+    context = app.create_context()
+    context.__db__ = SqliteAdapter(connection_options)
+    context.__db__.name = 'test_finalize_context'
+    await context.model('Product').as_queryable().count()
+    pool = context.db.pool
+    idle = pool.idle
+    await context.finalize()
+    # connection has been returned to pool
+    assert pool.idle == idle + 1
+    SqlitePool.drain_all()